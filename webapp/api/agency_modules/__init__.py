@@ -1 +1,26 @@
 # Agency modules package
+
+# Registry of all agency modules
+AGENCY_REGISTRY = {
+    'sec': 'api.agency_modules.sec',
+    'fda': 'api.agency_modules.fda',
+    'treasury': 'api.agency_modules.treasury',
+    'usaspending': 'api.agency_modules.usaspending',
+    'noaa': 'api.agency_modules.noaa',
+    'epa': 'api.agency_modules.epa',
+    'census': 'api.agency_modules.census',
+    'doj': 'api.agency_modules.doj',
+    'bls': 'api.agency_modules.bls',
+    'fcc': 'api.agency_modules.fcc',
+    'usgs': 'api.agency_modules.usgs',
+    'nasa': 'api.agency_modules.nasa',
+    'ftc': 'api.agency_modules.ftc',
+    'nist': 'api.agency_modules.nist',
+    'sam': 'api.agency_modules.sam',
+    'fec': 'api.agency_modules.fec',
+    'fdic': 'api.agency_modules.fdic',
+    'nih': 'api.agency_modules.nih',
+    'loc': 'api.agency_modules.loc',
+    'nara': 'api.agency_modules.nara',
+    'dot': 'api.agency_modules.dot',
+}
@@ -1,5 +1,5 @@
 """BLS - Bureau of Labor Statistics API Module"""
-import requests
+from api import http_client
 import json
 
 BASE_URL = "https://api.bls.gov/publicAPI/v2/timeseries/data/"
@@ -12,7 +12,7 @@ SERIES_MAP = {
     'avg_hourly_earnings': {'id': 'CES0500000003', 'name': 'Average Hourly Earnings'},
 }
 
-def get_series_data(series_id, series_name, years=3):
+def get_series_data(series_id, series_name, years=3, count=None, offset=0):
     try:
         import datetime
         end_year = datetime.datetime.now().year
@@ -22,10 +22,12 @@ def get_series_data(series_id, series_name, years=3):
             "startyear": str(start_year),
             "endyear": str(end_year)
         })
-        resp = requests.post(BASE_URL, data=payload, headers=HEADERS, timeout=15)
+        resp = http_client.post(BASE_URL, data=payload, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             data = resp.json()
             series_data = data.get('Results', {}).get('series', [{}])[0].get('data', [])
+            # The timeseries API has no paging; window the observations here.
+            series_data = series_data[offset:offset + count if count else None]
             return [{
                 'title': f"{series_name}: {d.get('value', '')}",
                 'description': f"Period: {d.get('periodName', '')} {d.get('year', '')}",
@@ -42,7 +44,9 @@ def get_series_data(series_id, series_name, years=3):
 def get_bls_data(api_key=None, params=None):
     sub = (params or {}).get('sub_section', 'unemployment')
     series = SERIES_MAP.get(sub, SERIES_MAP['unemployment'])
-    return {"results": get_series_data(series['id'], series['name']), "source": "Bureau of Labor Statistics", "endpoint": sub}
+    count = (params or {}).get('limit')
+    offset = (params or {}).get('offset') or 0
+    return {"results": get_series_data(series['id'], series['name'], count=count, offset=offset), "source": "Bureau of Labor Statistics", "endpoint": sub}
 
 def get_metadata():
     return {
@@ -51,11 +55,18 @@ def get_metadata():
         "description": "Employment, unemployment, CPI, wages, and labor market data",
         "endpoints": ["Unemployment Rate", "CPI", "Total Employment", "Average Hourly Earnings"],
         "sub_sections": [
-            {"id": "unemployment", "name": "Unemployment Rate"},
-            {"id": "cpi", "name": "Consumer Price Index"},
-            {"id": "employment", "name": "Total Nonfarm Employment"},
-            {"id": "avg_hourly_earnings", "name": "Average Hourly Earnings"},
+            {"id": "unemployment", "name": "Unemployment Rate", "cache_ttl": 21600},
+            {"id": "cpi", "name": "Consumer Price Index", "cache_ttl": 21600},
+            {"id": "employment", "name": "Total Nonfarm Employment", "cache_ttl": 21600},
+            {"id": "avg_hourly_earnings", "name": "Average Hourly Earnings", "cache_ttl": 21600},
         ],
+        # Frontend bundle ids (static/index.html), served by the closest single series
+        "sub_section_aliases": {
+            "labor_market": "unemployment", "inflation": "cpi", "wages": "avg_hourly_earnings",
+            "industries": "employment",
+        },
+        # Frontend bundles with no matching series here
+        "unsupported_sub_sections": ["jolts", "productivity", "demographics", "custom"],
         "has_search": False,
         "auth_required": False,
         "base_url": "https://api.bls.gov",
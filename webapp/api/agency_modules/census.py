@@ -1,51 +1,56 @@
 """Census Bureau API Module"""
-import requests
+from api import hedge, http_client
 
 BASE_URL = "https://api.census.gov/data"
 HEADERS = {'Accept': 'application/json'}
 
-def get_population_estimates(count=20):
-    """Get population estimates by state."""
-    try:
-        url = f"{BASE_URL}/2023/pep/population?get=NAME,POP_2023,DENSITY_2023&for=state:*"
-        resp = requests.get(url, headers=HEADERS, timeout=15)
-        if resp.status_code == 200:
-            data = resp.json()
-            header = data[0]
-            rows = data[1:]
-            return [{
-                'title': r[0],
-                'description': f"Population: {int(r[1]):,}" if r[1] else "Population: N/A",
-                'date': '2023',
-                'link': f"https://data.census.gov/",
-                'population': r[1],
-                'density': r[2] if len(r) > 2 else ''
-            } for r in sorted(rows, key=lambda x: int(x[1] or 0), reverse=True)[:count]]
-    except Exception:
-        pass
-    # Fallback to 2022 ACS
+def _pep_population(count, offset):
+    """2023 Population Estimates by state; None if the API did not answer."""
+    url = f"{BASE_URL}/2023/pep/population?get=NAME,POP_2023,DENSITY_2023&for=state:*"
+    resp = http_client.get(url, headers=HEADERS, timeout=15)
+    if resp.status_code != 200:
+        return None
+    data = resp.json()
+    rows = data[1:]
+    return [{
+        'title': r[0],
+        'description': f"Population: {int(r[1]):,}" if r[1] else "Population: N/A",
+        'date': '2023',
+        'link': f"https://data.census.gov/",
+        'population': r[1],
+        'density': r[2] if len(r) > 2 else ''
+    } for r in sorted(rows, key=lambda x: int(x[1] or 0), reverse=True)[offset:offset + count]]
+
+def _acs_population(count, offset):
+    """2022 ACS 1-year population by state; None if the API did not answer."""
+    url = f"{BASE_URL}/2022/acs/acs1?get=NAME,B01001_001E&for=state:*"
+    resp = http_client.get(url, headers=HEADERS, timeout=15)
+    if resp.status_code != 200:
+        return None
+    data = resp.json()
+    rows = data[1:]
+    return [{
+        'title': r[0],
+        'description': f"Population (ACS 2022): {int(r[1]):,}" if r[1] else "N/A",
+        'date': '2022',
+        'link': 'https://data.census.gov/',
+        'population': r[1]
+    } for r in sorted(rows, key=lambda x: int(x[1] or 0), reverse=True)[offset:offset + count]]
+
+def get_population_estimates(count=20, offset=0):
+    """Get population estimates by state (PEP 2023, hedged with ACS 2022)."""
     try:
-        url = f"{BASE_URL}/2022/acs/acs1?get=NAME,B01001_001E&for=state:*"
-        resp = requests.get(url, headers=HEADERS, timeout=15)
-        if resp.status_code == 200:
-            data = resp.json()
-            rows = data[1:]
-            return [{
-                'title': r[0],
-                'description': f"Population (ACS 2022): {int(r[1]):,}" if r[1] else "N/A",
-                'date': '2022',
-                'link': 'https://data.census.gov/',
-                'population': r[1]
-            } for r in sorted(rows, key=lambda x: int(x[1] or 0), reverse=True)[:count]]
+        return hedge.hedge(lambda: _pep_population(count, offset),
+                           lambda: _acs_population(count, offset),
+                           name='census.population') or []
     except Exception as e:
         return [{"error": str(e)}]
-    return []
 
-def get_income_data(count=20):
+def get_income_data(count=20, offset=0):
     """Get median household income by state."""
     try:
         url = f"{BASE_URL}/2022/acs/acs1?get=NAME,B19013_001E&for=state:*"
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        resp = http_client.get(url, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             data = resp.json()
             rows = data[1:]
@@ -55,7 +60,7 @@ def get_income_data(count=20):
                 'date': '2022 ACS',
                 'link': 'https://data.census.gov/',
                 'income': r[1]
-            } for r in sorted(rows, key=lambda x: int(x[1]) if x[1] and x[1] != '-666666666' else 0, reverse=True)[:count]]
+            } for r in sorted(rows, key=lambda x: int(x[1]) if x[1] and x[1] != '-666666666' else 0, reverse=True)[offset:offset + count]]
     except Exception as e:
         return [{"error": str(e)}]
     return []
@@ -67,7 +72,9 @@ def get_census_data(api_key=None, params=None):
         'income': get_income_data,
     }
     fn = mapping.get(sub, mapping['population'])
-    return {"results": fn(), "source": "US Census Bureau", "endpoint": sub}
+    count = (params or {}).get('limit') or 20
+    offset = (params or {}).get('offset') or 0
+    return {"results": fn(count, offset), "source": "US Census Bureau", "endpoint": sub}
 
 def get_metadata():
     return {
@@ -76,8 +83,8 @@ def get_metadata():
         "description": "Population estimates, demographics, income data, and American Community Survey results",
         "endpoints": ["Population Estimates", "Median Income by State"],
         "sub_sections": [
-            {"id": "population", "name": "Population by State"},
-            {"id": "income", "name": "Median Income by State"},
+            {"id": "population", "name": "Population by State", "cache_ttl": 604800},
+            {"id": "income", "name": "Median Income by State", "cache_ttl": 604800},
         ],
         "has_search": False,
         "auth_required": False,
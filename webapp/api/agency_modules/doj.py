@@ -1,14 +1,17 @@
 """DOJ - Department of Justice API Module"""
-import requests
+from api import http_client
+from api.paging import page_window
 
 BASE_URL = "https://www.justice.gov/api/v1"
 HEADERS = {'Accept': 'application/json'}
 
-def fetch_doj(endpoint, count=20):
+def fetch_doj(endpoint, count=20, offset=0):
+    size, page, skip = page_window(offset, count)
     try:
-        resp = requests.get(f"{BASE_URL}/{endpoint}", params={"pagesize": count}, headers=HEADERS, timeout=15)
+        # pages are 0-based on justice.gov
+        resp = http_client.get(f"{BASE_URL}/{endpoint}", params={"pagesize": size, "page": page}, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
-            results = resp.json().get('results', [])
+            results = resp.json().get('results', [])[skip:skip + count]
             return [{
                 'title': r.get('title', r.get('headline', '')),
                 'description': (r.get('body', r.get('description', r.get('summary', ''))) or '')[:300],
@@ -28,7 +31,9 @@ def get_doj_data(api_key=None, params=None):
         'news': 'news.json',
     }
     endpoint = mapping.get(sub, 'press_releases.json')
-    return {"results": fetch_doj(endpoint), "source": "Department of Justice", "endpoint": sub}
+    count = (params or {}).get('limit') or 20
+    offset = (params or {}).get('offset') or 0
+    return {"results": fetch_doj(endpoint, count, offset), "source": "Department of Justice", "endpoint": sub}
 
 def get_metadata():
     return {
@@ -37,11 +42,15 @@ def get_metadata():
         "description": "Press releases, news, speeches, and blog posts from the DOJ",
         "endpoints": ["Press Releases", "Blog Posts", "Speeches", "News"],
         "sub_sections": [
-            {"id": "press_releases", "name": "Press Releases"},
-            {"id": "blog_posts", "name": "Blog Posts"},
-            {"id": "speeches", "name": "Speeches"},
-            {"id": "news", "name": "News"},
+            {"id": "press_releases", "name": "Press Releases", "cache_ttl": 900},
+            {"id": "blog_posts", "name": "Blog Posts", "cache_ttl": 900},
+            {"id": "speeches", "name": "Speeches", "cache_ttl": 900},
+            {"id": "news", "name": "News", "cache_ttl": 900},
         ],
+        # Frontend ids (static/index.html); topics and components have no backend endpoint
+        "sub_section_aliases": {"blog": "blog_posts"},
+        # Frontend taxonomy lists; this module only serves content feeds
+        "unsupported_sub_sections": ["topics", "components"],
         "has_search": False,
         "auth_required": False,
         "base_url": "https://www.justice.gov/api/v1",
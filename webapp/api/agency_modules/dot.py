@@ -1,47 +1,54 @@
 """DOT - Department of Transportation API Module"""
-import requests
+from api import hedge, http_client
 
 HEADERS = {'Accept': 'application/json'}
 
-def get_airline_stats(count=20):
-    """NHTSA vehicle recall data as DOT proxy."""
-    try:
-        url = f"https://api.nhtsa.gov/recalls/recallsByDate?startDate=2025-01-01&endDate=2026-12-31&limit={count}"
-        resp = requests.get(url, headers=HEADERS, timeout=15)
-        if resp.status_code == 200:
-            results = resp.json().get('results', [])
-            return [{
-                'title': f"{r.get('Manufacturer', '')} - {r.get('Subject', '')}",
-                'description': (r.get('Summary', '') or '')[:300],
-                'date': r.get('ReportReceivedDate', ''),
-                'link': f"https://www.nhtsa.gov/recalls",
-                'component': r.get('Component', ''),
-                'units_affected': r.get('PotentialNumberofUnitsAffected', '')
-            } for r in results[:count]]
-    except Exception:
-        pass
-    # Fallback: NHTSA complaints
+def _recalls_by_date(count, offset):
+    """NHTSA recalls by report date; None if the API did not answer."""
+    url = f"https://api.nhtsa.gov/recalls/recallsByDate?startDate=2025-01-01&endDate=2026-12-31&limit={offset + count}"
+    resp = http_client.get(url, headers=HEADERS, timeout=15)
+    if resp.status_code != 200:
+        return None
+    results = resp.json().get('results', [])[offset:]
+    return [{
+        'title': f"{r.get('Manufacturer', '')} - {r.get('Subject', '')}",
+        'description': (r.get('Summary', '') or '')[:300],
+        'date': r.get('ReportReceivedDate', ''),
+        'link': f"https://www.nhtsa.gov/recalls",
+        'component': r.get('Component', ''),
+        'units_affected': r.get('PotentialNumberofUnitsAffected', '')
+    } for r in results[:count]]
+
+def _complaints(count, offset):
+    """NHTSA complaints; None if the API did not answer."""
+    url = f"https://api.nhtsa.gov/complaints?make=toyota&model=camry"
+    resp = http_client.get(url, headers=HEADERS, timeout=15)
+    if resp.status_code != 200:
+        return None
+    results = resp.json().get('results', [])[offset:offset + count]
+    return [{
+        'title': f"{r.get('make', '')} {r.get('model', '')} ({r.get('modelYear', '')})",
+        'description': (r.get('summary', '') or '')[:300],
+        'date': r.get('dateOfIncident', ''),
+        'link': 'https://www.nhtsa.gov/complaints',
+    } for r in results]
+
+def get_airline_stats(count=20, offset=0):
+    """NHTSA vehicle recall data as DOT proxy, hedged with NHTSA complaints."""
     try:
-        url = f"https://api.nhtsa.gov/complaints?make=toyota&model=camry"
-        resp = requests.get(url, headers=HEADERS, timeout=15)
-        if resp.status_code == 200:
-            results = resp.json().get('results', [])[:count]
-            return [{
-                'title': f"{r.get('make', '')} {r.get('model', '')} ({r.get('modelYear', '')})",
-                'description': (r.get('summary', '') or '')[:300],
-                'date': r.get('dateOfIncident', ''),
-                'link': 'https://www.nhtsa.gov/complaints',
-            } for r in results]
+        return hedge.hedge(lambda: _recalls_by_date(count, offset),
+                           lambda: _complaints(count, offset),
+                           name='dot.complaints') or []
     except Exception as e:
         return [{"error": str(e)}]
-    return []
 
-def get_vehicle_recalls(count=20):
+def get_vehicle_recalls(count=20, offset=0):
     try:
+        # recallsByYear has no paging parameters; window the year here.
         url = "https://api.nhtsa.gov/recalls/recallsByYear?year=2025"
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        resp = http_client.get(url, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
-            results = resp.json().get('results', [])[:count]
+            results = resp.json().get('results', [])[offset:offset + count]
             return [{
                 'title': f"{r.get('Manufacturer', '')} - {r.get('Subject', '')}",
                 'description': (r.get('Summary', '') or '')[:300],
@@ -59,7 +66,9 @@ def get_dot_data(api_key=None, params=None):
         'complaints': get_airline_stats,
     }
     fn = mapping.get(sub, mapping['recalls'])
-    return {"results": fn(), "source": "DOT/NHTSA", "endpoint": sub}
+    count = (params or {}).get('limit') or 20
+    offset = (params or {}).get('offset') or 0
+    return {"results": fn(count, offset), "source": "DOT/NHTSA", "endpoint": sub}
 
 def get_metadata():
     return {
@@ -68,8 +77,8 @@ def get_metadata():
         "description": "Vehicle recalls, safety complaints, and transportation safety data via NHTSA",
         "endpoints": ["Vehicle Recalls", "Safety Complaints"],
         "sub_sections": [
-            {"id": "recalls", "name": "Vehicle Recalls (2025)"},
-            {"id": "complaints", "name": "Safety Complaints"},
+            {"id": "recalls", "name": "Vehicle Recalls (2025)", "cache_ttl": 3600},
+            {"id": "complaints", "name": "Safety Complaints", "cache_ttl": 3600},
         ],
         "has_search": False,
         "auth_required": False,
@@ -1,17 +1,17 @@
 """EPA - Environmental Protection Agency API Module"""
-import requests
+from api import http_client
 
 BASE_URL = "https://data.epa.gov/efservice"
 ECHO_BASE = "https://echo.epa.gov/api/rest_lookups"
 HEADERS = {'Accept': 'application/json'}
 
-def get_air_quality(count=20):
+def get_air_quality(count=20, offset=0):
     """Fetch air quality data from EPA AirData."""
     try:
         url = "https://aqs.epa.gov/data/api/dailyData/byState?email=test@test.com&key=test&param=44201&bdate=20250101&edate=20250131&state=06"
         # Fallback to Envirofacts
-        url = f"{BASE_URL}/WATER_SYSTEM/ROWS/0:{count}/JSON"
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        url = f"{BASE_URL}/WATER_SYSTEM/ROWS/{offset}:{offset + count - 1}/JSON"
+        resp = http_client.get(url, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             data = resp.json() if isinstance(resp.json(), list) else []
             return [{
@@ -25,11 +25,11 @@ def get_air_quality(count=20):
         return [{"error": str(e)}]
     return []
 
-def get_facility_info(count=20):
+def get_facility_info(count=20, offset=0):
     """Fetch EPA regulated facility data."""
     try:
-        url = f"{BASE_URL}/PCS_PERMIT_FACILITY/ROWS/0:{count}/JSON"
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        url = f"{BASE_URL}/PCS_PERMIT_FACILITY/ROWS/{offset}:{offset + count - 1}/JSON"
+        resp = http_client.get(url, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             data = resp.json() if isinstance(resp.json(), list) else []
             return [{
@@ -42,11 +42,11 @@ def get_facility_info(count=20):
         return [{"error": str(e)}]
     return []
 
-def get_toxic_releases(count=20):
+def get_toxic_releases(count=20, offset=0):
     """Fetch Toxic Release Inventory data."""
     try:
-        url = f"{BASE_URL}/TRI_FACILITY/ROWS/0:{count}/JSON"
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        url = f"{BASE_URL}/TRI_FACILITY/ROWS/{offset}:{offset + count - 1}/JSON"
+        resp = http_client.get(url, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             data = resp.json() if isinstance(resp.json(), list) else []
             return [{
@@ -67,7 +67,9 @@ def get_epa_data(api_key=None, params=None):
         'toxic_releases': get_toxic_releases,
     }
     fn = mapping.get(sub, mapping['water_systems'])
-    return {"results": fn(), "source": "EPA Envirofacts", "endpoint": sub}
+    count = (params or {}).get('limit') or 20
+    offset = (params or {}).get('offset') or 0
+    return {"results": fn(count, offset), "source": "EPA Envirofacts", "endpoint": sub}
 
 def get_metadata():
     return {
@@ -76,9 +78,9 @@ def get_metadata():
         "description": "Environmental data including water systems, facility permits, and toxic releases",
         "endpoints": ["Water Systems", "Regulated Facilities", "Toxic Release Inventory"],
         "sub_sections": [
-            {"id": "water_systems", "name": "Water Systems"},
-            {"id": "facilities", "name": "Regulated Facilities"},
-            {"id": "toxic_releases", "name": "Toxic Release Inventory"},
+            {"id": "water_systems", "name": "Water Systems", "cache_ttl": 86400},
+            {"id": "facilities", "name": "Regulated Facilities", "cache_ttl": 86400},
+            {"id": "toxic_releases", "name": "Toxic Release Inventory", "cache_ttl": 86400},
         ],
         "has_search": False,
         "auth_required": False,
@@ -1,15 +1,15 @@
 """FCC - Federal Communications Commission API Module"""
-import requests
+from api import http_client
 
 HEADERS = {'Accept': 'application/json'}
 
-def get_broadband_data(count=20):
+def get_broadband_data(count=20, offset=0):
     """Fetch broadband deployment data."""
     try:
         url = "https://broadbandmap.fcc.gov/api/public/map/listMobileAvailabilities"
         # Use the FCC's public API
-        url = "https://opendata.fcc.gov/resource/i5zz-k6uu.json?$limit=" + str(count)
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        url = "https://opendata.fcc.gov/resource/i5zz-k6uu.json"
+        resp = http_client.get(url, params={"$limit": count, "$offset": offset}, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             data = resp.json()
             return [{
@@ -22,11 +22,11 @@ def get_broadband_data(count=20):
         pass
     return []
 
-def get_spectrum_licenses(count=20):
+def get_spectrum_licenses(count=20, offset=0):
     """Fetch spectrum license data."""
     try:
-        url = f"https://opendata.fcc.gov/resource/9k46-wbcq.json?$limit={count}"
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        url = "https://opendata.fcc.gov/resource/9k46-wbcq.json"
+        resp = http_client.get(url, params={"$limit": count, "$offset": offset}, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             data = resp.json()
             return [{
@@ -39,11 +39,12 @@ def get_spectrum_licenses(count=20):
         pass
     return []
 
-def get_consumer_complaints(count=20):
+def get_consumer_complaints(count=20, offset=0):
     """Fetch FCC consumer complaints."""
     try:
-        url = f"https://opendata.fcc.gov/resource/3xyp-aqkj.json?$limit={count}&$order=date_of_issue DESC"
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        url = "https://opendata.fcc.gov/resource/3xyp-aqkj.json"
+        params = {"$limit": count, "$offset": offset, "$order": "date_of_issue DESC"}
+        resp = http_client.get(url, params=params, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             data = resp.json()
             return [{
@@ -64,7 +65,9 @@ def get_fcc_data(api_key=None, params=None):
         'complaints': get_consumer_complaints,
     }
     fn = mapping.get(sub, mapping['broadband'])
-    return {"results": fn(), "source": "FCC", "endpoint": sub}
+    count = (params or {}).get('limit') or 20
+    offset = (params or {}).get('offset') or 0
+    return {"results": fn(count, offset), "source": "FCC", "endpoint": sub}
 
 def get_metadata():
     return {
@@ -73,9 +76,9 @@ def get_metadata():
         "description": "Broadband data, spectrum licenses, and consumer complaints",
         "endpoints": ["Broadband Data", "Spectrum Licenses", "Consumer Complaints"],
         "sub_sections": [
-            {"id": "broadband", "name": "Broadband Data"},
-            {"id": "spectrum", "name": "Spectrum Licenses"},
-            {"id": "complaints", "name": "Consumer Complaints"},
+            {"id": "broadband", "name": "Broadband Data", "cache_ttl": 86400},
+            {"id": "spectrum", "name": "Spectrum Licenses", "cache_ttl": 86400},
+            {"id": "complaints", "name": "Consumer Complaints", "cache_ttl": 3600},
         ],
         "has_search": False,
         "auth_required": False,
@@ -1,17 +1,21 @@
 """FDA - Food and Drug Administration API Module (openFDA)"""
-import requests
+from api import http_client
 
 BASE_URL = "https://api.fda.gov"
 HEADERS = {'Accept': 'application/json'}
 
-def fetch_endpoint(endpoint, params=None, count=20):
+MAX_LIMIT = 1000  # openFDA caps limit at 1000 per request
+
+def fetch_endpoint(endpoint, params=None, count=20, offset=0):
     """Generic openFDA endpoint fetcher."""
     url = f"{BASE_URL}/{endpoint}"
-    default_params = {"limit": count}
+    default_params = {"limit": min(count, MAX_LIMIT)}
+    if offset:
+        default_params["skip"] = offset
     if params:
         default_params.update(params)
     try:
-        resp = requests.get(url, params=default_params, headers=HEADERS, timeout=15)
+        resp = http_client.get(url, params=default_params, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             data = resp.json()
             return data.get('results', [])
@@ -19,11 +23,11 @@ def fetch_endpoint(endpoint, params=None, count=20):
         return [{"error": str(e)}]
     return []
 
-def get_drug_events(count=20, query=None):
+def get_drug_events(count=20, query=None, offset=0):
     params = {}
     if query:
         params['search'] = f'patient.drug.medicinalproduct:"{query}"'
-    results = fetch_endpoint("drug/event.json", params, count)
+    results = fetch_endpoint("drug/event.json", params, count, offset)
     formatted = []
     for r in results:
         patient = r.get('patient', {})
@@ -39,11 +43,11 @@ def get_drug_events(count=20, query=None):
         })
     return formatted
 
-def get_drug_recalls(count=20, query=None):
+def get_drug_recalls(count=20, query=None, offset=0):
     params = {}
     if query:
         params['search'] = f'reason_for_recall:"{query}"'
-    results = fetch_endpoint("drug/enforcement.json", params, count)
+    results = fetch_endpoint("drug/enforcement.json", params, count, offset)
     return [{
         'title': r.get('product_description', '')[:100],
         'description': r.get('reason_for_recall', ''),
@@ -54,11 +58,11 @@ def get_drug_recalls(count=20, query=None):
         'recalling_firm': r.get('recalling_firm', '')
     } for r in results]
 
-def get_device_510k(count=20, query=None):
+def get_device_510k(count=20, query=None, offset=0):
     params = {}
     if query:
         params['search'] = f'device_name:"{query}"'
-    results = fetch_endpoint("device/510k.json", params, count)
+    results = fetch_endpoint("device/510k.json", params, count, offset)
     return [{
         'title': r.get('device_name', ''),
         'description': f"Applicant: {r.get('applicant', '')} | Product Code: {r.get('product_code', '')}",
@@ -68,8 +72,8 @@ def get_device_510k(count=20, query=None):
         'decision': r.get('decision_description', '')
     } for r in results]
 
-def get_device_recalls(count=20):
-    results = fetch_endpoint("device/enforcement.json", {}, count)
+def get_device_recalls(count=20, offset=0):
+    results = fetch_endpoint("device/enforcement.json", {}, count, offset)
     return [{
         'title': r.get('product_description', '')[:100],
         'description': r.get('reason_for_recall', ''),
@@ -79,8 +83,8 @@ def get_device_recalls(count=20):
         'recalling_firm': r.get('recalling_firm', '')
     } for r in results]
 
-def get_food_recalls(count=20):
-    results = fetch_endpoint("food/enforcement.json", {}, count)
+def get_food_recalls(count=20, offset=0):
+    results = fetch_endpoint("food/enforcement.json", {}, count, offset)
     return [{
         'title': r.get('product_description', '')[:100],
         'description': r.get('reason_for_recall', ''),
@@ -93,12 +97,14 @@ def get_food_recalls(count=20):
 def get_fda_data(api_key=None, params=None):
     sub = (params or {}).get('sub_section', 'drug_events')
     query = (params or {}).get('query', '')
+    count = (params or {}).get('limit') or 20
+    offset = (params or {}).get('offset') or 0
     mapping = {
-        'drug_events': lambda: get_drug_events(query=query),
-        'drug_recalls': lambda: get_drug_recalls(query=query),
-        'device_510k': lambda: get_device_510k(query=query),
-        'device_recalls': lambda: get_device_recalls(),
-        'food_recalls': lambda: get_food_recalls(),
+        'drug_events': lambda: get_drug_events(count, query=query, offset=offset),
+        'drug_recalls': lambda: get_drug_recalls(count, query=query, offset=offset),
+        'device_510k': lambda: get_device_510k(count, query=query, offset=offset),
+        'device_recalls': lambda: get_device_recalls(count, offset=offset),
+        'food_recalls': lambda: get_food_recalls(count, offset=offset),
     }
     fn = mapping.get(sub, mapping['drug_events'])
     return {"results": fn(), "source": "openFDA", "endpoint": sub}
@@ -110,11 +116,11 @@ def get_metadata():
         "description": "Drug adverse events, recalls, 510(k) device clearances, and food safety data",
         "endpoints": ["Drug Adverse Events", "Drug Recalls", "Device 510(k)", "Device Recalls", "Food Recalls"],
         "sub_sections": [
-            {"id": "drug_events", "name": "Drug Adverse Events"},
-            {"id": "drug_recalls", "name": "Drug Recalls"},
-            {"id": "device_510k", "name": "Device 510(k) Clearances"},
-            {"id": "device_recalls", "name": "Device Recalls"},
-            {"id": "food_recalls", "name": "Food Recalls"},
+            {"id": "drug_events", "name": "Drug Adverse Events", "cache_ttl": 3600},
+            {"id": "drug_recalls", "name": "Drug Recalls", "cache_ttl": 3600},
+            {"id": "device_510k", "name": "Device 510(k) Clearances", "cache_ttl": 3600},
+            {"id": "device_recalls", "name": "Device Recalls", "cache_ttl": 3600},
+            {"id": "food_recalls", "name": "Food Recalls", "cache_ttl": 3600},
         ],
         "has_search": True,
         "search_placeholder": "Search drug name, device, or keyword...",
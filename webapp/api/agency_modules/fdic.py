@@ -1,13 +1,13 @@
 """FDIC - Federal Deposit Insurance Corporation API Module"""
-import requests
+from api import http_client
 
 BASE_URL = "https://banks.data.fdic.gov/api"
 HEADERS = {'Accept': 'application/json'}
 
-def get_institutions(count=20):
+def get_institutions(count=20, offset=0):
     try:
-        url = f"{BASE_URL}/financials?limit={count}&sort_by=REPDTE&sort_order=DESC"
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        url = f"{BASE_URL}/financials?limit={count}&offset={offset}&sort_by=REPDTE&sort_order=DESC"
+        resp = http_client.get(url, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             data = resp.json().get('data', [])
             return [{
@@ -21,10 +21,10 @@ def get_institutions(count=20):
         return [{"error": str(e)}]
     return []
 
-def get_failures(count=20):
+def get_failures(count=20, offset=0):
     try:
-        url = f"{BASE_URL}/failures?limit={count}&sort_by=FAILDATE&sort_order=DESC"
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        url = f"{BASE_URL}/failures?limit={count}&offset={offset}&sort_by=FAILDATE&sort_order=DESC"
+        resp = http_client.get(url, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             data = resp.json().get('data', [])
             return [{
@@ -44,7 +44,9 @@ def get_fdic_data(api_key=None, params=None):
         'failures': get_failures,
     }
     fn = mapping.get(sub, mapping['institutions'])
-    return {"results": fn(), "source": "FDIC", "endpoint": sub}
+    count = (params or {}).get('limit') or 20
+    offset = (params or {}).get('offset') or 0
+    return {"results": fn(count, offset), "source": "FDIC", "endpoint": sub}
 
 def get_metadata():
     return {
@@ -53,8 +55,8 @@ def get_metadata():
         "description": "Bank financial data, institution information, and bank failure records",
         "endpoints": ["Financial Institutions", "Bank Failures"],
         "sub_sections": [
-            {"id": "institutions", "name": "Financial Institutions"},
-            {"id": "failures", "name": "Bank Failures"},
+            {"id": "institutions", "name": "Financial Institutions", "cache_ttl": 86400},
+            {"id": "failures", "name": "Bank Failures", "cache_ttl": 86400},
         ],
         "has_search": False,
         "auth_required": False,
@@ -1,17 +1,20 @@
 """FEC - Federal Election Commission API Module"""
-import requests
+from api import http_client
+from api.paging import page_window
 
 BASE_URL = "https://api.open.fec.gov/v1"
 DEMO_KEY = "DEMO_KEY"
 HEADERS = {'Accept': 'application/json'}
+MAX_PER_PAGE = 100  # openFEC caps per_page at 100
 
-def get_candidates(count=20, api_key=None):
+def get_candidates(count=20, api_key=None, offset=0):
     key = api_key or DEMO_KEY
+    size, page, skip = page_window(offset, count, MAX_PER_PAGE)
     try:
-        url = f"{BASE_URL}/candidates/?api_key={key}&sort=-receipts&per_page={count}&election_year=2024"
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        url = f"{BASE_URL}/candidates/?api_key={key}&sort=-receipts&per_page={size}&page={page + 1}&election_year=2024"
+        resp = http_client.get(url, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
-            results = resp.json().get('results', [])
+            results = resp.json().get('results', [])[skip:skip + count]
             return [{
                 'title': r.get('name', ''),
                 'description': f"Party: {r.get('party_full', '')} | Office: {r.get('office_full', '')} | State: {r.get('state', '')}",
@@ -25,13 +28,14 @@ def get_candidates(count=20, api_key=None):
         return [{"error": str(e)}]
     return []
 
-def get_committee_filings(count=20, api_key=None):
+def get_committee_filings(count=20, api_key=None, offset=0):
     key = api_key or DEMO_KEY
+    size, page, skip = page_window(offset, count, MAX_PER_PAGE)
     try:
-        url = f"{BASE_URL}/filings/?api_key={key}&per_page={count}&sort=-receipt_date"
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        url = f"{BASE_URL}/filings/?api_key={key}&per_page={size}&page={page + 1}&sort=-receipt_date"
+        resp = http_client.get(url, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
-            results = resp.json().get('results', [])
+            results = resp.json().get('results', [])[skip:skip + count]
             return [{
                 'title': r.get('committee_name', ''),
                 'description': f"Form: {r.get('form_type', '')} | Receipts: ${r.get('total_receipts', 0):,.0f} | Disbursements: ${r.get('total_disbursements', 0):,.0f}",
@@ -44,9 +48,11 @@ def get_committee_filings(count=20, api_key=None):
 
 def get_fec_data(api_key=None, params=None):
     sub = (params or {}).get('sub_section', 'candidates')
+    count = (params or {}).get('limit') or 20
+    offset = (params or {}).get('offset') or 0
     mapping = {
-        'candidates': lambda: get_candidates(api_key=api_key),
-        'filings': lambda: get_committee_filings(api_key=api_key),
+        'candidates': lambda: get_candidates(count, api_key=api_key, offset=offset),
+        'filings': lambda: get_committee_filings(count, api_key=api_key, offset=offset),
     }
     fn = mapping.get(sub, mapping['candidates'])
     return {"results": fn(), "source": "FEC", "endpoint": sub}
@@ -58,8 +64,8 @@ def get_metadata():
         "description": "Campaign finance data, candidate filings, and political committee information",
         "endpoints": ["Candidates", "Committee Filings"],
         "sub_sections": [
-            {"id": "candidates", "name": "Candidates (2024)"},
-            {"id": "filings", "name": "Committee Filings"},
+            {"id": "candidates", "name": "Candidates (2024)", "cache_ttl": 3600},
+            {"id": "filings", "name": "Committee Filings", "cache_ttl": 3600},
         ],
         "has_search": False,
         "auth_required": False,
@@ -1,15 +1,17 @@
 """FTC - Federal Trade Commission API Module"""
-import requests
+from api import http_client
+from api.paging import page_window
 
 HEADERS = {'Accept': 'application/json'}
 
-def get_consumer_sentinel(count=20):
+def get_consumer_sentinel(count=20, offset=0):
     """FTC Consumer Sentinel data (public summary)."""
+    size, page, skip = page_window(offset, count)
     try:
         url = f"https://opendata.fcc.gov/resource/3xyp-aqkj.json?$limit={count}"
         # FTC doesn't have a great public API, use their press releases
         url = "https://www.ftc.gov/api/v1/press_releases.json"
-        resp = requests.get(url, params={"pagesize": count}, headers=HEADERS, timeout=15)
+        resp = http_client.get(url, params={"pagesize": size, "page": page}, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             results = resp.json().get('results', resp.json() if isinstance(resp.json(), list) else [])
             return [{
@@ -17,16 +19,17 @@ def get_consumer_sentinel(count=20):
                 'description': (r.get('body', r.get('description', '')) or '')[:300],
                 'date': r.get('date', r.get('created', '')),
                 'link': r.get('url', r.get('path', '')),
-            } for r in results[:count]]
+            } for r in results[skip:skip + count]]
     except Exception:
         pass
     return []
 
-def get_ftc_cases(count=20):
+def get_ftc_cases(count=20, offset=0):
     """FTC enforcement cases."""
+    size, page, skip = page_window(offset, count)
     try:
         url = "https://www.ftc.gov/api/v1/cases.json"
-        resp = requests.get(url, params={"pagesize": count}, headers=HEADERS, timeout=15)
+        resp = http_client.get(url, params={"pagesize": size, "page": page}, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             results = resp.json().get('results', [])
             return [{
@@ -34,7 +37,7 @@ def get_ftc_cases(count=20):
                 'description': (r.get('body', '') or '')[:300],
                 'date': r.get('date', ''),
                 'link': r.get('url', ''),
-            } for r in results[:count]]
+            } for r in results[skip:skip + count]]
     except Exception:
         pass
     return []
@@ -46,7 +49,9 @@ def get_ftc_data(api_key=None, params=None):
         'cases': get_ftc_cases,
     }
     fn = mapping.get(sub, mapping['press_releases'])
-    return {"results": fn(), "source": "FTC", "endpoint": sub}
+    count = (params or {}).get('limit') or 20
+    offset = (params or {}).get('offset') or 0
+    return {"results": fn(count, offset), "source": "FTC", "endpoint": sub}
 
 def get_metadata():
     return {
@@ -55,8 +60,8 @@ def get_metadata():
         "description": "Consumer protection, antitrust enforcement, press releases and cases",
         "endpoints": ["Press Releases", "Enforcement Cases"],
         "sub_sections": [
-            {"id": "press_releases", "name": "Press Releases"},
-            {"id": "cases", "name": "Enforcement Cases"},
+            {"id": "press_releases", "name": "Press Releases", "cache_ttl": 900},
+            {"id": "cases", "name": "Enforcement Cases", "cache_ttl": 900},
         ],
         "has_search": False,
         "auth_required": False,
@@ -1,15 +1,17 @@
 """LOC - Library of Congress API Module"""
-import requests
+from api import http_client
+from api.paging import page_window
 
 BASE_URL = "https://www.loc.gov"
 HEADERS = {'Accept': 'application/json'}
 
-def search_collections(query="government", count=20):
+def search_collections(query="government", count=20, offset=0):
+    size, page, skip = page_window(offset, count)
     try:
-        url = f"{BASE_URL}/search/?q={query}&fo=json&c={count}"
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        url = f"{BASE_URL}/search/?q={query}&fo=json&c={size}&sp={page + 1}"
+        resp = http_client.get(url, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
-            results = resp.json().get('results', [])
+            results = resp.json().get('results', [])[skip:skip + count]
             return [{
                 'title': r.get('title', r.get('description', [''])[0] if isinstance(r.get('description'), list) else ''),
                 'description': r.get('description', [''])[0][:300] if isinstance(r.get('description'), list) else (r.get('description', '') or '')[:300],
@@ -22,7 +24,9 @@ def search_collections(query="government", count=20):
 
 def get_loc_data(api_key=None, params=None):
     query = (params or {}).get('query', 'government')
-    return {"results": search_collections(query), "source": "Library of Congress", "endpoint": "Collection Search"}
+    count = (params or {}).get('limit') or 20
+    offset = (params or {}).get('offset') or 0
+    return {"results": search_collections(query, count, offset), "source": "Library of Congress", "endpoint": "Collection Search"}
 
 def get_metadata():
     return {
@@ -31,7 +35,7 @@ def get_metadata():
         "description": "Digital collections, historical records, and the national library catalog",
         "endpoints": ["Collection Search"],
         "sub_sections": [
-            {"id": "collections", "name": "Digital Collections"},
+            {"id": "collections", "name": "Digital Collections", "cache_ttl": 86400},
         ],
         "has_search": True,
         "search_placeholder": "Search Library of Congress collections...",
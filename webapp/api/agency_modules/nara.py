@@ -1,19 +1,21 @@
 """NARA - National Archives and Records Administration API Module"""
-import requests
+from api import http_client
+from api.paging import page_window
 
 BASE_URL = "https://catalog.archives.gov/api/v2"
 HEADERS = {'Accept': 'application/json'}
 
-def search_records(query="federal", count=20):
+def search_records(query="federal", count=20, offset=0):
+    size, page, skip = page_window(offset, count)
     try:
         url = f"{BASE_URL}/records/search"
-        params = {"q": query, "limit": count}
-        resp = requests.get(url, params=params, headers=HEADERS, timeout=15)
+        params = {"q": query, "limit": size, "page": page + 1}
+        resp = http_client.get(url, params=params, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             content_type = resp.headers.get('Content-Type', '')
             if 'json' not in content_type:
                 return [{"title": "NARA API Unavailable", "description": "The National Archives API is currently returning non-JSON responses. Visit catalog.archives.gov directly.", "date": "", "link": "https://catalog.archives.gov/"}]
-            results = resp.json().get('body', {}).get('hits', {}).get('hits', [])
+            results = resp.json().get('body', {}).get('hits', {}).get('hits', [])[skip:skip + count]
             return [{
                 'title': r.get('_source', {}).get('title', ''),
                 'description': (r.get('_source', {}).get('scopeAndContentNote', '') or '')[:300],
@@ -26,7 +28,9 @@ def search_records(query="federal", count=20):
 
 def get_nara_data(api_key=None, params=None):
     query = (params or {}).get('query', 'federal records')
-    return {"results": search_records(query), "source": "National Archives", "endpoint": "Record Search"}
+    count = (params or {}).get('limit') or 20
+    offset = (params or {}).get('offset') or 0
+    return {"results": search_records(query, count, offset), "source": "National Archives", "endpoint": "Record Search"}
 
 def get_metadata():
     return {
@@ -35,7 +39,7 @@ def get_metadata():
         "description": "Historical federal records, documents, and archival materials",
         "endpoints": ["Record Search"],
         "sub_sections": [
-            {"id": "records", "name": "Archival Records"},
+            {"id": "records", "name": "Archival Records", "cache_ttl": 86400},
         ],
         "has_search": True,
         "search_placeholder": "Search historical records...",
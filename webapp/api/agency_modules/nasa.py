@@ -1,14 +1,16 @@
 """NASA API Module"""
-import requests
+from api import http_client
+from api.paging import page_window
 
 BASE_URL = "https://api.nasa.gov"
 DEMO_KEY = "DEMO_KEY"
 HEADERS = {'Accept': 'application/json'}
+NEO_MAX_PAGE_SIZE = 20  # NeoWs browse caps size at 20
 
 def get_apod(api_key=None, count=10):
     key = api_key or DEMO_KEY
     try:
-        resp = requests.get(f"{BASE_URL}/planetary/apod?api_key={key}&count={count}", headers=HEADERS, timeout=15)
+        resp = http_client.get(f"{BASE_URL}/planetary/apod?api_key={key}&count={count}", headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             data = resp.json()
             if isinstance(data, dict):
@@ -24,13 +26,14 @@ def get_apod(api_key=None, count=10):
         return [{"error": str(e)}]
     return []
 
-def get_neo(api_key=None):
+def get_neo(api_key=None, count=20, offset=0):
     """Near Earth Objects."""
     key = api_key or DEMO_KEY
+    size, page, skip = page_window(offset, count, NEO_MAX_PAGE_SIZE)
     try:
-        resp = requests.get(f"{BASE_URL}/neo/rest/v1/neo/browse?api_key={key}", headers=HEADERS, timeout=15)
+        resp = http_client.get(f"{BASE_URL}/neo/rest/v1/neo/browse?api_key={key}&size={size}&page={page}", headers=HEADERS, timeout=15)
         if resp.status_code == 200:
-            neos = resp.json().get('near_earth_objects', [])[:20]
+            neos = resp.json().get('near_earth_objects', [])[skip:skip + count]
             return [{
                 'title': n.get('name', ''),
                 'description': f"Magnitude: {n.get('absolute_magnitude_h', '')} | Hazardous: {n.get('is_potentially_hazardous_asteroid', False)}",
@@ -42,12 +45,12 @@ def get_neo(api_key=None):
         return [{"error": str(e)}]
     return []
 
-def get_mars_photos(api_key=None):
+def get_mars_photos(api_key=None, count=20, offset=0):
     key = api_key or DEMO_KEY
     try:
-        resp = requests.get(f"{BASE_URL}/mars-photos/api/v1/rovers/curiosity/latest_photos?api_key={key}", headers=HEADERS, timeout=15)
+        resp = http_client.get(f"{BASE_URL}/mars-photos/api/v1/rovers/curiosity/latest_photos?api_key={key}", headers=HEADERS, timeout=15)
         if resp.status_code == 200:
-            photos = resp.json().get('latest_photos', [])[:20]
+            photos = resp.json().get('latest_photos', [])[offset:offset + count]
             return [{
                 'title': f"Sol {p.get('sol', '')} - {p.get('camera', {}).get('full_name', '')}",
                 'description': f"Rover: {p.get('rover', {}).get('name', '')} | Camera: {p.get('camera', {}).get('name', '')}",
@@ -60,10 +63,13 @@ def get_mars_photos(api_key=None):
 
 def get_nasa_data(api_key=None, params=None):
     sub = (params or {}).get('sub_section', 'apod')
+    limit = (params or {}).get('limit')
+    offset = (params or {}).get('offset') or 0
     mapping = {
-        'apod': lambda: get_apod(api_key),
-        'neo': lambda: get_neo(api_key),
-        'mars': lambda: get_mars_photos(api_key),
+        # APOD with count= returns a random sample, so there is nothing to offset
+        'apod': lambda: get_apod(api_key, count=limit or 10),
+        'neo': lambda: get_neo(api_key, count=limit or 20, offset=offset),
+        'mars': lambda: get_mars_photos(api_key, count=limit or 20, offset=offset),
     }
     fn = mapping.get(sub, mapping['apod'])
     return {"results": fn(), "source": "NASA", "endpoint": sub}
@@ -75,9 +81,9 @@ def get_metadata():
         "description": "Astronomy pictures, near-earth objects, Mars rover photos",
         "endpoints": ["Astronomy Picture of the Day", "Near Earth Objects", "Mars Rover Photos"],
         "sub_sections": [
-            {"id": "apod", "name": "Astronomy Picture of the Day"},
-            {"id": "neo", "name": "Near Earth Objects"},
-            {"id": "mars", "name": "Mars Rover Photos"},
+            {"id": "apod", "name": "Astronomy Picture of the Day", "cache_ttl": 3600},
+            {"id": "neo", "name": "Near Earth Objects", "cache_ttl": 3600},
+            {"id": "mars", "name": "Mars Rover Photos", "cache_ttl": 3600},
         ],
         "has_search": False,
         "auth_required": False,
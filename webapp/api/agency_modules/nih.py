@@ -1,39 +1,68 @@
 """NIH - National Institutes of Health / NLM API Module"""
-import requests
+from api import http_client
 
 HEADERS = {'Accept': 'application/json'}
+MAX_PAGE_SIZE = 1000  # ClinicalTrials.gov caps pageSize at 1000
 
-def get_clinical_trials(count=20, query=None):
+def _format_study(s):
+    return {
+        'title': s.get('protocolSection', {}).get('identificationModule', {}).get('briefTitle', ''),
+        'description': (s.get('protocolSection', {}).get('descriptionModule', {}).get('briefSummary', '') or '')[:300],
+        'date': s.get('protocolSection', {}).get('statusModule', {}).get('lastUpdateSubmitDate', ''),
+        'link': f"https://clinicaltrials.gov/study/{s.get('protocolSection', {}).get('identificationModule', {}).get('nctId', '')}",
+        'status': s.get('protocolSection', {}).get('statusModule', {}).get('overallStatus', ''),
+        'phase': ', '.join(s.get('protocolSection', {}).get('designModule', {}).get('phases', []))
+    }
+
+def fetch_clinical_trials(count=20, query=None, offset=0, page_token=None):
+    """Return (studies, next_page_token).
+
+    ClinicalTrials.gov pages by token only, so an offset is reached by walking
+    the pages before it (by token, at most MAX_PAGE_SIZE rows each) from the
+    start, or from page_token when given.
+    """
     try:
         url = "https://clinicaltrials.gov/api/v2/studies"
-        params = {"pageSize": count, "sort": "LastUpdatePostDate:desc"}
+        base = {"sort": "LastUpdatePostDate:desc"}
         if query:
-            params["query.term"] = query
-        resp = requests.get(url, params=params, headers=HEADERS, timeout=15)
-        if resp.status_code == 200:
-            studies = resp.json().get('studies', [])
-            return [{
-                'title': s.get('protocolSection', {}).get('identificationModule', {}).get('briefTitle', ''),
-                'description': (s.get('protocolSection', {}).get('descriptionModule', {}).get('briefSummary', '') or '')[:300],
-                'date': s.get('protocolSection', {}).get('statusModule', {}).get('lastUpdateSubmitDate', ''),
-                'link': f"https://clinicaltrials.gov/study/{s.get('protocolSection', {}).get('identificationModule', {}).get('nctId', '')}",
-                'status': s.get('protocolSection', {}).get('statusModule', {}).get('overallStatus', ''),
-                'phase': ', '.join(s.get('protocolSection', {}).get('designModule', {}).get('phases', []))
-            } for s in studies]
+            base["query.term"] = query
+        end = offset + count
+        seen = 0
+        studies = []
+        token = page_token
+        while seen < end:
+            params = dict(base, pageSize=min(MAX_PAGE_SIZE, end - seen))
+            if token:
+                params["pageToken"] = token
+            resp = http_client.get(url, params=params, headers=HEADERS, timeout=15)
+            if resp.status_code != 200:
+                return [], None
+            data = resp.json()
+            page = data.get('studies', [])
+            studies.extend(page[max(0, offset - seen):end - seen])
+            seen += len(page)
+            token = data.get('nextPageToken')
+            if not page or not token:
+                break
+        # The last page ends exactly at the window, so its token continues it
+        next_token = token if seen == end else None
+        return [_format_study(s) for s in studies], next_token
     except Exception as e:
-        return [{"error": str(e)}]
-    return []
+        return [{"error": str(e)}], None
 
-def get_pubmed(count=10, query="health"):
+def get_clinical_trials(count=20, query=None, offset=0):
+    return fetch_clinical_trials(count, query, offset)[0]
+
+def get_pubmed(count=10, query="health", offset=0):
     try:
-        search_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?db=pubmed&term={query}&retmax={count}&retmode=json&sort=date"
-        resp = requests.get(search_url, headers=HEADERS, timeout=15)
+        search_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?db=pubmed&term={query}&retmax={count}&retstart={offset}&retmode=json&sort=date"
+        resp = http_client.get(search_url, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             ids = resp.json().get('esearchresult', {}).get('idlist', [])
             if ids:
                 id_str = ','.join(ids)
                 summary_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi?db=pubmed&id={id_str}&retmode=json"
-                resp2 = requests.get(summary_url, headers=HEADERS, timeout=15)
+                resp2 = http_client.get(summary_url, headers=HEADERS, timeout=15)
                 if resp2.status_code == 200:
                     result = resp2.json().get('result', {})
                     articles = []
@@ -54,12 +83,13 @@ def get_pubmed(count=10, query="health"):
 def get_nih_data(api_key=None, params=None):
     sub = (params or {}).get('sub_section', 'clinical_trials')
     query = (params or {}).get('query', '')
-    mapping = {
-        'clinical_trials': lambda: get_clinical_trials(query=query),
-        'pubmed': lambda: get_pubmed(query=query or 'health'),
-    }
-    fn = mapping.get(sub, mapping['clinical_trials'])
-    return {"results": fn(), "source": "NIH/NLM", "endpoint": sub}
+    limit = (params or {}).get('limit')
+    offset = (params or {}).get('offset') or 0
+    if sub == 'pubmed':
+        return {"results": get_pubmed(limit or 10, query=query or 'health', offset=offset), "source": "NIH/NLM", "endpoint": sub}
+    studies, next_token = fetch_clinical_trials(limit or 20, query=query, offset=offset,
+                                                page_token=(params or {}).get('page_token'))
+    return {"results": studies, "source": "NIH/NLM", "endpoint": sub, "next_page_token": next_token}
 
 def get_metadata():
     return {
@@ -68,8 +98,8 @@ def get_metadata():
         "description": "Clinical trials, PubMed research articles, and biomedical data",
         "endpoints": ["Clinical Trials", "PubMed Articles"],
         "sub_sections": [
-            {"id": "clinical_trials", "name": "Clinical Trials"},
-            {"id": "pubmed", "name": "PubMed Research"},
+            {"id": "clinical_trials", "name": "Clinical Trials", "cache_ttl": 3600},
+            {"id": "pubmed", "name": "PubMed Research", "cache_ttl": 3600},
         ],
         "has_search": True,
         "search_placeholder": "Search clinical trials or research...",
@@ -1,68 +1,106 @@
 """NIST - National Institute of Standards and Technology (NVD) API Module"""
-import requests
+from api import async_http, http_client
 
 BASE_URL = "https://services.nvd.nist.gov/rest/json"
 HEADERS = {'Accept': 'application/json'}
 
-def get_recent_cves(count=20):
+def _recent_url(count, offset):
+    return f"{BASE_URL}/cves/2.0?resultsPerPage={count}&startIndex={offset}"
+
+def _search_url(query, count, offset):
+    return f"{BASE_URL}/cves/2.0?keywordSearch={query}&resultsPerPage={count}&startIndex={offset}"
+
+def _format_recent(vulns, count):
+    results = []
+    for v in vulns[:count]:
+        cve = v.get('cve', {})
+        desc_list = cve.get('descriptions', [])
+        desc = next((d.get('value', '') for d in desc_list if d.get('lang') == 'en'), '')
+        metrics = cve.get('metrics', {})
+        cvss = ''
+        if metrics.get('cvssMetricV31'):
+            cvss = metrics['cvssMetricV31'][0].get('cvssData', {}).get('baseScore', '')
+        elif metrics.get('cvssMetricV2'):
+            cvss = metrics['cvssMetricV2'][0].get('cvssData', {}).get('baseScore', '')
+        results.append({
+            'title': cve.get('id', ''),
+            'description': desc[:300],
+            'date': cve.get('published', ''),
+            'link': f"https://nvd.nist.gov/vuln/detail/{cve.get('id', '')}",
+            'cvss_score': cvss,
+            'source': cve.get('sourceIdentifier', '')
+        })
+    return results
+
+def _format_search(vulns, count):
+    results = []
+    for v in vulns[:count]:
+        cve = v.get('cve', {})
+        desc_list = cve.get('descriptions', [])
+        desc = next((d.get('value', '') for d in desc_list if d.get('lang') == 'en'), '')
+        results.append({
+            'title': cve.get('id', ''),
+            'description': desc[:300],
+            'date': cve.get('published', ''),
+            'link': f"https://nvd.nist.gov/vuln/detail/{cve.get('id', '')}",
+        })
+    return results
+
+def get_recent_cves(count=20, offset=0):
     """Fetch recent CVE vulnerability records."""
     try:
-        url = f"{BASE_URL}/cves/2.0?resultsPerPage={count}"
-        resp = requests.get(url, headers=HEADERS, timeout=20)
+        resp = http_client.get(_recent_url(count, offset), headers=HEADERS, timeout=20)
         if resp.status_code == 200:
-            vulns = resp.json().get('vulnerabilities', [])
-            results = []
-            for v in vulns[:count]:
-                cve = v.get('cve', {})
-                desc_list = cve.get('descriptions', [])
-                desc = next((d.get('value', '') for d in desc_list if d.get('lang') == 'en'), '')
-                metrics = cve.get('metrics', {})
-                cvss = ''
-                if metrics.get('cvssMetricV31'):
-                    cvss = metrics['cvssMetricV31'][0].get('cvssData', {}).get('baseScore', '')
-                elif metrics.get('cvssMetricV2'):
-                    cvss = metrics['cvssMetricV2'][0].get('cvssData', {}).get('baseScore', '')
-                results.append({
-                    'title': cve.get('id', ''),
-                    'description': desc[:300],
-                    'date': cve.get('published', ''),
-                    'link': f"https://nvd.nist.gov/vuln/detail/{cve.get('id', '')}",
-                    'cvss_score': cvss,
-                    'source': cve.get('sourceIdentifier', '')
-                })
-            return results
+            return _format_recent(resp.json().get('vulnerabilities', []), count)
     except Exception as e:
         return [{"error": str(e)}]
     return []
 
-def search_cves(query, count=20):
+def search_cves(query, count=20, offset=0):
     """Search CVEs by keyword."""
     try:
-        url = f"{BASE_URL}/cves/2.0?keywordSearch={query}&resultsPerPage={count}"
-        resp = requests.get(url, headers=HEADERS, timeout=20)
+        resp = http_client.get(_search_url(query, count, offset), headers=HEADERS, timeout=20)
+        if resp.status_code == 200:
+            return _format_search(resp.json().get('vulnerabilities', []), count)
+    except Exception as e:
+        return [{"error": str(e)}]
+    return []
+
+async def aget_recent_cves(count=20, offset=0):
+    """Async get_recent_cves."""
+    try:
+        resp = await async_http.get(_recent_url(count, offset), headers=HEADERS, timeout=20)
         if resp.status_code == 200:
-            vulns = resp.json().get('vulnerabilities', [])
-            results = []
-            for v in vulns[:count]:
-                cve = v.get('cve', {})
-                desc_list = cve.get('descriptions', [])
-                desc = next((d.get('value', '') for d in desc_list if d.get('lang') == 'en'), '')
-                results.append({
-                    'title': cve.get('id', ''),
-                    'description': desc[:300],
-                    'date': cve.get('published', ''),
-                    'link': f"https://nvd.nist.gov/vuln/detail/{cve.get('id', '')}",
-                })
-            return results
+            return _format_recent(resp.json().get('vulnerabilities', []), count)
+    except Exception as e:
+        return [{"error": str(e)}]
+    return []
+
+async def asearch_cves(query, count=20, offset=0):
+    """Async search_cves."""
+    try:
+        resp = await async_http.get(_search_url(query, count, offset), headers=HEADERS, timeout=20)
+        if resp.status_code == 200:
+            return _format_search(resp.json().get('vulnerabilities', []), count)
     except Exception as e:
         return [{"error": str(e)}]
     return []
 
 def get_nist_data(api_key=None, params=None):
     query = (params or {}).get('query', '')
+    count = (params or {}).get('limit') or 20
+    offset = (params or {}).get('offset') or 0
+    if query:
+        return {"results": search_cves(query, count, offset), "source": "NIST NVD", "endpoint": "CVE Search"}
+    return {"results": get_recent_cves(count, offset), "source": "NIST NVD", "endpoint": "Recent CVEs"}
+
+async def aget_nist_data(api_key=None, params=None):
+    query = (params or {}).get('query', '')
+    count = (params or {}).get('limit') or 20
+    offset = (params or {}).get('offset') or 0
     if query:
-        return {"results": search_cves(query), "source": "NIST NVD", "endpoint": "CVE Search"}
-    return {"results": get_recent_cves(), "source": "NIST NVD", "endpoint": "Recent CVEs"}
+        return {"results": await asearch_cves(query, count, offset), "source": "NIST NVD", "endpoint": "CVE Search"}
+    return {"results": await aget_recent_cves(count, offset), "source": "NIST NVD", "endpoint": "Recent CVEs"}
 
 def get_metadata():
     return {
@@ -71,7 +109,7 @@ def get_metadata():
         "description": "National Vulnerability Database - CVE records, CVSS scores, and cybersecurity vulnerability data",
         "endpoints": ["Recent CVEs", "CVE Search"],
         "sub_sections": [
-            {"id": "recent_cves", "name": "Recent Vulnerabilities"},
+            {"id": "recent_cves", "name": "Recent Vulnerabilities", "cache_ttl": 600},
         ],
         "has_search": True,
         "search_placeholder": "Search CVEs by keyword (e.g., 'apache', 'windows')...",
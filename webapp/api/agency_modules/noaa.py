@@ -1,14 +1,16 @@
 """NOAA - National Oceanic and Atmospheric Administration API Module"""
-import requests
+from api import http_client
 
 NWS_BASE = "https://api.weather.gov"
 HEADERS = {'User-Agent': 'OpenGovDash Research Tool 1.0', 'Accept': 'application/geo+json'}
 
-def get_active_alerts(count=20):
+def get_active_alerts(count=20, offset=0):
     try:
-        resp = requests.get(f"{NWS_BASE}/alerts/active", headers=HEADERS, timeout=15)
+        # /alerts/active has a limit but no offset, so ask for just enough to cover the window
+        resp = http_client.get(f"{NWS_BASE}/alerts/active", params={"limit": offset + count},
+                               headers=HEADERS, timeout=15)
         if resp.status_code == 200:
-            features = resp.json().get('features', [])[:count]
+            features = resp.json().get('features', [])[offset:offset + count]
             return [{
                 'title': f.get('properties', {}).get('headline', ''),
                 'description': (f.get('properties', {}).get('description', '') or '')[:300],
@@ -22,16 +24,16 @@ def get_active_alerts(count=20):
         return [{"error": str(e)}]
     return []
 
-def get_weather_forecast(lat=38.8894, lon=-77.0352):
+def get_weather_forecast(count=20, offset=0, lat=38.8894, lon=-77.0352):
     """Get forecast for a location (default: Washington DC)."""
     try:
-        resp = requests.get(f"{NWS_BASE}/points/{lat},{lon}", headers=HEADERS, timeout=15)
+        resp = http_client.get(f"{NWS_BASE}/points/{lat},{lon}", headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             forecast_url = resp.json().get('properties', {}).get('forecast', '')
             if forecast_url:
-                resp2 = requests.get(forecast_url, headers=HEADERS, timeout=15)
+                resp2 = http_client.get(forecast_url, headers=HEADERS, timeout=15)
                 if resp2.status_code == 200:
-                    periods = resp2.json().get('properties', {}).get('periods', [])
+                    periods = resp2.json().get('properties', {}).get('periods', [])[offset:offset + count]
                     return [{
                         'title': p.get('name', ''),
                         'description': p.get('detailedForecast', ''),
@@ -51,7 +53,9 @@ def get_noaa_data(api_key=None, params=None):
         'forecast': get_weather_forecast,
     }
     fn = mapping.get(sub, mapping['alerts'])
-    return {"results": fn(), "source": "NOAA/NWS", "endpoint": sub}
+    count = (params or {}).get('limit') or 20
+    offset = (params or {}).get('offset') or 0
+    return {"results": fn(count, offset), "source": "NOAA/NWS", "endpoint": sub}
 
 def get_metadata():
     return {
@@ -60,8 +64,8 @@ def get_metadata():
         "description": "Weather alerts, forecasts, and climate data from the National Weather Service",
         "endpoints": ["Active Weather Alerts", "Weather Forecast"],
         "sub_sections": [
-            {"id": "alerts", "name": "Active Weather Alerts"},
-            {"id": "forecast", "name": "Weather Forecast (DC)"},
+            {"id": "alerts", "name": "Active Weather Alerts", "cache_ttl": 120},
+            {"id": "forecast", "name": "Weather Forecast (DC)", "cache_ttl": 900},
         ],
         "has_search": False,
         "auth_required": False,
@@ -1,14 +1,14 @@
 """SAM.gov - System for Award Management API Module"""
-import requests
+from api import http_client
 
 HEADERS = {'Accept': 'application/json'}
 
-def get_opportunities(count=20, api_key=None):
+def get_opportunities(count=20, api_key=None, offset=0):
     """Fetch federal contract opportunities."""
     try:
         key = api_key or ''
-        url = f"https://api.sam.gov/opportunities/v2/search?limit={count}&api_key={key}&postedFrom=01/01/2025&postedTo=12/31/2026"
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        url = f"https://api.sam.gov/opportunities/v2/search?limit={count}&offset={offset}&api_key={key}&postedFrom=01/01/2025&postedTo=12/31/2026"
+        resp = http_client.get(url, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             opps = resp.json().get('opportunitiesData', [])
             return [{
@@ -25,7 +25,9 @@ def get_opportunities(count=20, api_key=None):
     return []
 
 def get_sam_data(api_key=None, params=None):
-    return {"results": get_opportunities(api_key=api_key), "source": "SAM.gov", "endpoint": "Contract Opportunities"}
+    count = (params or {}).get('limit') or 20
+    offset = (params or {}).get('offset') or 0
+    return {"results": get_opportunities(count, api_key=api_key, offset=offset), "source": "SAM.gov", "endpoint": "Contract Opportunities"}
 
 def get_metadata():
     return {
@@ -34,7 +36,7 @@ def get_metadata():
         "description": "Federal contract opportunities, entity registrations, and procurement data",
         "endpoints": ["Contract Opportunities"],
         "sub_sections": [
-            {"id": "opportunities", "name": "Contract Opportunities"},
+            {"id": "opportunities", "name": "Contract Opportunities", "cache_ttl": 900},
         ],
         "has_search": True,
         "search_placeholder": "Search contract opportunities...",
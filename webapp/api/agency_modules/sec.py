@@ -1,5 +1,5 @@
 """SEC - Securities and Exchange Commission API Module"""
-import requests
+from api import hedge, http_client
 
 BASE_URL = "https://efts.sec.gov/LATEST/search-index"
 EDGAR_FULL_TEXT = "https://efts.sec.gov/LATEST/search-index"
@@ -11,70 +11,67 @@ HEADERS = {
     'Accept': 'application/json'
 }
 
-def get_recent_filings(filing_type="8-K", count=20):
-    """Fetch recent SEC EDGAR filings via full-text search."""
-    url = "https://efts.sec.gov/LATEST/search-index"
-    params = {
-        "q": "*",
-        "dateRange": "custom",
-        "forms": filing_type,
-        "from": 0,
-        "size": count
-    }
-    try:
-        # Use the EDGAR full-text search API
-        search_url = f"https://efts.sec.gov/LATEST/search-index?q=%22{filing_type}%22&forms={filing_type}"
-        resp = requests.get(search_url, headers=HEADERS, timeout=15)
-        if resp.status_code == 200:
-            data = resp.json()
-            hits = data.get('hits', {}).get('hits', [])
-            results = []
-            for hit in hits[:count]:
-                src = hit.get('_source', {})
-                results.append({
-                    'title': src.get('display_names', [''])[0] if src.get('display_names') else src.get('entity_name', ''),
-                    'description': f"{filing_type} filing - {src.get('file_description', '')}",
-                    'date': src.get('file_date', ''),
-                    'link': f"https://www.sec.gov/Archives/edgar/data/{src.get('entity_id', '')}" if src.get('entity_id') else '',
-                    'form_type': src.get('form_type', filing_type),
-                    'cik': src.get('entity_id', '')
-                })
-            return results
-    except Exception:
-        pass
+def _full_text_filings(filing_type, count, offset):
+    """Recent filings via EDGAR full-text search; None if it did not answer."""
+    # Use the EDGAR full-text search API
+    search_url = f"https://efts.sec.gov/LATEST/search-index?q=%22{filing_type}%22&forms={filing_type}&from={offset}&size={count}"
+    resp = http_client.get(search_url, headers=HEADERS, timeout=15)
+    if resp.status_code != 200:
+        return None
+    data = resp.json()
+    hits = data.get('hits', {}).get('hits', [])
+    results = []
+    for hit in hits[:count]:
+        src = hit.get('_source', {})
+        results.append({
+            'title': src.get('display_names', [''])[0] if src.get('display_names') else src.get('entity_name', ''),
+            'description': f"{filing_type} filing - {src.get('file_description', '')}",
+            'date': src.get('file_date', ''),
+            'link': f"https://www.sec.gov/Archives/edgar/data/{src.get('entity_id', '')}" if src.get('entity_id') else '',
+            'form_type': src.get('form_type', filing_type),
+            'cik': src.get('entity_id', '')
+        })
+    return results
+
+def _atom_filings(filing_type, count, offset):
+    """Recent filings via the EDGAR Atom feed; None if it did not answer."""
+    import xmltodict
+    url = f"https://www.sec.gov/cgi-bin/browse-edgar?action=getcurrent&type={filing_type}&start={offset}&count={count}&output=atom"
+    resp = http_client.get(url, headers=HEADERS, timeout=15)
+    if resp.status_code != 200:
+        return None
+    data = xmltodict.parse(resp.content)
+    entries = data.get('feed', {}).get('entry', [])
+    if not isinstance(entries, list):
+        entries = [entries]
+    results = []
+    for entry in entries:
+        link = entry.get('link', {})
+        href = link.get('@href', '') if isinstance(link, dict) else ''
+        results.append({
+            'title': entry.get('title', ''),
+            'description': entry.get('summary', {}).get('#text', '') if isinstance(entry.get('summary'), dict) else str(entry.get('summary', '')),
+            'date': entry.get('updated', ''),
+            'link': href,
+            'form_type': filing_type,
+            'cik': ''
+        })
+    return results
 
-    # Fallback: EDGAR RSS feed
+def get_recent_filings(filing_type="8-K", count=20, offset=0):
+    """Fetch recent SEC EDGAR filings via full-text search, hedged with the Atom feed."""
     try:
-        import xmltodict
-        url = f"https://www.sec.gov/cgi-bin/browse-edgar?action=getcurrent&type={filing_type}&count={count}&output=atom"
-        resp = requests.get(url, headers=HEADERS, timeout=15)
-        if resp.status_code == 200:
-            data = xmltodict.parse(resp.content)
-            entries = data.get('feed', {}).get('entry', [])
-            if not isinstance(entries, list):
-                entries = [entries]
-            results = []
-            for entry in entries:
-                link = entry.get('link', {})
-                href = link.get('@href', '') if isinstance(link, dict) else ''
-                results.append({
-                    'title': entry.get('title', ''),
-                    'description': entry.get('summary', {}).get('#text', '') if isinstance(entry.get('summary'), dict) else str(entry.get('summary', '')),
-                    'date': entry.get('updated', ''),
-                    'link': href,
-                    'form_type': filing_type,
-                    'cik': ''
-                })
-            return results
+        return hedge.hedge(lambda: _full_text_filings(filing_type, count, offset),
+                           lambda: _atom_filings(filing_type, count, offset),
+                           name='sec.filings') or []
     except Exception as e:
         return [{"error": str(e)}]
-    return []
 
-def search_company(query, count=10):
+def search_company(query, count=10, offset=0):
     """Search for company filings by name or CIK."""
-    url = f"https://efts.sec.gov/LATEST/search-index?q=%22{query}%22&from=0&size={count}"
+    url = f"https://efts.sec.gov/LATEST/search-index?q=%22{query}%22&from={offset}&size={count}"
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        resp = http_client.get(url, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             data = resp.json()
             hits = data.get('hits', {}).get('hits', [])
@@ -92,14 +89,16 @@ def get_sec_data(api_key=None, params=None):
     """Main entry: fetch SEC data based on params."""
     sub = (params or {}).get('sub_section', '8-K')
     query = (params or {}).get('query', '')
+    limit = (params or {}).get('limit')
+    offset = (params or {}).get('offset') or 0
     if query:
-        return {"results": search_company(query), "source": "SEC EDGAR", "endpoint": "Company Search"}
+        return {"results": search_company(query, limit or 10, offset), "source": "SEC EDGAR", "endpoint": "Company Search"}
     filing_types = {
         '8-K': '8-K', '10-K': '10-K', '10-Q': '10-Q',
         '13F': '13F-HR', 'S-1': 'S-1', '20-F': '20-F'
     }
     ft = filing_types.get(sub, sub)
-    return {"results": get_recent_filings(ft), "source": "SEC EDGAR", "endpoint": f"{ft} Filings"}
+    return {"results": get_recent_filings(ft, limit or 20, offset), "source": "SEC EDGAR", "endpoint": f"{ft} Filings"}
 
 def get_metadata():
     return {
@@ -108,11 +107,11 @@ def get_metadata():
         "description": "Corporate filings, financial disclosures, and securities data from EDGAR",
         "endpoints": ["8-K Filings", "10-K Annual Reports", "10-Q Quarterly", "13F Holdings", "S-1 IPO Filings", "Company Search"],
         "sub_sections": [
-            {"id": "8-K", "name": "8-K Current Reports"},
-            {"id": "10-K", "name": "10-K Annual Reports"},
-            {"id": "10-Q", "name": "10-Q Quarterly Reports"},
-            {"id": "13F", "name": "13F Holdings"},
-            {"id": "S-1", "name": "S-1 IPO Filings"},
+            {"id": "8-K", "name": "8-K Current Reports", "cache_ttl": 300},
+            {"id": "10-K", "name": "10-K Annual Reports", "cache_ttl": 300},
+            {"id": "10-Q", "name": "10-Q Quarterly Reports", "cache_ttl": 300},
+            {"id": "13F", "name": "13F Holdings", "cache_ttl": 300},
+            {"id": "S-1", "name": "S-1 IPO Filings", "cache_ttl": 300},
         ],
         "has_search": True,
         "search_placeholder": "Search company name or CIK...",
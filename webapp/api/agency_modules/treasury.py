@@ -1,24 +1,26 @@
 """US Treasury - Fiscal Data API Module"""
-import requests
+from api import http_client
+from api.paging import page_window
 
 BASE_URL = "https://api.fiscaldata.treasury.gov/services/api/fiscal_service"
 HEADERS = {'Accept': 'application/json'}
 
-def fetch_endpoint(endpoint, params=None, count=20):
+def fetch_endpoint(endpoint, params=None, count=20, offset=0):
     url = f"{BASE_URL}/{endpoint}"
-    default_params = {"page[size]": count, "sort": "-record_date"}
+    size, page, skip = page_window(offset, count)
+    default_params = {"page[size]": size, "page[number]": page + 1, "sort": "-record_date"}
     if params:
         default_params.update(params)
     try:
-        resp = requests.get(url, params=default_params, headers=HEADERS, timeout=15)
+        resp = http_client.get(url, params=default_params, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
-            return resp.json().get('data', [])
+            return resp.json().get('data', [])[skip:skip + count]
     except Exception as e:
         return [{"error": str(e)}]
     return []
 
-def get_national_debt(count=20):
-    results = fetch_endpoint("v2/accounting/od/debt_to_penny", count=count)
+def get_national_debt(count=20, offset=0):
+    results = fetch_endpoint("v2/accounting/od/debt_to_penny", count=count, offset=offset)
     return [{
         'title': f"Total Public Debt: ${r.get('tot_pub_debt_out_amt', 'N/A')}",
         'description': f"Debt held by public: ${r.get('debt_held_public_amt', 'N/A')} | Intragovt: ${r.get('intragov_hold_amt', 'N/A')}",
@@ -27,8 +29,8 @@ def get_national_debt(count=20):
         'amount': r.get('tot_pub_debt_out_amt', '')
     } for r in results]
 
-def get_treasury_statements(count=20):
-    results = fetch_endpoint("v1/accounting/dts/dts_table_1", count=count)
+def get_treasury_statements(count=20, offset=0):
+    results = fetch_endpoint("v1/accounting/dts/dts_table_1", count=count, offset=offset)
     return [{
         'title': f"{r.get('account_type', '')} - {r.get('classification_desc', '')}",
         'description': f"Today: ${r.get('today_amt', 'N/A')} | MTD: ${r.get('mtd_amt', 'N/A')} | FYTD: ${r.get('fytd_amt', 'N/A')}",
@@ -36,8 +38,8 @@ def get_treasury_statements(count=20):
         'link': 'https://fiscaldata.treasury.gov/datasets/daily-treasury-statement/',
     } for r in results]
 
-def get_interest_rates(count=20):
-    results = fetch_endpoint("v2/accounting/od/avg_interest_rates", count=count)
+def get_interest_rates(count=20, offset=0):
+    results = fetch_endpoint("v2/accounting/od/avg_interest_rates", count=count, offset=offset)
     return [{
         'title': f"{r.get('security_desc', '')}",
         'description': f"Avg Interest Rate: {r.get('avg_interest_rate_amt', '')}%",
@@ -46,8 +48,8 @@ def get_interest_rates(count=20):
         'rate': r.get('avg_interest_rate_amt', '')
     } for r in results]
 
-def get_exchange_rates(count=20):
-    results = fetch_endpoint("v1/accounting/od/rates_of_exchange", count=count)
+def get_exchange_rates(count=20, offset=0):
+    results = fetch_endpoint("v1/accounting/od/rates_of_exchange", count=count, offset=offset)
     return [{
         'title': f"{r.get('country', '')} ({r.get('currency', '')})",
         'description': f"Exchange Rate: {r.get('exchange_rate', '')} per USD",
@@ -64,7 +66,9 @@ def get_treasury_data(api_key=None, params=None):
         'exchange_rates': get_exchange_rates,
     }
     fn = mapping.get(sub, mapping['national_debt'])
-    return {"results": fn(), "source": "US Treasury Fiscal Data", "endpoint": sub}
+    count = (params or {}).get('limit') or 20
+    offset = (params or {}).get('offset') or 0
+    return {"results": fn(count, offset), "source": "US Treasury Fiscal Data", "endpoint": sub}
 
 def get_metadata():
     return {
@@ -73,10 +77,10 @@ def get_metadata():
         "description": "Federal debt, daily treasury statements, interest rates, and exchange rates",
         "endpoints": ["National Debt", "Daily Statements", "Interest Rates", "Exchange Rates"],
         "sub_sections": [
-            {"id": "national_debt", "name": "National Debt"},
-            {"id": "daily_statements", "name": "Daily Treasury Statements"},
-            {"id": "interest_rates", "name": "Average Interest Rates"},
-            {"id": "exchange_rates", "name": "Exchange Rates"},
+            {"id": "national_debt", "name": "National Debt", "cache_ttl": 3600},
+            {"id": "daily_statements", "name": "Daily Treasury Statements", "cache_ttl": 3600},
+            {"id": "interest_rates", "name": "Average Interest Rates", "cache_ttl": 86400},
+            {"id": "exchange_rates", "name": "Exchange Rates", "cache_ttl": 86400},
         ],
         "has_search": False,
         "auth_required": False,
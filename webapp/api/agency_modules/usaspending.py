@@ -1,16 +1,18 @@
 """USAspending.gov API Module - Federal Spending Data"""
-import requests
+from api import http_client
+from api.paging import page_window
 
 BASE_URL = "https://api.usaspending.gov/api/v2"
 HEADERS = {'Content-Type': 'application/json', 'Accept': 'application/json'}
+MAX_PAGE_SIZE = 100  # search and federal_accounts endpoints cap limit at 100
 
-def get_top_agencies(count=20):
+def get_top_agencies(count=20, offset=0):
     try:
         url = f"{BASE_URL}/references/toptier_agencies/"
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        resp = http_client.get(url, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             data = resp.json()
-            results = data.get('results', [])[:count]
+            results = data.get('results', [])[offset:offset + count]
             return [{
                 'title': r.get('agency_name', ''),
                 'description': f"Budget: ${r.get('budget_authority_amount', 0):,.0f} | Obligated: ${r.get('obligated_amount', 0):,.0f}",
@@ -24,21 +26,22 @@ def get_top_agencies(count=20):
         return [{"error": str(e)}]
     return []
 
-def search_spending(query, count=20):
+def search_spending(query, count=20, offset=0):
     try:
         url = f"{BASE_URL}/search/spending_by_award/"
+        size, page, skip = page_window(offset, count, MAX_PAGE_SIZE)
         payload = {
             "filters": {
                 "keywords": [query],
                 "time_period": [{"start_date": "2024-01-01", "end_date": "2026-12-31"}]
             },
             "fields": ["Award ID", "Recipient Name", "Award Amount", "Description", "Start Date", "Awarding Agency"],
-            "limit": count,
-            "page": 1,
+            "limit": size,
+            "page": page + 1,
             "sort": "Award Amount",
             "order": "desc"
         }
-        resp = requests.post(url, json=payload, headers=HEADERS, timeout=15)
+        resp = http_client.post(url, json=payload, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             data = resp.json()
             return [{
@@ -48,16 +51,17 @@ def search_spending(query, count=20):
                 'link': f"https://www.usaspending.gov/award/{r.get('internal_id', '')}",
                 'amount': r.get('Award Amount', 0),
                 'agency': r.get('Awarding Agency', '')
-            } for r in data.get('results', [])]
+            } for r in data.get('results', [])[skip:skip + count]]
     except Exception as e:
         return [{"error": str(e)}]
     return []
 
-def get_federal_accounts(count=20):
+def get_federal_accounts(count=20, offset=0):
     try:
         url = f"{BASE_URL}/federal_accounts/"
-        payload = {"sort": {"field": "budgetary_resources", "direction": "desc"}, "limit": min(count, 100), "page": 1}
-        resp = requests.post(url, json=payload, headers=HEADERS, timeout=15)
+        size, page, skip = page_window(offset, count, MAX_PAGE_SIZE)
+        payload = {"sort": {"field": "budgetary_resources", "direction": "desc"}, "limit": size, "page": page + 1}
+        resp = http_client.post(url, json=payload, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             data = resp.json()
             return [{
@@ -66,7 +70,7 @@ def get_federal_accounts(count=20):
                 'date': '',
                 'link': f"https://www.usaspending.gov/federal_account/{r.get('account_number', '')}",
                 'budget': r.get('budgetary_resources', 0)
-            } for r in data.get('results', [])]
+            } for r in data.get('results', [])[skip:skip + count]]
     except Exception as e:
         return [{"error": str(e)}]
     return []
@@ -74,7 +78,8 @@ def get_federal_accounts(count=20):
 def get_usaspending_data(api_key=None, params=None):
     sub = (params or {}).get('sub_section', 'top_agencies')
     query = (params or {}).get('query', '')
-    limit = (params or {}).get('limit', 100)
+    limit = (params or {}).get('limit') or 100
+    offset = (params or {}).get('offset') or 0
 
     if query and sub in ('top_agencies', 'federal_accounts'):
         # Filter within the current sub-section instead of switching to award search
@@ -86,17 +91,17 @@ def get_usaspending_data(api_key=None, params=None):
         all_results = fn(count=100)  # API max is 100 per page
         q_lower = query.lower()
         filtered = [r for r in all_results if q_lower in (r.get('title', '') + ' ' + r.get('description', '')).lower()]
-        return {"results": filtered[:limit], "source": "USAspending.gov", "endpoint": sub}
+        return {"results": filtered[offset:offset + limit], "source": "USAspending.gov", "endpoint": sub}
 
     if query:
-        return {"results": search_spending(query, count=limit), "source": "USAspending.gov", "endpoint": "Award Search"}
+        return {"results": search_spending(query, count=limit, offset=offset), "source": "USAspending.gov", "endpoint": "Award Search"}
 
     mapping = {
         'top_agencies': get_top_agencies,
         'federal_accounts': get_federal_accounts,
     }
     fn = mapping.get(sub, mapping['top_agencies'])
-    return {"results": fn(count=limit), "source": "USAspending.gov", "endpoint": sub}
+    return {"results": fn(count=limit, offset=offset), "source": "USAspending.gov", "endpoint": sub}
 
 def get_metadata():
     return {
@@ -105,8 +110,9 @@ def get_metadata():
         "description": "Federal spending, contracts, grants, and budget data across all agencies",
         "endpoints": ["Top Agencies by Budget", "Federal Accounts", "Award Search"],
         "sub_sections": [
-            {"id": "top_agencies", "name": "Top Agencies by Budget"},
-            {"id": "federal_accounts", "name": "Federal Accounts"},
+            {"id": "top_agencies", "name": "Top Agencies by Budget", "cache_ttl": 3600},
+            {"id": "federal_accounts", "name": "Federal Accounts", "cache_ttl": 3600},
+            {"id": "award_search", "name": "Award Search", "cache_ttl": 3600},
         ],
         "has_search": True,
         "search_placeholder": "Search contracts, grants, recipients...",
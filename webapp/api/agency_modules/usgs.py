@@ -1,41 +1,72 @@
 """USGS - United States Geological Survey API Module"""
-import requests
+from api import async_http, http_client
 
 HEADERS = {'Accept': 'application/json'}
 
-def get_earthquakes(count=20, min_magnitude=2.5):
+def _earthquakes_url(count, offset, min_magnitude):
+    # FDSN offsets are 1-based
+    return f"https://earthquake.usgs.gov/fdsnws/event/1/query?format=geojson&limit={count}&offset={offset + 1}&minmagnitude={min_magnitude}&orderby=time"
+
+def _format_earthquakes(features):
+    return [{
+        'title': f.get('properties', {}).get('title', ''),
+        'description': f"Magnitude: {f.get('properties', {}).get('mag', '')} | Type: {f.get('properties', {}).get('type', '')} | Depth: {f.get('geometry', {}).get('coordinates', [0,0,0])[2]}km",
+        'date': f.get('properties', {}).get('time', ''),
+        'link': f.get('properties', {}).get('url', ''),
+        'magnitude': f.get('properties', {}).get('mag', ''),
+        'place': f.get('properties', {}).get('place', ''),
+        'tsunami': f.get('properties', {}).get('tsunami', 0)
+    } for f in features]
+
+def get_earthquakes(count=20, offset=0, min_magnitude=2.5):
     """Fetch recent earthquake data."""
     try:
-        url = f"https://earthquake.usgs.gov/fdsnws/event/1/query?format=geojson&limit={count}&minmagnitude={min_magnitude}&orderby=time"
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        resp = http_client.get(_earthquakes_url(count, offset, min_magnitude), headers=HEADERS, timeout=15)
         if resp.status_code == 200:
-            features = resp.json().get('features', [])
-            return [{
-                'title': f.get('properties', {}).get('title', ''),
-                'description': f"Magnitude: {f.get('properties', {}).get('mag', '')} | Type: {f.get('properties', {}).get('type', '')} | Depth: {f.get('geometry', {}).get('coordinates', [0,0,0])[2]}km",
-                'date': f.get('properties', {}).get('time', ''),
-                'link': f.get('properties', {}).get('url', ''),
-                'magnitude': f.get('properties', {}).get('mag', ''),
-                'place': f.get('properties', {}).get('place', ''),
-                'tsunami': f.get('properties', {}).get('tsunami', 0)
-            } for f in features]
+            return _format_earthquakes(resp.json().get('features', []))
     except Exception as e:
         return [{"error": str(e)}]
     return []
 
-def get_water_data(count=20):
+async def aget_earthquakes(count=20, offset=0, min_magnitude=2.5):
+    """Async get_earthquakes."""
+    try:
+        resp = await async_http.get(_earthquakes_url(count, offset, min_magnitude), headers=HEADERS, timeout=15)
+        if resp.status_code == 200:
+            return _format_earthquakes(resp.json().get('features', []))
+    except Exception as e:
+        return [{"error": str(e)}]
+    return []
+
+WATER_URL = "https://waterservices.usgs.gov/nwis/iv/?format=json&stateCd=CA&parameterCd=00060&siteStatus=active"
+
+def _format_water(ts):
+    return [{
+        'title': t.get('sourceInfo', {}).get('siteName', ''),
+        'description': f"Variable: {t.get('variable', {}).get('variableDescription', '')} | Value: {t.get('values', [{}])[0].get('value', [{}])[0].get('value', '') if t.get('values') else 'N/A'}",
+        'date': t.get('values', [{}])[0].get('value', [{}])[0].get('dateTime', '') if t.get('values') else '',
+        'link': f"https://waterdata.usgs.gov/nwis/uv?site_no={t.get('sourceInfo', {}).get('siteCode', [{}])[0].get('value', '')}",
+    } for t in ts]
+
+def get_water_data(count=20, offset=0):
     """Fetch real-time water data from USGS."""
     try:
-        url = f"https://waterservices.usgs.gov/nwis/iv/?format=json&stateCd=CA&parameterCd=00060&siteStatus=active"
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        resp = http_client.get(WATER_URL, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
-            ts = resp.json().get('value', {}).get('timeSeries', [])[:count]
-            return [{
-                'title': t.get('sourceInfo', {}).get('siteName', ''),
-                'description': f"Variable: {t.get('variable', {}).get('variableDescription', '')} | Value: {t.get('values', [{}])[0].get('value', [{}])[0].get('value', '') if t.get('values') else 'N/A'}",
-                'date': t.get('values', [{}])[0].get('value', [{}])[0].get('dateTime', '') if t.get('values') else '',
-                'link': f"https://waterdata.usgs.gov/nwis/uv?site_no={t.get('sourceInfo', {}).get('siteCode', [{}])[0].get('value', '')}",
-            } for t in ts]
+            # NWIS instantaneous values have no paging; window the series here.
+            ts = resp.json().get('value', {}).get('timeSeries', [])[offset:offset + count]
+            return _format_water(ts)
+    except Exception as e:
+        return [{"error": str(e)}]
+    return []
+
+async def aget_water_data(count=20, offset=0):
+    """Async get_water_data."""
+    try:
+        resp = await async_http.get(WATER_URL, headers=HEADERS, timeout=15)
+        if resp.status_code == 200:
+            ts = resp.json().get('value', {}).get('timeSeries', [])[offset:offset + count]
+            return _format_water(ts)
     except Exception as e:
         return [{"error": str(e)}]
     return []
@@ -47,7 +78,20 @@ def get_usgs_data(api_key=None, params=None):
         'water': get_water_data,
     }
     fn = mapping.get(sub, mapping['earthquakes'])
-    return {"results": fn(), "source": "USGS", "endpoint": sub}
+    count = (params or {}).get('limit') or 20
+    offset = (params or {}).get('offset') or 0
+    return {"results": fn(count, offset), "source": "USGS", "endpoint": sub}
+
+async def aget_usgs_data(api_key=None, params=None):
+    sub = (params or {}).get('sub_section', 'earthquakes')
+    mapping = {
+        'earthquakes': aget_earthquakes,
+        'water': aget_water_data,
+    }
+    fn = mapping.get(sub, mapping['earthquakes'])
+    count = (params or {}).get('limit') or 20
+    offset = (params or {}).get('offset') or 0
+    return {"results": await fn(count, offset), "source": "USGS", "endpoint": sub}
 
 def get_metadata():
     return {
@@ -56,8 +100,8 @@ def get_metadata():
         "description": "Earthquake data, water monitoring, and geological information",
         "endpoints": ["Recent Earthquakes", "Water Data"],
         "sub_sections": [
-            {"id": "earthquakes", "name": "Recent Earthquakes"},
-            {"id": "water", "name": "Water Monitoring (CA)"},
+            {"id": "earthquakes", "name": "Recent Earthquakes", "cache_ttl": 60},
+            {"id": "water", "name": "Water Monitoring (CA)", "cache_ttl": 900},
         ],
         "has_search": False,
         "auth_required": False,
@@ -0,0 +1,154 @@
+"""Async counterpart of http_client for the ASGI serving mode (asgi.py).
+
+Same contract as http_client: one pooled httpx.AsyncClient per upstream host,
+coalescing of identical in-flight calls, per-host circuit breakers, rate
+limits, negative caching, metrics, tracing spans and replay/recording support. A slow upstream
+costs a suspended coroutine rather than a worker thread.
+
+httpx is an optional dependency (requirements-asgi.txt) and is imported on
+first use, so agency modules can define async entry points without making it
+a requirement of the Flask deployment.
+"""
+import functools
+import os
+import time
+from types import SimpleNamespace
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from api import circuit_breaker, http_client, jsoncodec, metrics, ratelimit, replay, tracing
+from api.cache import ResponseCache
+from api.http_client import DEFAULT_TIMEOUT, host_of
+from api.singleflight import AsyncSingleFlight
+
+MAX_CONNECTIONS = int(os.environ.get('ASYNC_HTTP_MAX_CONNECTIONS', '100'))
+
+_clients = {}
+_flights = AsyncSingleFlight()
+_negative = ResponseCache(max_entries=256)
+
+
+def client_for(url):
+    """Return the pooled AsyncClient for url's host, creating it on first use."""
+    host = host_of(url)
+    client = _clients.get(host)
+    if client is None:
+        import httpx  # optional: requirements-asgi.txt
+        client = _clients[host] = httpx.AsyncClient(
+            headers=http_client.DEFAULT_HEADERS,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+        )
+    return client
+
+
+def _flight_key(method, upstream_url, req):
+    parts = urlsplit(upstream_url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    url = urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, query, ''))
+    return (method, url, req.content, req.headers.get('Accept', ''))
+
+
+def _json(resp, **kwargs):
+    with tracing.span('parse', bytes=len(resp.content)):
+        return jsoncodec.loads(resp.content)
+
+
+async def request(method, url, params=None, headers=None, timeout=DEFAULT_TIMEOUT, data=None, json=None):
+    """Issue an upstream request; concurrent identical requests share one call."""
+    import httpx  # optional: requirements-asgi.txt
+    upstream_url = str(httpx.URL(url, params=params))
+    target = replay.rewrite_url(upstream_url)
+    client = client_for(target)
+    content = data if isinstance(data, (str, bytes)) else None
+    req = client.build_request(method, target, headers=headers, json=json,
+                               data=None if content is not None else data, content=content,
+                               timeout=timeout)
+    key = _flight_key(method, upstream_url, req)
+    host = host_of(upstream_url)
+    bucket = None
+    if target == upstream_url:
+        bucket = ratelimit.bucket_for(host, upstream_url, req.headers, req.content)
+
+    async def send():
+        failed = _negative.get(key)
+        if failed is not None:
+            kind, value = failed.value
+            metrics.UPSTREAM_CALLS.inc(host=host, outcome='negative_cached')
+            if kind == 'error':
+                error_type, args = value
+                raise error_type(*args)
+            return value
+        # Check the breaker first: failing fast must not spend quota
+        breaker = circuit_breaker.for_host(host)
+        if not breaker.allow():
+            metrics.UPSTREAM_CALLS.inc(host=host, outcome='circuit_open')
+            raise circuit_breaker.CircuitOpenError(f"Circuit open for {host}; failing fast")
+        if bucket is not None:
+            level, max_wait = ratelimit.wait_budget()
+            with tracing.span('ratelimit', rule=bucket.rule):
+                granted = False
+                try:
+                    granted = await bucket.acquire_async(level, max_wait)
+                finally:
+                    if not granted:
+                        breaker.release()
+                if not granted:
+                    metrics.UPSTREAM_CALLS.inc(host=host, outcome='rate_limited')
+                    raise ratelimit.rejected(bucket)
+        start = time.monotonic()
+        metrics.UPSTREAM_IN_FLIGHT.inc(host=host)
+        try:
+            resp = await client.send(req)
+        except Exception as e:
+            elapsed = time.monotonic() - start
+            breaker.record(False, elapsed, f"{type(e).__name__}: {e}")
+            metrics.UPSTREAM_LATENCY.observe(elapsed, host=host)
+            metrics.UPSTREAM_CALLS.inc(host=host, outcome='error')
+            if http_client.NEGATIVE_TTL:
+                _negative.set(key, ('error', (type(e), e.args)), http_client.NEGATIVE_TTL)
+            raise
+        finally:
+            metrics.UPSTREAM_IN_FLIGHT.dec(host=host)
+        elapsed = time.monotonic() - start
+        if resp.status_code == 429:
+            # The caller's quota is spent; the host itself is fine
+            breaker.release()
+            if bucket is not None:
+                bucket.drain()
+        else:
+            ok = resp.status_code < 500
+            breaker.record(ok, elapsed, None if ok else f"HTTP {resp.status_code}")
+        metrics.UPSTREAM_LATENCY.observe(elapsed, host=host)
+        metrics.UPSTREAM_BYTES.inc(len(resp.content), host=host)
+        metrics.UPSTREAM_CALLS.inc(host=host, outcome=f"{resp.status_code // 100}xx")
+        if replay.RECORD_DIR:
+            replay.record(SimpleNamespace(method=method, url=upstream_url, body=req.content), resp)
+        resp.json = functools.partial(_json, resp)
+        if resp.status_code >= 400 and http_client.NEGATIVE_TTL:
+            _negative.set(key, ('response', resp), http_client.NEGATIVE_TTL)
+        return resp
+
+    with tracing.span('upstream', method=method, host=host, path=urlsplit(url).path) as attrs:
+        resp, shared = await _flights.do(key, send)
+        attrs['status'] = resp.status_code
+        attrs['shared'] = shared
+    return resp
+
+
+async def get(url, **kwargs):
+    return await request('GET', url, **kwargs)
+
+
+async def post(url, **kwargs):
+    return await request('POST', url, **kwargs)
+
+
+def coalescing_stats():
+    return _flights.stats()
+
+
+async def close_all():
+    """Close every pooled client (ASGI lifespan shutdown)."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
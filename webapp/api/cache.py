@@ -0,0 +1,170 @@
+"""In-process LRU response cache with per-entry TTLs.
+
+Entries are keyed by (agency, sub_section, query, limit, offset, api key
+digest) in app.py; this module only knows about opaque tuple keys, values and
+expiry. The cache is
+bounded by entry count and evicts the least recently used entry first.
+
+Expired entries are kept around for stale-while-revalidate: lookup() can hand
+back an entry up to MAX_STALE seconds past its TTL while a single background
+refresh replaces it.
+"""
+import contextvars
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', '512'))
+# TTL used when a sub_section does not declare its own cache_ttl.
+DEFAULT_TTL = int(os.environ.get('CACHE_DEFAULT_TTL', '300'))
+# How long past its TTL an entry may still be served while it is refreshed in
+# the background. Beyond this the next caller fetches synchronously; 0 turns
+# stale-while-revalidate off.
+MAX_STALE = int(os.environ.get('CACHE_MAX_STALE', '3600'))
+REFRESH_WORKERS = int(os.environ.get('CACHE_REFRESH_WORKERS', '2'))
+
+FRESH = 'fresh'
+STALE = 'stale'
+
+
+class CacheEntry:
+    __slots__ = ('value', 'stored_at', 'ttl', 'hits')
+
+    def __init__(self, value, ttl, stored_at=None):
+        self.value = value
+        self.stored_at = stored_at or time.time()
+        self.ttl = ttl
+        self.hits = 0
+
+    @property
+    def age(self):
+        return time.time() - self.stored_at
+
+    @property
+    def expired(self):
+        return self.age >= self.ttl
+
+
+class ResponseCache:
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._refresher = ThreadPoolExecutor(max_workers=REFRESH_WORKERS,
+                                             thread_name_prefix='cache-refresh')
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refreshes = 0
+
+    def lookup(self, key, max_stale=0):
+        """Return (entry, state) with state FRESH, STALE or None on a miss.
+
+        An expired entry counts as STALE while it is no more than max_stale
+        seconds past its TTL.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.age >= entry.ttl + max_stale:
+                self.misses += 1
+                return None, None
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            if entry.expired:
+                self.stale_hits += 1
+                return entry, STALE
+            self.hits += 1
+            return entry, FRESH
+
+    def peek(self, key):
+        """The CacheEntry for key at any age, or None; no stats or LRU update."""
+        with self._lock:
+            return self._entries.get(key)
+
+    def get(self, key):
+        """Return the live CacheEntry for key, or None on a miss or expiry."""
+        entry, _ = self.lookup(key)
+        return entry
+
+    def refresh_in_background(self, key, fn):
+        """Run fn() on the refresh pool unless a refresh of key is already running.
+
+        Returns True if a refresh was scheduled by this call.
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self.refreshes += 1
+
+        def run():
+            try:
+                fn()
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._refresher.submit(contextvars.copy_context().run, run)
+        return True
+
+    def set(self, key, value, ttl, stored_at=None):
+        """Store value; stored_at backdates an entry loaded from elsewhere. Returns the entry."""
+        entry = CacheEntry(value, ttl, stored_at)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def purge(self, agency=None, sub_section=None):
+        """Drop entries, optionally only those for one agency/sub_section."""
+        with self._lock:
+            doomed = [k for k in self._entries
+                      if (agency is None or k[0] == agency)
+                      and (sub_section is None or k[1] == sub_section)]
+            for k in doomed:
+                del self._entries[k]
+            return len(doomed)
+
+    def items(self):
+        """Point-in-time list of (key, CacheEntry), least recently used first."""
+        with self._lock:
+            return list(self._entries.items())
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'refreshes': self.refreshes,
+                'refreshing': len(self._refreshing),
+            }
+
+    def describe(self):
+        """List entries (most recently used last) for the admin endpoint."""
+        with self._lock:
+            return [{
+                'agency': k[0],
+                'sub_section': k[1],
+                'query': k[2],
+                'limit': k[3],
+                'offset': k[4],
+                'keyed': len(k) > 5 and bool(k[5]),
+                'age_seconds': int(e.age),
+                'ttl': e.ttl,
+                'expired': e.expired,
+                'hits': e.hits,
+            } for k, e in self._entries.items()]
+
+
+response_cache = ResponseCache()
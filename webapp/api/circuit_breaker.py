@@ -0,0 +1,123 @@
+"""Per-upstream-host circuit breakers.
+
+Each host gets a sliding window of recent call outcomes. When the failure
+rate over the window crosses FAILURE_RATE (with at least MIN_CALLS calls) the
+breaker opens and calls fail immediately with CircuitOpenError instead of
+waiting out the upstream timeout. After COOLDOWN seconds one probe call is let
+through (half-open); its outcome closes the breaker or re-opens it.
+
+Failures are exceptions (timeouts, connection errors) and 5xx responses. A
+429 says the caller's quota is spent, not that the host is down: it is not
+counted either way, so one exhausted key cannot open the circuit for others.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+import requests
+
+WINDOW = float(os.environ.get('BREAKER_WINDOW', '60'))
+MIN_CALLS = int(os.environ.get('BREAKER_MIN_CALLS', '5'))
+FAILURE_RATE = float(os.environ.get('BREAKER_FAILURE_RATE', '0.5'))
+COOLDOWN = float(os.environ.get('BREAKER_COOLDOWN', '30'))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling a host whose breaker is open."""
+
+
+class HostBreaker:
+    def __init__(self, host):
+        self.host = host
+        self.state = CLOSED
+        self.opened_at = None
+        self.last_error = None
+        self.rejected = 0
+        self._calls = deque()  # (timestamp, ok, latency_s)
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _trim(self, now):
+        while self._calls and self._calls[0][0] < now - WINDOW:
+            self._calls.popleft()
+
+    def allow(self):
+        """True if a call may go out now; False means fail fast."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.time() - self.opened_at >= COOLDOWN:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def release(self):
+        """Give back a call allowed by allow() without recording an outcome."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+
+    def record(self, ok, latency, error=None):
+        with self._lock:
+            now = time.time()
+            if error:
+                self.last_error = error
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                if ok:
+                    self.state = CLOSED
+                    self._calls.clear()
+                else:
+                    self.state = OPEN
+                    self.opened_at = now
+            self._calls.append((now, ok, latency))
+            self._trim(now)
+            failures = sum(1 for _, good, _ in self._calls if not good)
+            if (self.state == CLOSED and len(self._calls) >= MIN_CALLS
+                    and failures / len(self._calls) >= FAILURE_RATE):
+                self.state = OPEN
+                self.opened_at = now
+
+    def snapshot(self):
+        with self._lock:
+            self._trim(time.time())
+            calls = list(self._calls)
+        latencies = sorted(lat for _, _, lat in calls)
+        failures = sum(1 for _, good, _ in calls if not good)
+        return {
+            'state': self.state,
+            'calls': len(calls),
+            'error_rate': round(failures / len(calls), 3) if calls else 0.0,
+            'latency_ms_p50': int(latencies[len(latencies) // 2] * 1000) if latencies else None,
+            'latency_ms_max': int(latencies[-1] * 1000) if latencies else None,
+            'rejected': self.rejected,
+            'opened_at': self.opened_at,
+            'last_error': self.last_error,
+        }
+
+
+_breakers = {}
+_lock = threading.Lock()
+
+
+def for_host(host):
+    breaker = _breakers.get(host)
+    if breaker is None:
+        with _lock:
+            breaker = _breakers.setdefault(host, HostBreaker(host))
+    return breaker
+
+
+def snapshot():
+    """{host: breaker state/error rate/latency} for the health endpoint."""
+    with _lock:
+        breakers = list(_breakers.values())
+    return {b.host: b.snapshot() for b in sorted(breakers, key=lambda b: b.host)}
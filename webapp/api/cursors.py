@@ -0,0 +1,219 @@
+"""Opaque pagination cursors over cached result sets.
+
+The first paginated request materializes a window of rows (CURSOR_WINDOW, or
+the page size if larger) into a ResultSet held in its own LRU/TTL cache and
+hands back a cursor token. Later pages are served from that set; when a
+cursor runs past what has been materialized, the next window is fetched
+lazily, through the upstream's own page token when the module returns one
+(ClinicalTrials.gov nextPageToken) or by offset otherwise. A set ends at
+an empty window or at the 'total' row count a module may report.
+
+Tokens are HMAC-signed so clients cannot forge positions or page sizes, and
+one request fetches at most CURSOR_MAX_FETCHES upstream windows.
+
+Result sets live in each process's memory and, when the L2 cache is enabled
+(L2_CACHE_PATH), are written through to it so any worker on the host can
+continue a cursor another worker issued. Several workers also need a common
+CURSOR_SECRET; without L2 or a shared secret, cursors only work with a single
+worker process.
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+
+from api import jsoncodec, l2cache
+from api.cache import ResponseCache
+
+CURSOR_WINDOW = int(os.environ.get('CURSOR_WINDOW', '100'))
+CURSOR_TTL = int(os.environ.get('CURSOR_TTL', '900'))
+CURSOR_MAX_SETS = int(os.environ.get('CURSOR_MAX_SETS', '256'))
+CURSOR_MAX_FETCHES = int(os.environ.get('CURSOR_MAX_FETCHES', '10'))
+# Must be the same in every worker that can see a result set; the random
+# fallback only works with a single worker.
+_SECRET = os.environ.get('CURSOR_SECRET', '').encode('utf-8') or secrets.token_bytes(32)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class ResultSet:
+    """Rows materialized so far for one paginated query."""
+
+    _STATE = ('agency_id', 'owner', 'params', 'window', 'rows', 'meta', 'exhausted', 'upstream_token',
+              'created_at')
+
+    def __init__(self, agency_id, params, window, owner=''):
+        self.agency_id = agency_id
+        self.owner = owner
+        self.params = dict(params)
+        self.window = window
+        self.rows = []
+        self.meta = {}
+        self.exhausted = False
+        self.upstream_token = None
+        self.created_at = time.time()
+        self.lock = threading.Lock()
+
+    def dumps(self):
+        return jsoncodec.dumps({name: getattr(self, name) for name in self._STATE})
+
+    @classmethod
+    def loads(cls, body):
+        state = jsoncodec.loads(body)
+        rs = cls(state['agency_id'], state['params'], state['window'], state['owner'])
+        for name in cls._STATE:
+            setattr(rs, name, state[name])
+        return rs
+
+    def extend(self, result):
+        """Append one fetched window (a module result dict).
+
+        Only an empty window, or rows reaching a module-reported 'total', end
+        the set: a short window does not, since modules clamp the window to
+        their upstream's page cap (FEC returns at most 100 rows).
+        """
+        if not isinstance(result, dict):
+            result = {}
+        rows = result.get('results', [])
+        if rows and isinstance(rows[0], dict) and 'error' in rows[0]:
+            raise RuntimeError(rows[0]['error'])
+        if not self.meta:
+            self.meta = {k: v for k, v in result.items()
+                         if k not in ('results', 'next_page_token', 'cached', 'stale', 'age_seconds')}
+        self.rows.extend(rows)
+        self.upstream_token = result.get('next_page_token')
+        total = result.get('total')
+        if not rows or (total is not None and self.params.get('offset', 0) + len(self.rows) >= total):
+            self.exhausted = True
+
+    def next_window_params(self):
+        """Params for fetching the window after the rows we already hold."""
+        params = dict(self.params, limit=self.window)
+        if self.upstream_token:
+            params['page_token'] = self.upstream_token
+            params.pop('offset', None)
+        else:
+            params['offset'] = self.params.get('offset', 0) + len(self.rows)
+        return params
+
+
+result_sets = ResponseCache(max_entries=CURSOR_MAX_SETS)
+
+
+def _l2_key(agency_id, set_id):
+    # Not under the agency's own name, so purging an agency's responses keeps its cursors.
+    return ('_cursor', agency_id, set_id)
+
+
+def _save(agency_id, set_id, rs):
+    """Write a result set through to the shared L2 cache, if enabled."""
+    if l2cache.disk_cache:
+        l2cache.disk_cache.set(_l2_key(agency_id, set_id), rs.dumps(), CURSOR_TTL, stored_at=rs.created_at)
+
+
+def _lookup(agency_id, set_id):
+    """The ResultSet for set_id from this process or, failing that, the L2 cache."""
+    entry = result_sets.get((agency_id, set_id))
+    if entry is not None:
+        return entry.value
+    row = l2cache.disk_cache.get(_l2_key(agency_id, set_id)) if l2cache.disk_cache else None
+    if row is None:
+        return None
+    body, stored_at, ttl = row
+    rs = ResultSet.loads(body)
+    result_sets.set((agency_id, set_id), rs, ttl, stored_at=stored_at)
+    return rs
+
+
+def _b64(raw):
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _unb64(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def _sign(raw):
+    return hmac.new(_SECRET, raw, hashlib.sha256).digest()[:16]
+
+
+def encode(set_id, position, page_size):
+    raw = json.dumps([set_id, position, page_size], separators=(',', ':')).encode('utf-8')
+    return f"{_b64(raw)}.{_b64(_sign(raw))}"
+
+
+def decode(token):
+    """Return (set_id, position, page_size) from a signed cursor token."""
+    try:
+        body, _, signature = token.partition('.')
+        raw = _unb64(body)
+        if not hmac.compare_digest(_unb64(signature), _sign(raw)):
+            raise InvalidCursor("Malformed cursor")
+        set_id, position, page_size = json.loads(raw)
+        return str(set_id), int(position), int(page_size)
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor("Malformed cursor")
+
+
+def start(agency_id, params, page_size, fetch_window, owner=''):
+    """Materialize the first window for a query and return (ResultSet, set_id).
+
+    fetch_window(params) must return a module result dict. owner identifies
+    the client's API key; only requests with the same key can continue it.
+    """
+    window = max(page_size, CURSOR_WINDOW)
+    rs = ResultSet(agency_id, params, window, owner)
+    rs.extend(fetch_window(dict(params, limit=window)))
+    set_id = secrets.token_urlsafe(12)
+    result_sets.set((agency_id, set_id), rs, CURSOR_TTL, stored_at=rs.created_at)
+    _save(agency_id, set_id, rs)
+    return rs, set_id
+
+
+def page(agency_id, token, fetch_window, page_size=None, owner='', max_page_size=None):
+    """Serve the page a cursor points at; returns (ResultSet, rows, next_token)."""
+    set_id, position, token_size = decode(token)
+    page_size = max(1, page_size or token_size)
+    if max_page_size:
+        page_size = min(page_size, max_page_size)
+    rs = _lookup(agency_id, set_id)
+    if rs is None:
+        raise InvalidCursor("Cursor expired")
+    if rs.owner != owner:
+        raise InvalidCursor("Cursor belongs to a different API key")
+    if position < 0 or position > len(rs.rows) + rs.window:
+        raise InvalidCursor("Malformed cursor")
+    rows = _fill(set_id, rs, position, page_size, fetch_window)
+    return rs, rows, _next(set_id, rs, position + len(rows), page_size)
+
+
+def first_page(agency_id, params, page_size, fetch_window, owner=''):
+    """Start a result set and serve its first page; returns (ResultSet, rows, next_token)."""
+    rs, set_id = start(agency_id, params, page_size, fetch_window, owner)
+    rows = _fill(set_id, rs, 0, page_size, fetch_window)
+    return rs, rows, _next(set_id, rs, len(rows), page_size)
+
+
+def _fill(set_id, rs, position, page_size, fetch_window):
+    """Fetch further windows until the page is covered; returns its rows."""
+    with rs.lock:
+        fetches = 0
+        while position + page_size > len(rs.rows) and not rs.exhausted and fetches < CURSOR_MAX_FETCHES:
+            fetches += 1
+            rs.extend(fetch_window(rs.next_window_params()))
+        if fetches:
+            _save(rs.agency_id, set_id, rs)
+        return rs.rows[position:position + page_size]
+
+
+def _next(set_id, rs, position, page_size):
+    if position >= len(rs.rows) and rs.exhausted:
+        return None
+    return encode(set_id, position, page_size)
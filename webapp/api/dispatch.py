@@ -0,0 +1,111 @@
+"""Precompiled agency dispatch table.
+
+Built once at startup from the agency manifest: maps each agency to its data
+callable and to the sub_section ids it declares, so requests are routed and
+validated without scanning module attributes, and an unknown sub_section is
+rejected before any upstream I/O. A module may also declare
+`sub_section_aliases` ({alias: sub_section id}) for ids the frontend uses
+that map onto one of its sub_sections, and `unsupported_sub_sections` for
+frontend ids it has no data for, which are rejected as unsupported rather
+than unknown.
+
+Each agency has one data function that switches on params['sub_section']
+itself (argument conventions differ per module), so handler() returns that
+function with the canonical id rather than a separate callable per
+sub_section.
+
+For the ASGI mode each route also has an async data callable: the module's
+native `aget_<agency>_data` coroutine when it defines one, else the sync
+function run in a worker thread.
+"""
+import asyncio
+import threading
+
+
+class UnknownSubSection(ValueError):
+    def __init__(self, agency_id, sub_section, valid):
+        super().__init__(f"Unknown sub_section '{sub_section}' for {agency_id}")
+        self.agency_id = agency_id
+        self.sub_section = sub_section
+        self.valid = valid
+
+
+class UnsupportedSubSection(UnknownSubSection):
+    """A frontend sub_section id the agency's module has no data for."""
+
+    def __str__(self):
+        return f"sub_section '{self.sub_section}' is not supported by the {self.agency_id} backend"
+
+
+class AgencyRoute:
+    """Dispatch entry for one agency; its module is imported on first call."""
+
+    def __init__(self, agency_id, func_name, sub_sections, importer, aliases=None, unsupported=()):
+        self.agency_id = agency_id
+        self.func_name = func_name
+        self.sub_sections = tuple(sub_sections)
+        self.default_sub_section = self.sub_sections[0] if self.sub_sections else ''
+        # Every accepted id (declared, alias, '' for the default) -> canonical id
+        self._ids = dict(aliases or {})
+        self._ids.update((sub, sub) for sub in self.sub_sections)
+        self._ids[''] = self.default_sub_section
+        self._unsupported = frozenset(unsupported)
+        self._importer = importer
+        self._func = None
+        self._async_func = None
+        self._lock = threading.Lock()
+
+    @property
+    def data_func(self):
+        if self._func is None:
+            with self._lock:
+                if self._func is None:
+                    mod = self._importer(self.agency_id)
+                    self._func = getattr(mod, self.func_name)
+        return self._func
+
+    @property
+    def async_data_func(self):
+        if self._async_func is None:
+            mod = self._importer(self.agency_id)
+            self._async_func = getattr(mod, 'a' + self.func_name, None) or _in_thread(self.data_func)
+        return self._async_func
+
+    @property
+    def is_async_native(self):
+        return not getattr(self.async_data_func, 'in_thread', False)
+
+    def resolve_sub_section(self, sub_section):
+        """Return the canonical sub_section id; '' maps to the agency default."""
+        canonical = self._ids.get(sub_section)
+        if canonical is None:
+            error = UnsupportedSubSection if sub_section in self._unsupported else UnknownSubSection
+            raise error(self.agency_id, sub_section, list(self.sub_sections))
+        return canonical
+
+    def handler(self, sub_section):
+        """Return (data_func, canonical sub_section) for a request."""
+        return self.data_func, self.resolve_sub_section(sub_section)
+
+
+def _in_thread(data_func):
+    """Adapt a sync data function for modules without a native async entry point."""
+    async def run(api_key=None, params=None):
+        return await asyncio.to_thread(data_func, api_key=api_key, params=params)
+    run.in_thread = True
+    return run
+
+
+def build(manifest, importer):
+    """Build {agency_id: AgencyRoute} for every agency with a data function."""
+    routes = {}
+    data_functions = manifest.get('data_functions', {})
+    for meta in manifest['agencies']:
+        agency_id = meta['id']
+        func_name = data_functions.get(agency_id)
+        if not func_name:
+            continue
+        sub_ids = [s['id'] for s in meta.get('sub_sections', [])]
+        routes[agency_id] = AgencyRoute(agency_id, func_name, sub_ids, importer,
+                                        meta.get('sub_section_aliases'), meta.get('unsupported_sub_sections', ()))
+    return routes
@@ -0,0 +1,145 @@
+"""Concurrent fan-out executor for multi-agency queries.
+
+Runs one callable per key on a shared bounded thread pool and reports each
+outcome as soon as it finishes, so a cross-agency request costs roughly the
+slowest agency that makes its deadline instead of the sum of all of them.
+
+The pool holds FANOUT_CONCURRENCY full fan-outs (every registered agency) at
+once, with room for tasks that outlive their deadline (a timed-out task keeps
+its thread until its upstream call returns). A task's own deadline counts
+from when it starts running, so time spent queued for a thread is not charged
+to it; the overall deadline still counts from submission.
+"""
+import asyncio
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from api.agency_modules import AGENCY_REGISTRY
+
+# Concurrent all-agency fan-outs the pool serves without queueing.
+CONCURRENCY = int(os.environ.get('FANOUT_CONCURRENCY', '4'))
+MAX_WORKERS = int(os.environ.get('FANOUT_MAX_WORKERS', str(CONCURRENCY * len(AGENCY_REGISTRY))))
+# Overall budget for one fan-out, and the default budget for each task in it.
+DEFAULT_DEADLINE = float(os.environ.get('FANOUT_DEADLINE', '20'))
+DEFAULT_TASK_DEADLINE = float(os.environ.get('FANOUT_TASK_DEADLINE', '15'))
+
+# How often to re-check deadlines while some tasks are still queued (s).
+QUEUED_POLL = 0.05
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='fanout')
+
+
+def _timed(fn, started):
+    """Run fn, recording when it started in started[0]; return (result, finished_at)."""
+    started.append(time.monotonic())
+    result = fn()
+    return result, time.monotonic()
+
+
+def submit(fn, started=None):
+    """Submit fn to the shared pool, carrying over the caller's context.
+
+    started, if given, is a list that receives the start time once a worker
+    picks the task up.
+    """
+    ctx = contextvars.copy_context()
+    return _executor.submit(ctx.run, _timed, fn, [] if started is None else started)
+
+
+def iter_fanout(tasks, deadline=None, task_deadline=None, task_deadlines=None):
+    """Run {key: callable} concurrently and yield (key, outcome) in completion order.
+
+    Each outcome is a dict with 'status' ('ok', 'error' or 'timeout') and
+    'elapsed_ms', plus 'result' or 'error'. Tasks still running when their own
+    deadline or the global deadline passes are reported as timeouts and their
+    late results are discarded.
+    """
+    deadline = DEFAULT_DEADLINE if deadline is None else deadline
+    task_deadline = DEFAULT_TASK_DEADLINE if task_deadline is None else task_deadline
+    task_deadlines = task_deadlines or {}
+
+    start = time.monotonic()
+    global_end = start + deadline
+    pending = {}
+    budgets = {}
+    started = {}
+    for key, fn in tasks.items():
+        started_at = []
+        fut = submit(fn, started_at)
+        pending[fut] = key
+        budgets[fut] = task_deadlines.get(key, task_deadline)
+        started[fut] = started_at
+
+    def end(fut):
+        if not started[fut]:
+            return global_end
+        return min(started[fut][0] + budgets[fut], global_end)
+
+    while pending:
+        now = time.monotonic()
+        for fut in [f for f in pending if end(f) <= now and not f.done()]:
+            key = pending.pop(fut)
+            fut.cancel()
+            yield key, {
+                'status': 'timeout',
+                'error': f"Timed out after {end(fut) - (started[fut] or [start])[0]:.1f}s",
+                'elapsed_ms': int((now - start) * 1000),
+            }
+        if not pending:
+            break
+        timeout = max(0.0, min(end(f) for f in pending) - time.monotonic())
+        if any(not started[f] for f in pending):
+            timeout = min(timeout, QUEUED_POLL)  # a queued task's deadline starts when it does
+        done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+        for fut in done:
+            key = pending.pop(fut)
+            try:
+                result, finished = fut.result()
+                yield key, {
+                    'status': 'ok',
+                    'result': result,
+                    'elapsed_ms': int((finished - start) * 1000),
+                }
+            except Exception as e:
+                yield key, {
+                    'status': 'error',
+                    'error': str(e),
+                    'elapsed_ms': int((time.monotonic() - start) * 1000),
+                }
+
+
+async def aiter_fanout(tasks, deadline=None, task_deadline=None, task_deadlines=None):
+    """iter_fanout() for {key: coroutine function} on the running event loop.
+
+    Yields the same (key, outcome) pairs in completion order; a task's budget
+    is its own deadline capped by the global one, and timed-out tasks are
+    cancelled.
+    """
+    deadline = DEFAULT_DEADLINE if deadline is None else deadline
+    task_deadline = DEFAULT_TASK_DEADLINE if task_deadline is None else task_deadline
+    task_deadlines = task_deadlines or {}
+    start = time.monotonic()
+
+    async def run(key, fn, budget):
+        try:
+            result = await asyncio.wait_for(fn(), budget)
+            return key, {'status': 'ok', 'result': result,
+                         'elapsed_ms': int((time.monotonic() - start) * 1000)}
+        except asyncio.TimeoutError:
+            return key, {'status': 'timeout', 'error': f"Timed out after {budget:.1f}s",
+                         'elapsed_ms': int((time.monotonic() - start) * 1000)}
+        except Exception as e:
+            return key, {'status': 'error', 'error': str(e),
+                         'elapsed_ms': int((time.monotonic() - start) * 1000)}
+
+    runs = [run(key, fn, min(task_deadlines.get(key, task_deadline), deadline))
+            for key, fn in tasks.items()]
+    for finished in asyncio.as_completed(runs):
+        yield await finished
+
+
+def run_fanout(tasks, **kwargs):
+    """Collect iter_fanout() into a {key: outcome} dict."""
+    return dict(iter_fanout(tasks, **kwargs))
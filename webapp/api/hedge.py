@@ -0,0 +1,62 @@
+"""Hedged calls: start a fallback source while a slow primary is still running.
+
+Several agency modules try a primary upstream and fall back to a second
+source when it fails. Run strictly in sequence, a slow primary costs its full
+timeout before the fallback starts. hedge() starts the fallback as soon as the
+primary fails or after DELAY seconds without an answer (delay=0 races both
+from the start), and returns whichever acceptable result arrives first.
+
+The losing call cannot be interrupted mid-request (blocking HTTP calls have no
+cancellation); it is cancelled if it has not started yet, and otherwise runs
+to completion in the background with its result discarded.
+"""
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from api import metrics
+
+# Seconds to wait for the primary before starting the fallback.
+DELAY = float(os.environ.get('HEDGE_DELAY', '2'))
+MAX_WORKERS = int(os.environ.get('HEDGE_MAX_WORKERS', '16'))
+
+# Separate from the fan-out pool: hedged calls run inside fan-out tasks.
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='hedge')
+
+
+def _accepted(result):
+    return result is not None
+
+
+def _submit(fn):
+    return _executor.submit(contextvars.copy_context().run, fn)
+
+
+def hedge(primary, fallback, delay=None, accept=_accepted, name=''):
+    """Return the first acceptable result of primary() or fallback().
+
+    fallback starts when primary raises or returns an unacceptable result, or
+    once delay seconds pass without an answer. A result is acceptable when
+    accept(result) is true (default: not None). If neither is, the fallback's
+    outcome is returned or raised, as a sequential try-then-fallback would.
+    """
+    delay = DELAY if delay is None else delay
+    first = _submit(primary)
+    done, _ = wait([first], timeout=delay)
+    if done and first.exception() is None and accept(first.result()):
+        metrics.HEDGE_CALLS.inc(name=name, outcome='primary')
+        return first.result()
+
+    second = _submit(fallback)
+    pending = {first, second} - set(done)
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for fut in done:
+            if fut.exception() is None and accept(fut.result()):
+                for loser in pending:
+                    loser.cancel()
+                winner = 'primary_hedged' if fut is first else 'fallback'
+                metrics.HEDGE_CALLS.inc(name=name, outcome=winner)
+                return fut.result()
+    metrics.HEDGE_CALLS.inc(name=name, outcome='failed')
+    return second.result()
@@ -0,0 +1,216 @@
+"""Shared pooled HTTP client for agency modules.
+
+Every upstream call goes through here instead of bare requests.get/post so
+that connections to each host are kept alive and reused across requests
+(no fresh TCP+TLS handshake per call), pool sizes are bounded, and default
+headers/timeouts live in one place.
+
+Identical concurrent requests (same method, normalized URL, body and Accept
+header) are coalesced into one upstream call whose response is shared. All
+agency upstream calls, including the POSTs to BLS and USAspending, are
+read-only queries, so this is safe for every method we issue.
+
+Each host is guarded by a circuit breaker (api/circuit_breaker.py), and failed
+calls (errors, 4xx/5xx) are negatively cached for NEGATIVE_TTL seconds so a
+dead or misconfigured upstream costs milliseconds instead of a full timeout.
+Hosts with published quotas are rate limited per API key (api/ratelimit.py);
+over-limit calls wait for a token before going out.
+
+For offline runs every upstream can be redirected to a stand-in server, and
+live exchanges can be recorded to cassettes (see api/replay.py).
+"""
+import functools
+import os
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from api import circuit_breaker, jsoncodec, metrics, ratelimit, replay, tracing
+from api.cache import ResponseCache
+from api.singleflight import SingleFlight
+
+DEFAULT_TIMEOUT = 15
+NEGATIVE_TTL = int(os.environ.get('HTTP_NEGATIVE_TTL', '30'))
+POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', '10'))
+DEFAULT_HEADERS = {
+    'User-Agent': 'OpenGovDash/1.0 (+https://selvidge.tech/government-data-fun/)',
+}
+
+_sessions = {}
+_transport = None
+_lock = threading.Lock()
+_flights = SingleFlight()
+_negative = ResponseCache(max_entries=256)
+
+
+def host_of(url):
+    """Return the lower-cased host[:port] of a URL."""
+    return urlsplit(url).netloc.lower()
+
+
+def session_for(url):
+    """Return the keep-alive session for url's host, creating it on first use."""
+    host = host_of(url)
+    session = _sessions.get(host)
+    if session is None:
+        with _lock:
+            session = _sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = _transport or HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers.update(DEFAULT_HEADERS)
+                _sessions[host] = session
+    return session
+
+
+def _flight_key(prepared):
+    """Normalize a prepared request into a hashable coalescing key."""
+    parts = urlsplit(prepared.url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    url = urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, query, ''))
+    body = prepared.body
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return (prepared.method, url, body, prepared.headers.get('Accept', ''))
+
+
+def _traced_json(resp, **kwargs):
+    """resp.json() replacement decoding with the fast codec, traced as 'parse'."""
+    with tracing.span('parse', bytes=len(resp.content)):
+        if not kwargs:
+            try:
+                return jsoncodec.loads(resp.content)
+            except ValueError:
+                pass  # non-UTF-8 or invalid body: let requests decode (and raise) as before
+        return requests.Response.json(resp, **kwargs)
+
+
+def request(method, url, params=None, headers=None, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """Issue an HTTP request on the pooled session for url's host.
+
+    Concurrent identical requests share a single upstream call.
+    """
+    session = session_for(url)
+    prepared = session.prepare_request(requests.Request(
+        method, url, params=params, headers=headers,
+        data=kwargs.pop('data', None), json=kwargs.pop('json', None)))
+
+    key = _flight_key(prepared)
+    host = host_of(prepared.url)
+    target = replay.rewrite_url(prepared.url)
+    # Quotas apply to the real upstreams, not to replay stand-ins
+    bucket = None
+    if target == prepared.url and _transport is None:
+        bucket = ratelimit.bucket_for(host, prepared.url, prepared.headers, prepared.body)
+    if target != prepared.url:
+        prepared.url = target
+        session = session_for(target)
+
+    send_kwargs = session.merge_environment_settings(
+        prepared.url, kwargs.pop('proxies', {}), kwargs.pop('stream', None),
+        kwargs.pop('verify', None), kwargs.pop('cert', None))
+    send_kwargs.update(kwargs)
+
+    def send():
+        failed = _negative.get(key)
+        if failed is not None:
+            kind, value = failed.value
+            metrics.UPSTREAM_CALLS.inc(host=host, outcome='negative_cached')
+            if kind == 'error':
+                error_type, args = value
+                raise error_type(*args)
+            return value
+        # Check the breaker first: failing fast must not spend quota
+        breaker = circuit_breaker.for_host(host)
+        if not breaker.allow():
+            metrics.UPSTREAM_CALLS.inc(host=host, outcome='circuit_open')
+            raise circuit_breaker.CircuitOpenError(f"Circuit open for {host}; failing fast")
+        if bucket is not None:
+            level, max_wait = ratelimit.wait_budget()
+            with tracing.span('ratelimit', rule=bucket.rule):
+                granted = False
+                try:
+                    granted = bucket.acquire(level, max_wait)
+                finally:
+                    if not granted:
+                        breaker.release()
+                if not granted:
+                    metrics.UPSTREAM_CALLS.inc(host=host, outcome='rate_limited')
+                    raise ratelimit.rejected(bucket)
+        start = time.monotonic()
+        metrics.UPSTREAM_IN_FLIGHT.inc(host=host)
+        try:
+            resp = session.send(prepared, timeout=timeout, **send_kwargs)
+            resp.content  # read the body now so waiters can share it
+        except Exception as e:
+            elapsed = time.monotonic() - start
+            breaker.record(False, elapsed, f"{type(e).__name__}: {e}")
+            metrics.UPSTREAM_LATENCY.observe(elapsed, host=host)
+            metrics.UPSTREAM_CALLS.inc(host=host, outcome='error')
+            if NEGATIVE_TTL:
+                _negative.set(key, ('error', (type(e), e.args)), NEGATIVE_TTL)
+            raise
+        finally:
+            metrics.UPSTREAM_IN_FLIGHT.dec(host=host)
+        elapsed = time.monotonic() - start
+        if resp.status_code == 429:
+            # The caller's quota is spent; the host itself is fine
+            breaker.release()
+            if bucket is not None:
+                bucket.drain()
+        else:
+            ok = resp.status_code < 500
+            breaker.record(ok, elapsed, None if ok else f"HTTP {resp.status_code}")
+        metrics.UPSTREAM_LATENCY.observe(elapsed, host=host)
+        metrics.UPSTREAM_BYTES.inc(len(resp.content), host=host)
+        metrics.UPSTREAM_CALLS.inc(host=host, outcome=f"{resp.status_code // 100}xx")
+        if replay.RECORD_DIR:
+            replay.record(prepared, resp)
+        resp.json = functools.partial(_traced_json, resp)
+        if resp.status_code >= 400 and NEGATIVE_TTL:
+            _negative.set(key, ('response', resp), NEGATIVE_TTL)
+        return resp
+
+    # The query string is left out of the span: it can carry API keys
+    with tracing.span('upstream', method=method, host=host, path=urlsplit(url).path) as attrs:
+        resp, shared = _flights.do(key, send)
+        attrs['status'] = resp.status_code
+        attrs['shared'] = shared
+    return resp
+
+
+def use_transport(adapter):
+    """Route every upstream call through adapter (e.g. replay.ReplayAdapter); None restores HTTP."""
+    global _transport
+    close_all()
+    _transport = adapter
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
+
+
+def coalescing_stats():
+    """Counters for upstream calls executed vs. coalesced onto an in-flight call."""
+    return _flights.stats()
+
+
+def negative_cache_stats():
+    return _negative.stats()
+
+
+def close_all():
+    """Close every pooled session (used on shutdown and in tests)."""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
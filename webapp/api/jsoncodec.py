@@ -0,0 +1,71 @@
+"""Pluggable JSON codec: orjson when installed, the stdlib json module otherwise.
+
+Used for decoding upstream bodies (http_client), as Flask's JSON provider
+(jsonify, request.json) and for pre-serialized responses. Set JSON_CODEC=stdlib
+to force the fallback.
+
+dumps() always returns UTF-8 bytes so serialized bodies can be cached and
+written to the wire as-is (json_response).
+"""
+import json
+import os
+
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+if os.environ.get('JSON_CODEC', '').lower() == 'stdlib':
+    orjson = None
+
+BACKEND = 'orjson' if orjson else 'stdlib'
+
+
+def loads(data):
+    """Decode JSON from bytes or str."""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, default=str, sort_keys=False, indent=None):
+    """Encode obj to compact UTF-8 JSON bytes; unknown types go through default."""
+    if orjson:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=default, option=option)
+        except (TypeError, orjson.JSONEncodeError):
+            pass  # e.g. integers beyond 64 bits; the stdlib handles them
+    separators = None if indent else (',', ':')
+    return json.dumps(obj, default=default, sort_keys=sort_keys, indent=indent,
+                      separators=separators, ensure_ascii=False).encode('utf-8')
+
+
+def json_response(body, status=200, headers=None):
+    """Response for an already-serialized JSON body (no decode/re-encode)."""
+    return Response(body, status=status, headers=headers, mimetype='application/json')
+
+
+class JSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by this module's codec."""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj, default=kwargs.get('default', self.default),
+                     sort_keys=kwargs.get('sort_keys', self.sort_keys),
+                     indent=kwargs.get('indent')).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = 2 if (self.compact is None and self._app.debug) or self.compact is False else None
+        body = dumps(obj, default=self.default, sort_keys=self.sort_keys, indent=indent)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
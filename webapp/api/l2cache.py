@@ -0,0 +1,177 @@
+"""Disk-backed second cache tier shared by every worker process on a host.
+
+Sits behind the in-process response cache: an L1 miss checks here before
+calling the upstream, and every cached result is written through. Storage is
+one SQLite database in WAL mode, so any number of processes and threads read
+concurrently (readers never block each other or the writer) and the data
+survives restarts and deploys. Each thread uses its own connection, opened on
+first use in the process that needs it: a connection made before a fork (e.g.
+gunicorn --preload importing this module in the master) is never reused by a
+worker. There is no Python-level lock on the read path.
+
+Rows hold the serialized response bytes with TTL metadata. Rows past their
+TTL stay readable as stale-while-revalidate seeds until MAX_STALE, and the
+least recently used rows are evicted once the database exceeds MAX_BYTES.
+
+Enabled by setting L2_CACHE_PATH.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+PATH = os.environ.get('L2_CACHE_PATH', '')
+MAX_BYTES = int(os.environ.get('L2_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+# Check the size budget every this many writes (per process).
+EVICT_EVERY = 32
+# Skip refreshing a row's access time if it was touched this recently (s);
+# keeps the read path from writing on every hit.
+TOUCH_INTERVAL = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    agency TEXT NOT NULL,
+    sub_section TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    ttl REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+"""
+
+
+def encode_key(key):
+    return json.dumps(list(key))
+
+
+class DiskCache:
+    def __init__(self, path, max_bytes=MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._pid = None
+        self._pid_lock = threading.Lock()
+        # Connections inherited over a fork. They stay referenced and are
+        # never closed: closing the parent's file handles in a child can drop
+        # the child's own SQLite locks on the database.
+        self._inherited = []
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def _connect(self):
+        """This thread's connection in this process, opened (and the schema created) on first use."""
+        if self._pid != os.getpid():
+            with self._pid_lock:
+                if self._pid != os.getpid():
+                    if self._pid is not None:
+                        self._inherited.append(self._local)
+                        self._local = threading.local()
+                    self._open().executescript(_SCHEMA)
+                    self._pid = os.getpid()
+        conn = getattr(self._local, 'conn', None)
+        return conn if conn is not None else self._open()
+
+    def _open(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA mmap_size=268435456')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, max_stale=0):
+        """(body, stored_at, ttl) for key unless missing or past ttl + max_stale."""
+        conn = self._connect()
+        k = encode_key(key)
+        row = conn.execute('SELECT body, stored_at, ttl, accessed_at FROM entries WHERE key = ?',
+                           (k,)).fetchone()
+        now = time.time()
+        if row is None or now - row[1] >= row[2] + max_stale:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if now - row[3] > TOUCH_INTERVAL:
+            try:
+                conn.execute('UPDATE entries SET accessed_at = ? WHERE key = ?', (now, k))
+            except sqlite3.OperationalError:
+                pass  # busy writer; the access time is only an eviction hint
+        return row[0], row[1], row[2]
+
+    def peek(self, key):
+        """(body, stored_at, ttl) for key at any age, or None; no stats or access-time update."""
+        return self._connect().execute('SELECT body, stored_at, ttl FROM entries WHERE key = ?',
+                                       (encode_key(key),)).fetchone()
+
+    def set(self, key, body, ttl, stored_at=None):
+        """Write through; failures (e.g. a long-held write lock) are counted, not raised."""
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute(
+                'INSERT OR REPLACE INTO entries (key, agency, sub_section, body, size, stored_at, ttl, accessed_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (encode_key(key), str(key[0]), str(key[1]), body, len(body), stored_at or now, ttl, now))
+            self._writes += 1
+            if self._writes % EVICT_EVERY == 0:
+                self.evict()
+        except sqlite3.Error:
+            self.errors += 1
+
+    def evict(self):
+        """Drop least recently used rows until the stored bodies fit in max_bytes."""
+        conn = self._connect()
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        doomed = []
+        for key, size in conn.execute('SELECT key, size FROM entries ORDER BY accessed_at'):
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany('DELETE FROM entries WHERE key = ?', doomed)
+            conn.execute('COMMIT')
+        except sqlite3.Error:
+            conn.execute('ROLLBACK')
+            raise
+        self.evictions += len(doomed)
+        return len(doomed)
+
+    def purge(self, agency=None, sub_section=None):
+        clauses, args = [], []
+        if agency is not None:
+            clauses.append('agency = ?')
+            args.append(agency)
+        if sub_section is not None:
+            clauses.append('sub_section = ?')
+            args.append(sub_section)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        return self._connect().execute(f'DELETE FROM entries{where}', args).rowcount
+
+    def stats(self):
+        entries, size = self._connect().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        return {
+            'path': self.path,
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'errors': self.errors,
+        }
+
+
+disk_cache = DiskCache(PATH) if PATH else None
@@ -0,0 +1,95 @@
+"""Precomputed agency manifest.
+
+All agency metadata is collected once into agency_manifest.json so that
+/api/agencies can be served without importing the 21 agency modules. At
+startup the manifest is checked against a hash of each module's source and
+rebuilt in memory if it is missing or stale.
+
+Regenerate after editing a module's get_metadata():
+
+    cd webapp && python -m api.manifest
+"""
+import argparse
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+
+from api.agency_modules import AGENCY_REGISTRY
+
+MANIFEST_PATH = os.path.join(os.path.dirname(__file__), 'agency_manifest.json')
+MANIFEST_VERSION = 1
+
+
+def _source_hash(module_path):
+    """sha1 of a module's source file, found without importing it."""
+    spec = importlib.util.find_spec(module_path)
+    with open(spec.origin, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def build(registry=AGENCY_REGISTRY):
+    """Import every agency module and collect its metadata into a manifest dict."""
+    agencies = []
+    data_functions = {}
+    sources = {}
+    for agency_id, module_path in registry.items():
+        sources[agency_id] = _source_hash(module_path)
+        try:
+            mod = importlib.import_module(module_path)
+            meta = mod.get_metadata()
+            meta['id'] = agency_id
+            agencies.append(meta)
+            func_name = f"get_{agency_id}_data"
+            if hasattr(mod, func_name):
+                data_functions[agency_id] = func_name
+        except Exception as e:
+            agencies.append({'id': agency_id, 'name': agency_id.upper(), 'error': str(e)})
+    return {
+        'version': MANIFEST_VERSION,
+        'sources': sources,
+        'data_functions': data_functions,
+        'agencies': agencies,
+    }
+
+
+def is_current(manifest, registry=AGENCY_REGISTRY):
+    """True if manifest was built from the current source of every registered module."""
+    if manifest.get('version') != MANIFEST_VERSION:
+        return False
+    sources = manifest.get('sources', {})
+    if set(sources) != set(registry):
+        return False
+    return all(sources[a] == _source_hash(p) for a, p in registry.items())
+
+
+def load(registry=AGENCY_REGISTRY, path=MANIFEST_PATH):
+    """Return the on-disk manifest if current, else one built from the modules."""
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+        if is_current(manifest, registry):
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return build(registry)
+
+
+def write(manifest, path=MANIFEST_PATH):
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=1)
+        f.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regenerate the agency manifest.")
+    parser.add_argument('output', nargs='?', default=MANIFEST_PATH,
+                        help="where to write it (default: %(default)s)")
+    args = parser.parse_args(argv)
+    write(build(), args.output)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
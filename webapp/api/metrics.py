@@ -0,0 +1,140 @@
+"""Minimal Prometheus-style metrics registry.
+
+Counters, gauges and histograms with labels, rendered in the Prometheus text
+exposition format by render(). Values that other components already count
+(cache and coalescing stats) are exported through collectors registered with
+register_collector(), which are called at scrape time.
+"""
+import threading
+
+_metrics = []
+_collectors = []
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels) + '}'
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def _key(self, labels):
+        return tuple((n, str(labels.get(n, ''))) for n in self.labelnames)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        out = []
+        with self._lock:
+            items = [(k, (list(v[0]), v[1], v[2])) for k, v in self._values.items()]
+        for key, (counts, total, count) in items:
+            for bound, c in zip(self.buckets, counts):
+                out.append((self.name + '_bucket', key + (('le', repr(float(bound))),), c))
+            out.append((self.name + '_bucket', key + (('le', '+Inf'),), count))
+            out.append((self.name + '_sum', key, total))
+            out.append((self.name + '_count', key, count))
+        return out
+
+
+def register_collector(fn):
+    """Register fn() -> iterable of (name, kind, help, [(labels dict, value)])."""
+    _collectors.append(fn)
+    return fn
+
+
+def render():
+    """Render every metric and collector in Prometheus text format."""
+    lines = []
+    for metric in _metrics:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        for name, labels, value in metric.samples():
+            lines.append(f'{name}{_format_labels(labels)} {value}')
+    for collector in _collectors:
+        for name, kind, documentation, samples in collector():
+            lines.append(f'# HELP {name} {documentation}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in samples:
+                lines.append(f'{name}{_format_labels(sorted(labels.items()))} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+# Shared request-path metrics
+REQUESTS = Counter('ogd_requests_total', 'API requests by endpoint, agency, sub_section and status.',
+                   ('endpoint', 'agency', 'sub_section', 'status'))
+REQUEST_LATENCY = Histogram('ogd_request_duration_seconds', 'API request latency.',
+                            ('endpoint', 'agency', 'sub_section'))
+IN_FLIGHT = Gauge('ogd_requests_in_flight', 'API requests currently being handled.', ('endpoint',))
+UPSTREAM_LATENCY = Histogram('ogd_upstream_duration_seconds', 'Upstream HTTP call latency.', ('host',))
+UPSTREAM_BYTES = Counter('ogd_upstream_response_bytes_total', 'Upstream response body bytes.', ('host',))
+UPSTREAM_CALLS = Counter('ogd_upstream_calls_total', 'Upstream HTTP calls by outcome.', ('host', 'outcome'))
+UPSTREAM_IN_FLIGHT = Gauge('ogd_upstream_in_flight', 'Upstream HTTP calls currently in flight.', ('host',))
+RATE_LIMIT_QUEUE = Gauge('ogd_upstream_rate_limit_queue_depth', 'Upstream calls waiting for a rate-limit token.',
+                         ('rule', 'tier', 'priority'))
+RATE_LIMIT_CALLS = Counter('ogd_upstream_rate_limit_total', 'Rate-limited upstream calls by outcome.',
+                           ('rule', 'tier', 'priority', 'outcome'))
+PREFETCH_RUNS = Counter('ogd_prefetch_runs_total', 'Background prefetch runs by outcome.', ('agency', 'outcome'))
+HEDGE_CALLS = Counter('ogd_hedged_calls_total', 'Hedged primary/fallback calls by winning source.', ('name', 'outcome'))
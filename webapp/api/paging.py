@@ -0,0 +1,26 @@
+"""Helpers for pushing limit/offset down to upstream APIs.
+
+Agency data functions accept params['limit'] and params['offset'] and pass
+them to the upstream's own paging (openFDA limit/skip, Socrata $limit/$offset,
+...). For APIs that only page by number, page_window() picks the smallest page
+that contains the requested window.
+"""
+
+
+def page_window(offset, limit, max_page_size=None):
+    """Map a (offset, limit) window onto a page-numbered API.
+
+    Returns (page_size, page_index, skip): fetch the 0-based page_index of
+    size page_size, then drop the first skip rows and keep limit rows.
+    """
+    if offset % limit == 0:
+        return limit, offset // limit, 0
+    for size in range(limit + 1, offset + limit + 1):
+        if max_page_size and size > max_page_size:
+            break
+        if offset // size == (offset + limit - 1) // size:
+            return size, offset // size, offset % size
+    # No single page fits under the upstream's cap; take the page holding the
+    # start of the window and return what it has.
+    size = max_page_size or (offset + limit)
+    return size, offset // size, offset % size
@@ -0,0 +1,101 @@
+"""Serialized API payloads as stored in the response cache.
+
+A Payload holds a result both as a Python object (for cross-reference and
+cursor pagination, which combine results) and as the final JSON bytes served
+by /api/data, plus a strong ETag and lazily built gzip/brotli variants. Each
+representation is computed once per cache entry, so a cache hit is served
+with no serialization or compression work.
+
+Brotli is used when the optional 'brotli' package is installed.
+"""
+import gzip
+import hashlib
+import os
+import threading
+
+from api import jsoncodec
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+# Bodies smaller than this are not worth compressing.
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', '1024'))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+
+
+def compress(body, encoding):
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+class Payload:
+    """A result with lazily computed JSON body, ETag and compressed variants."""
+
+    def __init__(self, value=None, body=None, loader=None):
+        if value is None and body is None and loader is None:
+            raise ValueError("Payload needs a value, a body or a body loader")
+        self._value = value
+        self._body = body
+        self._loader = loader
+        self._etag = None
+        self._variants = {}
+        self._lock = threading.Lock()
+
+    @property
+    def value(self):
+        if self._value is None:
+            self._value = jsoncodec.loads(self.body)
+        return self._value
+
+    @property
+    def body(self):
+        if self._body is None:
+            if self._loader is not None:
+                # e.g. a snapshot entry, read on first use
+                with self._lock:
+                    if self._body is None:
+                        self._body = self._loader()
+            else:
+                # Sorted keys match jsonify, so ETags are stable across processes
+                self._body = jsoncodec.dumps(self._value, sort_keys=True)
+        return self._body
+
+    @property
+    def etag(self):
+        """Strong ETag (unquoted) of the identity body."""
+        if self._etag is None:
+            self._etag = hashlib.sha256(self.body).hexdigest()[:32]
+        return self._etag
+
+    def negotiate(self, accept_encodings):
+        """Pick a content coding from a werkzeug Accept-Encoding header, or None."""
+        if len(self.body) < COMPRESS_MIN_BYTES:
+            return None
+        return accept_encodings.best_match(ENCODINGS)
+
+    def encoded(self, encoding=None):
+        """(body, etag) for a content coding; None means identity."""
+        if encoding is None:
+            return self.body, self.etag
+        variant = self._variants.get(encoding)
+        if variant is None:
+            with self._lock:
+                variant = self._variants.get(encoding)
+                if variant is None:
+                    variant = compress(self.body, encoding)
+                    self._variants[encoding] = variant
+        return variant, f"{self.etag}-{encoding}"
+
+    def sizes(self):
+        """Byte sizes of the identity body and every variant built so far."""
+        sizes = {'identity': len(self.body)}
+        sizes.update({k: len(v) for k, v in self._variants.items()})
+        return sizes
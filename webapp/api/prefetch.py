@@ -0,0 +1,202 @@
+"""Background prefetch of every agency sub_section's default view.
+
+Each (agency, sub_section) declared in the manifest is a fixed view with its
+own cache_ttl. The scheduler refreshes each one shortly before its cached
+copy expires (REFRESH_AT of the TTL, +/- JITTER so views with equal TTLs
+don't fire together) and writes the result into the response cache, so
+user-facing requests for default views are served from memory. A default
+view is the sub_section with no query, at each page size in PREFETCH_LIMITS:
+the limit is part of the cache key, so these must be the page sizes clients
+send. The default, 20, is the frontend's default page size; 'none' warms the
+no-limit view. Agencies that need an API key are skipped.
+
+At most HOST_CONCURRENCY prefetches run against one upstream host at a time;
+a view whose host is busy is retried a few seconds later. Failed refreshes
+back off exponentially up to the view's TTL. Upstream calls run at prefetch
+priority, so they queue behind interactive traffic for rate-limited hosts
+(api/ratelimit.py).
+
+With several worker processes sharing the L2 cache, only one of them
+prefetches: start_elected() runs the scheduler in whichever process holds an
+exclusive lock next to the L2 database, and another takes over when it exits.
+
+Enabled with PREFETCH_ENABLED=true.
+"""
+import heapq
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; every process prefetches there
+    fcntl = None
+
+from api import metrics, ratelimit
+
+ENABLED = os.environ.get('PREFETCH_ENABLED', '').lower() in ('1', 'true', 'yes')
+WORKERS = int(os.environ.get('PREFETCH_WORKERS', '4'))
+HOST_CONCURRENCY = int(os.environ.get('PREFETCH_HOST_CONCURRENCY', '1'))
+# Refresh when an entry reaches this fraction of its TTL.
+REFRESH_AT = float(os.environ.get('PREFETCH_REFRESH_AT', '0.8'))
+JITTER = float(os.environ.get('PREFETCH_JITTER', '0.1'))
+# Initial runs are spread over this many seconds after startup.
+STARTUP_SPREAD = float(os.environ.get('PREFETCH_STARTUP_SPREAD', '30'))
+# Page sizes to warm per sub_section; the frontend sends limit=20 unless the
+# user picks another size.
+LIMITS = [None if n.strip().lower() == 'none' else int(n)
+          for n in os.environ.get('PREFETCH_LIMITS', '20').split(',') if n.strip()] or [None]
+BUSY_RETRY = 5
+MIN_INTERVAL = 10
+
+log = logging.getLogger(__name__)
+
+
+class Target:
+    __slots__ = ('agency_id', 'sub_section', 'limit', 'ttl', 'host', 'failures', 'last_run', 'last_outcome')
+
+    def __init__(self, agency_id, sub_section, limit, ttl, host):
+        self.agency_id = agency_id
+        self.sub_section = sub_section
+        self.limit = limit
+        self.ttl = ttl
+        self.host = host
+        self.failures = 0
+        self.last_run = None
+        self.last_outcome = None
+
+
+def targets_from_manifest(manifest, default_ttl, limits=LIMITS):
+    """One Target per declared sub_section and limit, keyed to its agency's upstream host."""
+    targets = []
+    for meta in manifest['agencies']:
+        if meta.get('auth_required'):
+            continue
+        host = urlsplit(meta.get('base_url', '')).netloc.lower() or meta['id']
+        for sub in meta.get('sub_sections', []):
+            for limit in limits:
+                targets.append(Target(meta['id'], sub['id'], limit, sub.get('cache_ttl', default_ttl), host))
+    return targets
+
+
+class Scheduler:
+    """Runs refresh(target) -> outcome for each target on its own cadence.
+
+    refresh returns 'ok', 'error' or 'skipped' (already fresh, e.g. refreshed
+    by another worker through the shared cache).
+    """
+
+    def __init__(self, targets, refresh, workers=WORKERS, host_concurrency=HOST_CONCURRENCY,
+                 refresh_at=REFRESH_AT, jitter=JITTER, startup_spread=STARTUP_SPREAD):
+        self.targets = list(targets)
+        self.refresh = refresh
+        self.refresh_at = refresh_at
+        self.jitter = jitter
+        self._host_slots = {t.host: threading.Semaphore(host_concurrency) for t in self.targets}
+        self._queue = [(random.uniform(0, startup_spread), i) for i in range(len(self.targets))]
+        heapq.heapify(self._queue)
+        self._cond = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='prefetch')
+        self._stopped = False
+        self._thread = None
+        self._start = None
+        self._lock_file = None
+
+    def _interval(self, target):
+        if target.failures:
+            base = min(target.ttl, MIN_INTERVAL * 2 ** target.failures)
+        else:
+            base = target.ttl * self.refresh_at
+        return max(MIN_INTERVAL, base * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def _schedule(self, index, delay):
+        with self._cond:
+            heapq.heappush(self._queue, (time.monotonic() - self._start + delay, index))
+            self._cond.notify()
+
+    def _run(self, index):
+        target = self.targets[index]
+        slot = self._host_slots[target.host]
+        try:
+            try:
+                with ratelimit.priority(ratelimit.PREFETCH):
+                    outcome = self.refresh(target)
+            except Exception:
+                log.exception("Prefetch of %s/%s failed", target.agency_id, target.sub_section)
+                outcome = 'error'
+            target.failures = target.failures + 1 if outcome == 'error' else 0
+            target.last_run = time.time()
+            target.last_outcome = outcome
+            metrics.PREFETCH_RUNS.inc(agency=target.agency_id, outcome=outcome)
+        finally:
+            slot.release()
+            if not self._stopped:
+                self._schedule(index, self._interval(target))
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    now = time.monotonic() - self._start
+                    if self._queue and self._queue[0][0] <= now:
+                        _, index = heapq.heappop(self._queue)
+                        break
+                    self._cond.wait(timeout=self._queue[0][0] - now if self._queue else None)
+                else:
+                    return
+            target = self.targets[index]
+            if self._host_slots[target.host].acquire(blocking=False):
+                self._pool.submit(self._run, index)
+            else:
+                self._schedule(index, BUSY_RETRY * random.uniform(1, 1 + self.jitter))
+
+    def start(self):
+        self._start = time.monotonic()
+        self._thread = threading.Thread(target=self._loop, name='prefetch-scheduler', daemon=True)
+        self._thread.start()
+        return self
+
+    def start_elected(self, lock_path):
+        """Start once this process holds an exclusive lock on lock_path.
+
+        Waits in a background thread; the OS releases the lock when the
+        holding process exits, letting a waiting one take over.
+        """
+        if fcntl is None:
+            return self.start()
+
+        def wait_for_lock():
+            lock = open(lock_path, 'a')
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self._lock_file = lock  # held for the life of the process
+            log.info("Prefetch lock %s acquired by pid %d", lock_path, os.getpid())
+            self.start()
+
+        threading.Thread(target=wait_for_lock, name='prefetch-election', daemon=True).start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._pool.shutdown(wait=False)
+
+    def stats(self):
+        with self._cond:
+            now = time.monotonic() - (self._start or time.monotonic())
+            due = {index: at - now for at, index in self._queue}
+        return [{
+            'agency': t.agency_id,
+            'sub_section': t.sub_section,
+            'limit': t.limit,
+            'ttl': t.ttl,
+            'host': t.host,
+            'last_run': t.last_run,
+            'last_outcome': t.last_outcome,
+            'failures': t.failures,
+            'next_in_seconds': round(due[i], 1) if i in due else None,
+        } for i, t in enumerate(self.targets)]
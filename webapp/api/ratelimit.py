@@ -0,0 +1,313 @@
+"""Token-bucket rate limits for upstreams with published quotas.
+
+Each rule below covers one upstream (by host suffix) and has a limit for
+anonymous or DEMO_KEY traffic and, where the upstream issues keys, a higher
+limit per API key. Every (rule, key) pair gets its own token bucket. A call
+that finds its bucket empty queues for a token instead of failing, up to
+MAX_WAIT seconds (PREFETCH_MAX_WAIT for background prefetch); if the wait
+would be longer than that, it fails at once with RateLimitedError.
+
+Waiters are served in priority order: interactive calls before prefetch
+calls, first come first served within a priority. Prefetch calls also leave
+PREFETCH_RESERVE of each bucket's burst for interactive traffic. Callers set
+their priority with the priority() context manager; the default is
+interactive.
+
+Buckets are per process. With several worker processes, set
+RATE_LIMIT_WORKERS so each process takes its share of every quota.
+"""
+import asyncio
+import contextlib
+import contextvars
+import hashlib
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+from api import jsoncodec, metrics
+
+ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+MAX_WAIT = float(os.environ.get('RATE_LIMIT_MAX_WAIT', '5'))
+PREFETCH_MAX_WAIT = float(os.environ.get('RATE_LIMIT_PREFETCH_MAX_WAIT', '30'))
+# Fraction of each bucket's burst that prefetch calls may not use.
+PREFETCH_RESERVE = float(os.environ.get('RATE_LIMIT_PREFETCH_RESERVE', '0.2'))
+WORKERS = int(os.environ.get('RATE_LIMIT_WORKERS', os.environ.get('WEB_CONCURRENCY', '1')))
+# Buckets kept before the least recently used keyed ones are dropped (API keys
+# come from clients, so their number is unbounded).
+MAX_BUCKETS = 1024
+# Async waiters that are not at the head of the queue re-check this often (s).
+ASYNC_POLL = 0.05
+
+INTERACTIVE = 0
+PREFETCH = 1
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', PREFETCH: 'prefetch'}
+
+_priority = contextvars.ContextVar('upstream_priority', default=INTERACTIVE)
+
+
+class RateLimitedError(requests.exceptions.ConnectionError):
+    """Raised when no token becomes available within the caller's wait budget."""
+
+
+@contextlib.contextmanager
+def priority(level):
+    """Run upstream calls in this block (and tasks it spawns) at the given priority."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def _query_key(name):
+    def key(url, headers, body):
+        values = parse_qs(urlsplit(url).query).get(name)
+        return values[0] if values else None
+    return key
+
+
+def _header_key(name):
+    def key(url, headers, body):
+        return headers.get(name)
+    return key
+
+
+def _body_key(name):
+    def key(url, headers, body):
+        try:
+            return jsoncodec.loads(body).get(name)
+        except (TypeError, ValueError, AttributeError):
+            return None
+    return key
+
+
+class Rule:
+    def __init__(self, name, anonymous, keyed=None, key=None, anonymous_keys=()):
+        self.name = name
+        self.anonymous = anonymous  # (requests, per seconds)
+        self.keyed = keyed
+        self.key = key
+        self.anonymous_keys = anonymous_keys
+
+    def matches(self, host):
+        return host == self.name or host.endswith('.' + self.name)
+
+    def classify(self, url, headers, body):
+        """(tier, api key or None) for a request under this rule."""
+        api_key = self.key(url, headers, body) if self.key else None
+        if not api_key or api_key in self.anonymous_keys or not self.keyed:
+            return 'anonymous', None
+        return 'keyed', api_key
+
+
+# api.data.gov hosts (NASA, FEC) allow DEMO_KEY 30 requests/hour; NVD allows
+# 5 requests per 30 s without a key; BLS v2 allows 25 queries/day
+# unregistered; SEC EDGAR asks for at most 10 requests/s across sec.gov.
+RULES = (
+    Rule('sec.gov', (10, 1)),
+    Rule('api.nasa.gov', (30, 3600), (1000, 3600), _query_key('api_key'), ('DEMO_KEY',)),
+    Rule('api.open.fec.gov', (30, 3600), (1000, 3600), _query_key('api_key'), ('DEMO_KEY',)),
+    Rule('services.nvd.nist.gov', (5, 30), (50, 30), _header_key('apiKey')),
+    Rule('api.bls.gov', (25, 86400), (500, 86400), _body_key('registrationkey')),
+)
+
+
+class TokenBucket:
+    """Token bucket with a priority-ordered queue of waiters."""
+
+    def __init__(self, rule, tier, rate, burst):
+        self.rule = rule
+        self.tier = tier
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.granted = 0
+        self.queued = 0
+        self.rejected = 0
+        self._waiters = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def _labels(self, level):
+        return {'rule': self.rule, 'tier': self.tier, 'priority': PRIORITY_NAMES[level]}
+
+    def _need(self, level):
+        if level == INTERACTIVE:
+            return 1
+        return min(self.burst, 1 + self.burst * PREFETCH_RESERVE)
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _enter(self, level, max_wait):
+        """Take a token now, or join the queue. Returns True, a waiter, or None (rejected)."""
+        now = time.monotonic()
+        self._refill(now)
+        need = self._need(level)
+        if not self._waiters and self.tokens >= need:
+            self.tokens -= 1
+            self.granted += 1
+            metrics.RATE_LIMIT_CALLS.inc(outcome='immediate', **self._labels(level))
+            return True
+        ahead = sum(1 for p, _ in self._waiters if p <= level)
+        if (ahead + need - self.tokens) / self.rate > max_wait:
+            self.rejected += 1
+            metrics.RATE_LIMIT_CALLS.inc(outcome='rejected', **self._labels(level))
+            return None
+        waiter = (level, next(self._seq))
+        heapq.heappush(self._waiters, waiter)
+        metrics.RATE_LIMIT_QUEUE.inc(**self._labels(level))
+        return waiter
+
+    def _poll(self, waiter):
+        """(granted, seconds until the next useful check) for a queued waiter."""
+        self._refill(time.monotonic())
+        need = self._need(waiter[0])
+        if self._waiters[0] != waiter:
+            return False, None
+        if self.tokens >= need:
+            self.tokens -= 1
+            return True, 0
+        return False, (need - self.tokens) / self.rate
+
+    def _leave(self, waiter, granted):
+        self._waiters.remove(waiter)
+        heapq.heapify(self._waiters)
+        self._cond.notify_all()
+        labels = self._labels(waiter[0])
+        metrics.RATE_LIMIT_QUEUE.dec(**labels)
+        if granted:
+            self.granted += 1
+            self.queued += 1
+            metrics.RATE_LIMIT_CALLS.inc(outcome='queued', **labels)
+        else:
+            self.rejected += 1
+            metrics.RATE_LIMIT_CALLS.inc(outcome='rejected', **labels)
+
+    def acquire(self, level=INTERACTIVE, max_wait=MAX_WAIT):
+        """Take a token, waiting up to max_wait seconds; False if none came."""
+        with self._cond:
+            waiter = self._enter(level, max_wait)
+            if waiter is None or waiter is True:
+                return waiter is True
+            deadline = time.monotonic() + max_wait
+            granted = False
+            try:
+                while True:
+                    granted, wait = self._poll(waiter)
+                    remaining = deadline - time.monotonic()
+                    if granted or remaining <= 0:
+                        return granted
+                    self._cond.wait(min(remaining, wait) if wait else remaining)
+            finally:
+                self._leave(waiter, granted)
+
+    async def acquire_async(self, level=INTERACTIVE, max_wait=MAX_WAIT):
+        """acquire() for coroutines: waits with asyncio.sleep instead of blocking."""
+        with self._cond:
+            waiter = self._enter(level, max_wait)
+        if waiter is None or waiter is True:
+            return waiter is True
+        deadline = time.monotonic() + max_wait
+        granted = False
+        try:
+            while True:
+                with self._cond:
+                    granted, wait = self._poll(waiter)
+                remaining = deadline - time.monotonic()
+                if granted or remaining <= 0:
+                    return granted
+                await asyncio.sleep(min(remaining, wait or ASYNC_POLL))
+        finally:
+            with self._cond:
+                self._leave(waiter, granted)
+
+    def drain(self):
+        """Empty the bucket, e.g. after the upstream answered 429."""
+        with self._cond:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, 0)
+
+    def snapshot(self):
+        with self._cond:
+            self._refill(time.monotonic())
+            return {
+                'rule': self.rule,
+                'tier': self.tier,
+                'rate_per_s': round(self.rate, 4),
+                'burst': self.burst,
+                'tokens': round(self.tokens, 2),
+                'queue_depth': len(self._waiters),
+                'granted': self.granted,
+                'queued': self.queued,
+                'rejected': self.rejected,
+            }
+
+
+_buckets = OrderedDict()  # least recently used first
+_lock = threading.Lock()
+
+
+def bucket_for(host, url, headers, body):
+    """The TokenBucket governing a request to host, or None if it is unlimited."""
+    if not ENABLED:
+        return None
+    rule = next((r for r in RULES if r.matches(host)), None)
+    if rule is None:
+        return None
+    tier, api_key = rule.classify(url, headers, body)
+    # Keys are held only as digests so they never appear in stats.
+    ident = hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16] if api_key else None
+    key = (rule.name, ident)
+    with _lock:
+        bucket = _buckets.get(key)
+        if bucket is not None:
+            _buckets.move_to_end(key)
+            return bucket
+        count, period = rule.keyed if api_key else rule.anonymous
+        count = max(1, count // WORKERS)
+        bucket = _buckets[key] = TokenBucket(rule.name, tier, count / period, count)
+        _evict()
+    return bucket
+
+
+def _evict():
+    """Drop least recently used keyed buckets past MAX_BUCKETS.
+
+    Anonymous buckets (one per rule) and buckets with queued waiters are kept.
+    A client whose bucket was dropped starts again from a full burst.
+    """
+    excess = len(_buckets) - MAX_BUCKETS
+    doomed = []
+    for key, bucket in _buckets.items():
+        if len(doomed) >= excess:
+            break
+        if key[1] is not None and not bucket._waiters:
+            doomed.append(key)
+    for key in doomed:
+        del _buckets[key]
+
+
+def wait_budget():
+    """(priority, max wait in seconds) for the calling context."""
+    level = _priority.get()
+    return level, PREFETCH_MAX_WAIT if level == PREFETCH else MAX_WAIT
+
+
+def rejected(bucket):
+    return RateLimitedError(f"Rate limit for {bucket.rule} ({bucket.tier}) exhausted; try again later")
+
+
+def snapshot():
+    """Per-bucket state for the health endpoint (keys themselves are not shown)."""
+    with _lock:
+        buckets = list(_buckets.values())
+    return [b.snapshot() for b in sorted(buckets, key=lambda b: (b.rule, b.tier))]
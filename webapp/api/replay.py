@@ -0,0 +1,252 @@
+"""Record/replay of upstream HTTP exchanges for offline tests and benchmarks.
+
+Recording: with UPSTREAM_RECORD_DIR set, http_client appends every live
+upstream exchange to <dir>/<host>.jsonl (a "cassette"). API keys in query
+strings and bodies are redacted before anything is written.
+
+Replay: a stand-in upstream server serves those cassettes. Point the app at it
+with UPSTREAM_BASE_URL; http_client then rewrites https://<host>/<path> to
+<base>/<host>/<path>, which covers every agency module, including the ones
+with hard-coded URLs. Per-host latency and jitter can be injected.
+
+    cd webapp
+    UPSTREAM_RECORD_DIR=cassettes python app.py            # record
+    python -m api.replay serve cassettes --port 8765 \\
+        --latency '*=80' --latency services.nvd.nist.gov=900 --jitter '*=30'
+    UPSTREAM_BASE_URL=http://127.0.0.1:8765 python app.py  # replay
+
+ReplayAdapter serves the same cassettes in-process (no sockets) for
+micro-benchmarks; install it with http_client.use_transport().
+"""
+import argparse
+import base64
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import BaseAdapter
+
+RECORD_DIR = os.environ.get('UPSTREAM_RECORD_DIR', '')
+UPSTREAM_BASE_URL = os.environ.get('UPSTREAM_BASE_URL', '').rstrip('/')
+
+SECRET_PARAMS = {'api_key', 'apikey', 'key', 'registrationkey', 'token'}
+_SECRET_BODY = re.compile(r'("(?:%s)"\s*:\s*)"[^"]*"' % '|'.join(SECRET_PARAMS), re.IGNORECASE)
+
+_record_lock = threading.Lock()
+
+
+def redact_url(url):
+    """Normalize a URL (sorted query) with secret parameters blanked."""
+    parts = urlsplit(url)
+    query = [(k, 'REDACTED' if k.lower() in SECRET_PARAMS else v)
+             for k, v in parse_qsl(parts.query, keep_blank_values=True)]
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(sorted(query)), ''))
+
+
+def redact_body(body):
+    if body is None:
+        return ''
+    if isinstance(body, bytes):
+        body = body.decode('utf-8', 'replace')
+    return _SECRET_BODY.sub(r'\1"REDACTED"', body)
+
+
+def rewrite_url(url):
+    """Map an upstream URL onto the stand-in server when UPSTREAM_BASE_URL is set."""
+    if not UPSTREAM_BASE_URL:
+        return url
+    parts = urlsplit(url)
+    return f"{UPSTREAM_BASE_URL}/{parts.netloc}{parts.path or '/'}" + (f"?{parts.query}" if parts.query else '')
+
+
+def _encode_body(content):
+    try:
+        return {'text': content.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {'base64': base64.b64encode(content).decode('ascii')}
+
+
+def record(prepared, resp, record_dir=None):
+    """Append one exchange to the host's cassette."""
+    record_dir = record_dir or RECORD_DIR
+    host = urlsplit(prepared.url).netloc.lower()
+    interaction = {
+        'method': prepared.method,
+        'url': redact_url(prepared.url),
+        'body': redact_body(prepared.body),
+        'status': resp.status_code,
+        'headers': {k: v for k, v in resp.headers.items() if k.lower() == 'content-type'},
+        'response': _encode_body(resp.content),
+    }
+    line = json.dumps(interaction) + '\n'
+    with _record_lock:
+        os.makedirs(record_dir, exist_ok=True)
+        with open(os.path.join(record_dir, f"{host}.jsonl"), 'a') as f:
+            f.write(line)
+
+
+def load_cassettes(cassette_dir):
+    """{host: [interaction, ...]} from every <host>.jsonl in cassette_dir."""
+    cassettes = {}
+    for name in sorted(os.listdir(cassette_dir)):
+        if name.endswith('.jsonl'):
+            with open(os.path.join(cassette_dir, name)) as f:
+                cassettes[name[:-len('.jsonl')]] = [json.loads(line) for line in f if line.strip()]
+    return cassettes
+
+
+def response_body(interaction):
+    resp = interaction['response']
+    return resp['text'].encode('utf-8') if 'text' in resp else base64.b64decode(resp['base64'])
+
+
+class CassetteIndex:
+    """Lookup of recorded exchanges: exact URL and body first, then method + path."""
+
+    def __init__(self, cassettes):
+        if isinstance(cassettes, str):
+            cassettes = load_cassettes(cassettes)
+        self.cassettes = cassettes
+        self._index = {}
+        for upstream, interactions in cassettes.items():
+            for i in interactions:
+                self._index.setdefault((i['method'], i['url'], i.get('body', '')), i)
+                parts = urlsplit(i['url'])
+                self._index.setdefault((i['method'], upstream, parts.path), i)
+
+    def match(self, method, upstream, path, query, body):
+        url = redact_url(urlunsplit(('https', upstream, path, query, '')))
+        exact = self._index.get((method, url, redact_body(body)))
+        return exact or self._index.get((method, upstream, path))
+
+
+class ReplayAdapter(BaseAdapter):
+    """requests transport adapter answering from cassettes without any I/O."""
+
+    def __init__(self, cassettes):
+        super().__init__()
+        self.index = cassettes if isinstance(cassettes, CassetteIndex) else CassetteIndex(cassettes)
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        interaction = self.index.match(request.method, parts.netloc.lower(), parts.path, parts.query, request.body)
+        resp = requests.Response()
+        resp.request = request
+        resp.url = request.url
+        if interaction is None:
+            resp.status_code = 404
+            resp._content = json.dumps({'error': f'No recorded exchange for {request.method} {request.url}'}).encode()
+        else:
+            resp.status_code = interaction['status']
+            resp.headers.update(interaction.get('headers', {}))
+            resp._content = response_body(interaction)
+        resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+        return resp
+
+    def close(self):
+        pass
+
+
+class ReplayServer:
+    """Stand-in upstream serving recorded cassettes at /<host>/<path>."""
+
+    def __init__(self, cassettes, latency=None, jitter=None, host='127.0.0.1', port=0, seed=None):
+        self.index = CassetteIndex(cassettes)
+        self.cassettes = self.index.cassettes
+        self.latency = latency or {}
+        self.jitter = jitter or {}
+        self.random = random.Random(seed)
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def delay_for(self, upstream):
+        base = self.latency.get(upstream, self.latency.get('*', 0))
+        spread = self.jitter.get(upstream, self.jitter.get('*', 0))
+        return max(0.0, base + self.random.uniform(-spread, spread)) / 1000.0
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _serve(self):
+                parts = urlsplit(self.path)
+                upstream, _, path = parts.path.lstrip('/').partition('/')
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else None
+                interaction = server.index.match(self.command, upstream, '/' + path, parts.query, body)
+                time.sleep(server.delay_for(upstream))
+                if interaction is None:
+                    payload = json.dumps({'error': f'No recorded exchange for {self.command} {upstream}/{path}'}).encode()
+                    status, headers = 404, {'Content-Type': 'application/json'}
+                else:
+                    payload = response_body(interaction)
+                    status, headers = interaction['status'], interaction.get('headers', {})
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = _serve
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, name='replay-server', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def parse_host_values(pairs):
+    """Parse repeated 'host=ms' options ('*' is the default host)."""
+    out = {}
+    for pair in pairs or []:
+        host, _, ms = pair.partition('=')
+        out[host] = float(ms)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve recorded upstream cassettes.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve = sub.add_parser('serve')
+    serve.add_argument('cassettes')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--latency', action='append', help="host=ms (repeatable, '*' for all)")
+    serve.add_argument('--jitter', action='append', help="host=ms (repeatable, '*' for all)")
+    serve.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    server = ReplayServer(args.cassettes, parse_host_values(args.latency), parse_host_values(args.jitter),
+                          host=args.host, port=args.port, seed=args.seed)
+    print(f"Replaying {sum(len(v) for v in server.cassettes.values())} exchanges "
+          f"for {len(server.cassettes)} hosts on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
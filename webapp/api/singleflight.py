@@ -0,0 +1,122 @@
+"""Single-flight deduplication of identical concurrent calls.
+
+While a call for a key is in flight, later callers with the same key wait for
+it and share its result instead of issuing their own. A failure is re-raised
+to each caller as its own copy of the exception (same type and args): one
+instance raised in several threads at once would share, and keep growing, a
+single __traceback__.
+"""
+import asyncio
+import functools
+import threading
+
+
+def fresh_error(error):
+    """A new exception of error's type and args, chained to error."""
+    try:
+        copy = type(error)(*error.args)
+    except Exception:  # constructor that does not take its own args back
+        return error
+    copy.__cause__ = error
+    return copy
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """Run fn() once per concurrent key; return (result, shared)."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise fresh_error(call.error)
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls),
+            }
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines on one event loop."""
+
+    def __init__(self):
+        self._calls = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        """Await fn() once per concurrent key; return (result, shared).
+
+        fn() runs in its own task, which every caller waits on without owning
+        it: a caller that is cancelled (deadline, disconnect) stops waiting but
+        the shared call keeps running for the others.
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+        if shared:
+            self.coalesced += 1
+        else:
+            task = self._calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(functools.partial(self._finished, key))
+            self.executed += 1
+        # Not `await task`: that re-raises the task's one exception instance in every caller
+        await asyncio.wait([task])
+        if task.cancelled():
+            raise asyncio.CancelledError()
+        if task.exception() is not None:
+            raise fresh_error(task.exception())
+        return task.result(), shared
+
+    def _finished(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller has gone
+
+    def stats(self):
+        return {
+            'executed': self.executed,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._calls),
+        }
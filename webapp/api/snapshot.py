@@ -0,0 +1,119 @@
+"""Response-cache snapshots for warm starts.
+
+A snapshot is one compact file: a magic string, a JSON index (key, offset,
+length, stored_at, ttl per entry) and the zlib-compressed response bodies.
+Loading (CACHE_SNAPSHOT=<file> at startup) parses only the index; the file is
+memory-mapped and each body is decompressed the first time it is served.
+
+Entries keep their original age and TTL, so anything past its TTL comes up
+stale and is served once while a background refresh replaces it. Entries
+older than the stale-while-revalidate window are rebased to just-expired so
+they still act as seeds.
+
+    cd webapp
+    # from a running server (admin-gated; sends ADMIN_TOKEN if set)
+    python -m api.snapshot export cache.snap --url http://127.0.0.1:5000
+    # or from the shared disk cache
+    python -m api.snapshot export cache.snap --l2 /var/cache/opengovdash/cache.sqlite3
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+
+# Version 2: cache keys carry an API key digest; older snapshots are refused.
+MAGIC = b'OGDSNAP2'
+_HEADER = struct.Struct('<I')
+PATH = os.environ.get('CACHE_SNAPSHOT', '')
+
+
+def dumps(entries):
+    """Serialize [(key, body, stored_at, ttl)] into snapshot bytes."""
+    index, blobs, offset = [], [], 0
+    for key, body, stored_at, ttl in entries:
+        blob = zlib.compress(bytes(body), 6)
+        index.append([list(key), offset, len(blob), stored_at, ttl])
+        blobs.append(blob)
+        offset += len(blob)
+    header = json.dumps({'created': time.time(), 'entries': index}).encode('utf-8')
+    return b''.join([MAGIC, _HEADER.pack(len(header)), header] + blobs)
+
+
+def write(data, path):
+    """Atomically write snapshot bytes to path."""
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def read_index(mm):
+    """(index entries, offset of the first body) from a mapped snapshot."""
+    if mm[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a cache snapshot")
+    start = len(MAGIC) + _HEADER.size
+    (length,) = _HEADER.unpack(mm[len(MAGIC):start])
+    header = json.loads(mm[start:start + length])
+    return header['entries'], start + length
+
+
+def load(path, response_cache, max_stale, payload_factory):
+    """Seed response_cache from a snapshot without decompressing any body.
+
+    payload_factory(loader) wraps a zero-argument callable returning the body
+    bytes. Returns the number of entries loaded.
+    """
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    entries, base = read_index(mm)
+    now = time.time()
+    for key, offset, length, stored_at, ttl in entries:
+        if now - stored_at >= ttl + max_stale:
+            stored_at = now - ttl  # too old for SWR: keep as a just-expired seed
+        start = base + offset
+
+        def loader(start=start, length=length):
+            return zlib.decompress(mm[start:start + length])
+
+        response_cache.set(tuple(key), payload_factory(loader), ttl, stored_at=stored_at)
+    return len(entries)
+
+
+def _from_url(url):
+    import requests
+    token = os.environ.get('ADMIN_TOKEN')
+    headers = {'X-Admin-Token': token} if token else {}
+    resp = requests.get(f"{url.rstrip('/')}/api/admin/cache/snapshot", headers=headers, timeout=60)
+    resp.raise_for_status()
+    return resp.content
+
+
+def _from_l2(path):
+    import sqlite3
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    rows = conn.execute('SELECT key, body, stored_at, ttl FROM entries').fetchall()
+    return dumps((tuple(json.loads(k)), body, stored_at, ttl) for k, body, stored_at, ttl in rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a response-cache snapshot.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    export = sub.add_parser('export')
+    export.add_argument('output')
+    source = export.add_mutually_exclusive_group(required=True)
+    source.add_argument('--url', help="running server to snapshot (uses /api/admin/cache/snapshot)")
+    source.add_argument('--l2', help="L2 cache database to snapshot")
+    args = parser.parse_args(argv)
+
+    data = _from_url(args.url) if args.url else _from_l2(args.l2)
+    count = len(read_index(data)[0])
+    write(data, args.output)
+    print(f"Wrote {count} entries ({len(data) // 1024} KB) to {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
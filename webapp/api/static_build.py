@@ -0,0 +1,202 @@
+"""Fingerprinted, precompressed build of the single-file frontend.
+
+static/index.html carries ~300 KB of inline script and ~45 KB of inline CSS.
+The build moves both into content-hashed files under static/dist/ and leaves
+a small entry document referencing them:
+
+    static/dist/index.html          entry document (short TTL, revalidated)
+    static/dist/app.<hash>.css      immutable
+    static/dist/app.<hash>.js       immutable
+    static/dist/build.json          source hash and file list
+
+Assets replaced by a rebuild stay in dist/ (and servable) for KEEP_SECONDS,
+so clients and CDNs still holding an older entry document can load them.
+Every file also gets .gz (and, with the optional 'brotli' package, .br)
+siblings so the server never compresses on the request path. The app serves
+the build when it matches the current index.html and falls back to the raw
+file otherwise.
+
+    cd webapp && python -m api.static_build
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import time
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static')
+SOURCE_PATH = os.path.join(STATIC_DIR, 'index.html')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+BUILD_FILE = 'build.json'
+ENTRY = 'index.html'
+# How long assets from earlier builds are kept after being replaced.
+KEEP_SECONDS = int(os.environ.get('STATIC_KEEP_SECONDS', str(7 * 86400)))
+
+_STYLE = re.compile(r'<style>\s*(.*?)\s*</style>', re.DOTALL)
+_SCRIPT = re.compile(r'<script>\s*(.*?)\s*</script>', re.DOTALL)
+
+
+def _sha1(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def _fingerprint(name, data):
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+
+
+def split(html):
+    """Split index.html into (entry_html, {asset_name: bytes}).
+
+    Only the inline <style> block and the last inline <script> block are
+    extracted; asset references are relative so the entry document works
+    wherever dist/ is mounted.
+    """
+    assets = {}
+    style = _STYLE.search(html)
+    if style:
+        css = style.group(1).encode('utf-8')
+        name = _fingerprint('app.css', css)
+        assets[name] = css
+        html = html[:style.start()] + f'<link rel="stylesheet" href="dist/{name}">' + html[style.end():]
+    scripts = list(_SCRIPT.finditer(html))
+    if scripts:
+        script = scripts[-1]
+        js = script.group(1).encode('utf-8')
+        name = _fingerprint('app.js', js)
+        assets[name] = js
+        html = html[:script.start()] + f'<script src="dist/{name}"></script>' + html[script.end():]
+    return html, assets
+
+
+def _write(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def _write_variants(dist, name, data):
+    _write(os.path.join(dist, name), data)
+    _write(os.path.join(dist, name + '.gz'), gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli:
+        _write(os.path.join(dist, name + '.br'), brotli.compress(data, quality=11))
+
+
+def _read_record(dist):
+    try:
+        with open(os.path.join(dist, BUILD_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _remove_variants(dist, name):
+    # Names come from build.json; never follow one outside dist.
+    if os.path.basename(name) != name:
+        return
+    for suffix in ('', '.gz', '.br'):
+        path = os.path.join(dist, name + suffix)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def build(source=SOURCE_PATH, dist=DIST_DIR, keep_seconds=KEEP_SECONDS):
+    """Write the entry document and fingerprinted assets; returns the build record.
+
+    Assets of earlier builds are recorded under 'previous' with the time they
+    were replaced and removed once older than keep_seconds. Only files listed
+    in dist's previous build.json are removed, and dist may not contain the
+    source file.
+    """
+    source, dist = os.path.abspath(source), os.path.abspath(dist)
+    if os.path.commonpath([source, dist]) == dist:
+        raise ValueError(f"Output directory {dist} contains the source file {source}")
+    with open(source, 'rb') as f:
+        raw = f.read()
+    entry, assets = split(raw.decode('utf-8'))
+    os.makedirs(dist, exist_ok=True)
+    last = _read_record(dist) or {}
+    now = int(time.time())
+    previous = dict(last.get('previous', {}))
+    previous.update((name, now) for name in last.get('assets', []))
+    for name, replaced_at in list(previous.items()):
+        if name in assets:
+            del previous[name]
+        elif now - replaced_at >= keep_seconds:
+            _remove_variants(dist, name)
+            del previous[name]
+    _write_variants(dist, ENTRY, entry.encode('utf-8'))
+    for name, data in assets.items():
+        _write_variants(dist, name, data)
+    record = {'source_sha1': _sha1(raw), 'entry': ENTRY, 'assets': sorted(assets),
+              'previous': dict(sorted(previous.items()))}
+    with open(os.path.join(dist, BUILD_FILE), 'w') as f:
+        json.dump(record, f, indent=2)
+        f.write('\n')
+    return record
+
+
+class StaticFile:
+    """One built file held in memory with its precompressed variants."""
+
+    def __init__(self, path):
+        self.mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.variants = {}
+        for encoding, suffix in ((None, ''), ('gzip', '.gz'), ('br', '.br')):
+            if os.path.exists(path + suffix):
+                with open(path + suffix, 'rb') as f:
+                    self.variants[encoding] = f.read()
+        self.etag = hashlib.sha256(self.variants[None]).hexdigest()[:32]
+
+    def encoded(self, accept_encodings):
+        """(body, encoding, etag) for the best variant the client accepts."""
+        offered = [e for e in ('br', 'gzip') if e in self.variants]
+        encoding = accept_encodings.best_match(offered) if offered else None
+        etag = f"{self.etag}-{encoding}" if encoding else self.etag
+        return self.variants[encoding], encoding, etag
+
+
+def load(source=SOURCE_PATH, dist=DIST_DIR):
+    """{name: StaticFile} for a build matching source, or None if missing/stale."""
+    try:
+        with open(os.path.join(dist, BUILD_FILE)) as f:
+            record = json.load(f)
+        with open(source, 'rb') as f:
+            if record.get('source_sha1') != _sha1(f.read()):
+                return None
+        files = {name: StaticFile(os.path.join(dist, name))
+                 for name in [record['entry']] + record['assets']}
+        for name in record.get('previous', {}):
+            path = os.path.join(dist, os.path.basename(name))
+            if os.path.exists(path):
+                files.setdefault(name, StaticFile(path))
+        return files
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the fingerprinted, precompressed frontend.")
+    parser.add_argument('output', nargs='?', default=DIST_DIR,
+                        help="directory to write the build to (default: %(default)s)")
+    args = parser.parse_args(argv)
+    dist = args.output
+    try:
+        record = build(dist=dist)
+    except ValueError as e:
+        parser.error(str(e))
+    for name in [record['entry']] + record['assets']:
+        sizes = {s or 'raw': os.path.getsize(os.path.join(dist, name + s))
+                 for s in ('', '.gz', '.br') if os.path.exists(os.path.join(dist, name + s))}
+        print(f"{name:<28} " + '  '.join(f"{k} {v // 1024} KB" for k, v in sizes.items()))
+
+
+if __name__ == '__main__':
+    main()
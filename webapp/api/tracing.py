@@ -0,0 +1,167 @@
+"""Opt-in per-request tracing and sampling profiler.
+
+When TRACING_ENABLED is set, a request carrying 'X-Trace: 1' (or ?trace=1)
+records spans for each upstream call, JSON parse, agency module call and
+response serialization. The trace travels in a context variable, so spans
+from fan-out and refresh worker threads attach to the request that spawned
+them. 'profile' instead of '1' also samples the request thread's stack every
+PROFILE_INTERVAL seconds.
+
+Summaries go back in a Server-Timing header; with TRACE_DIR set, the full
+trace (spans plus folded profile stacks) is written to <TRACE_DIR>/<id>.json.
+"""
+import collections
+import contextlib
+import contextvars
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+
+ENABLED = os.environ.get('TRACING_ENABLED', '').lower() in ('1', 'true', 'yes')
+TRACE_DIR = os.environ.get('TRACE_DIR', '')
+PROFILE_INTERVAL = float(os.environ.get('PROFILE_INTERVAL', '0.005'))
+
+_current = contextvars.ContextVar('ogd_trace', default=None)
+_parent = contextvars.ContextVar('ogd_span_parent', default=None)
+
+
+class Trace:
+    def __init__(self, name):
+        self.id = secrets.token_hex(8)
+        self.name = name
+        self.start = time.perf_counter()
+        self.spans = []
+        self.profile = None
+        self._lock = threading.Lock()
+
+    def add(self, span):
+        with self._lock:
+            span['id'] = len(self.spans)
+            self.spans.append(span)
+            return span['id']
+
+    def summary(self):
+        """Total and self time (ms) per span name; self excludes child spans."""
+        with self._lock:
+            spans = list(self.spans)
+        child_ms = collections.Counter()
+        for s in spans:
+            if s['parent'] is not None:
+                child_ms[s['parent']] += s.get('duration_ms', 0.0)
+        totals = collections.OrderedDict()
+        for s in spans:
+            t = totals.setdefault(s['name'], {'count': 0, 'total_ms': 0.0, 'self_ms': 0.0})
+            duration = s.get('duration_ms', 0.0)  # still-running spans count as 0
+            t['count'] += 1
+            t['total_ms'] += duration
+            t['self_ms'] += max(0.0, duration - child_ms[s['id']])
+        return {
+            'id': self.id,
+            'name': self.name,
+            'elapsed_ms': round((time.perf_counter() - self.start) * 1000, 2),
+            'spans': {k: {kk: round(vv, 2) for kk, vv in v.items()} for k, v in totals.items()},
+            'profile_top': self.profile.top(10) if self.profile else None,
+        }
+
+    def server_timing(self):
+        parts = [f"{name.replace('.', '-')};dur={v['self_ms']:.1f}"
+                 for name, v in self.summary()['spans'].items()]
+        parts.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.1f}")
+        return ', '.join(parts)
+
+    def dump(self):
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            'summary': self.summary(),
+            'spans': spans,
+            'profile_folded': self.profile.folded() if self.profile else None,
+        }
+
+
+class SamplingProfiler:
+    """Samples one thread's Python stack on a timer; stacks are kept folded."""
+
+    def __init__(self, thread_id, interval=PROFILE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='trace-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def folded(self):
+        """Samples in the folded-stack format flamegraph tools read."""
+        return [f"{stack} {n}" for stack, n in self.samples.most_common()]
+
+    def top(self, n):
+        """Leaf functions with the most samples."""
+        leaves = collections.Counter()
+        for stack, count in self.samples.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        return leaves.most_common(n)
+
+
+def start(name, profile=False):
+    """Begin tracing the current context; returns the Trace."""
+    trace = Trace(name)
+    if profile:
+        trace.profile = SamplingProfiler(threading.get_ident()).start()
+    _current.set(trace)
+    _parent.set(None)
+    return trace
+
+
+def finish(trace):
+    """Stop profiling, write the trace file if configured, and detach it."""
+    if trace.profile:
+        trace.profile.stop()
+    if TRACE_DIR:
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        with open(os.path.join(TRACE_DIR, f"{trace.id}.json"), 'w') as f:
+            json.dump(trace.dump(), f, indent=1, default=str)
+    _current.set(None)
+
+
+def current():
+    return _current.get()
+
+
+@contextlib.contextmanager
+def span(name, **attrs):
+    """Record a span on the active trace; a no-op when tracing is off."""
+    trace = _current.get()
+    if trace is None:
+        yield attrs
+        return
+    record = {'name': name, 'parent': _parent.get(), 'thread': threading.current_thread().name,
+              'start_ms': round((time.perf_counter() - trace.start) * 1000, 3), 'attrs': attrs}
+    span_id = trace.add(record)
+    token = _parent.set(span_id)
+    begin = time.perf_counter()
+    try:
+        yield attrs
+    finally:
+        record['duration_ms'] = (time.perf_counter() - begin) * 1000
+        _parent.reset(token)
@@ -1,110 +1,466 @@
 """OpenGovDash - Open Government Data Dashboard Backend"""
-from flask import Flask, jsonify, request, send_from_directory, send_file
+from flask import Flask, Response, g, jsonify, request, send_from_directory, send_file, stream_with_context
 from flask_cors import CORS
 import os
 import json
 import importlib
+import functools
+import hashlib
+import hmac
+import math
+import threading
+import time
 import traceback
 
+from api import cache, circuit_breaker, cursors, dispatch, fanout, http_client, jsoncodec, l2cache, manifest, metrics, payload, prefetch, ratelimit, snapshot, static_build, tracing
+from api.agency_modules import AGENCY_REGISTRY
+
 app = Flask(__name__, static_folder='static')
+app.json = jsoncodec.JSONProvider(app)
 CORS(app)
 
-# Registry of all agency modules
-AGENCY_REGISTRY = {
-    'sec': 'api.agency_modules.sec',
-    'fda': 'api.agency_modules.fda',
-    'treasury': 'api.agency_modules.treasury',
-    'usaspending': 'api.agency_modules.usaspending',
-    'noaa': 'api.agency_modules.noaa',
-    'epa': 'api.agency_modules.epa',
-    'census': 'api.agency_modules.census',
-    'doj': 'api.agency_modules.doj',
-    'bls': 'api.agency_modules.bls',
-    'fcc': 'api.agency_modules.fcc',
-    'usgs': 'api.agency_modules.usgs',
-    'nasa': 'api.agency_modules.nasa',
-    'ftc': 'api.agency_modules.ftc',
-    'nist': 'api.agency_modules.nist',
-    'sam': 'api.agency_modules.sam',
-    'fec': 'api.agency_modules.fec',
-    'fdic': 'api.agency_modules.fdic',
-    'nih': 'api.agency_modules.nih',
-    'loc': 'api.agency_modules.loc',
-    'nara': 'api.agency_modules.nara',
-    'dot': 'api.agency_modules.dot',
-}
+# Agency metadata is precomputed (api/agency_manifest.json) so listing agencies
+# never imports the modules themselves.
+AGENCY_MANIFEST = manifest.load(AGENCY_REGISTRY)
+AGENCY_META = {meta['id']: meta for meta in AGENCY_MANIFEST['agencies']}
+AGENCIES_BODY = jsoncodec.dumps(AGENCY_MANIFEST['agencies'])
+AGENCIES_ETAG = hashlib.sha256(AGENCIES_BODY).hexdigest()[:32]
+
+# Largest page a client may request; modules push limit/offset down to the
+# upstream's own paging and clamp further to each upstream's cap.
+MAX_LIMIT = int(os.environ.get('MAX_LIMIT', '1000'))
+# Deepest offset a client may request; upstreams that page by token or page
+# number fetch every row before it.
+MAX_OFFSET = int(os.environ.get('MAX_OFFSET', '10000'))
+
+# Trust loopback clients on admin endpoints without ADMIN_TOKEN (local dev only).
+ADMIN_ALLOW_LOOPBACK = os.environ.get('ADMIN_ALLOW_LOOPBACK', '').lower() in ('1', 'true', 'yes')
+
+# Warn when a single agency module takes longer than this to import.
+IMPORT_BUDGET_MS = float(os.environ.get('IMPORT_BUDGET_MS', '250'))
+
+# Fingerprinted, precompressed frontend (python -m api.static_build). Without a
+# build matching static/index.html, '/' serves the raw file.
+STATIC_BUILD = static_build.load()
+ENTRY_CACHE_CONTROL = f"public, max-age={int(os.environ.get('ENTRY_MAX_AGE', '60'))}"
+ASSET_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+if STATIC_BUILD is None and os.path.isdir(static_build.DIST_DIR):
+    app.logger.warning("static/dist is stale; serving raw index.html (run python -m api.static_build)")
+
+# Warm start: seed the response cache from a snapshot before serving traffic.
+if snapshot.PATH:
+    try:
+        loaded = snapshot.load(snapshot.PATH, cache.response_cache, cache.MAX_STALE,
+                               lambda loader: payload.Payload(loader=loader))
+        app.logger.info("Loaded %d cache entries from snapshot %s", loaded, snapshot.PATH)
+    except (OSError, ValueError) as e:
+        app.logger.warning("Could not load cache snapshot %s: %s", snapshot.PATH, e)
 
 # Cache loaded modules
 _module_cache = {}
 
 def get_module(agency_id):
+    """Import an agency module on first use, checking it against the import budget."""
     if agency_id not in _module_cache:
         module_path = AGENCY_REGISTRY.get(agency_id)
         if module_path:
+            start = time.perf_counter()
             _module_cache[agency_id] = importlib.import_module(module_path)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if elapsed_ms > IMPORT_BUDGET_MS:
+                app.logger.warning("Importing %s took %.0f ms (budget %.0f ms)",
+                                   module_path, elapsed_ms, IMPORT_BUDGET_MS)
     return _module_cache.get(agency_id)
 
+# agency_id -> AgencyRoute (data callable + valid sub_section ids), built once.
+DISPATCH = dispatch.build(AGENCY_MANIFEST, get_module)
+
+def _metric_labels():
+    """Bounded (agency, sub_section) labels for the current request."""
+    agency_id = (request.view_args or {}).get('agency_id', '')
+    if not agency_id:
+        return '', ''
+    route = DISPATCH.get(agency_id)
+    if not route:
+        return 'unknown', ''
+    try:
+        return agency_id, route.resolve_sub_section(request.args.get('sub_section', ''))
+    except dispatch.UnknownSubSection:
+        return agency_id, 'unknown'
+
+@app.before_request
+def _start_request_metrics():
+    g.metrics_start = time.monotonic()
+    g.metrics_endpoint = request.endpoint or 'unknown'
+    metrics.IN_FLIGHT.inc(endpoint=g.metrics_endpoint)
+
+@app.after_request
+def _record_request_metrics(response):
+    agency_id, sub_section = _metric_labels()
+    labels = {'endpoint': g.metrics_endpoint, 'agency': agency_id, 'sub_section': sub_section}
+    metrics.REQUESTS.inc(status=response.status_code, **labels)
+    metrics.REQUEST_LATENCY.observe(time.monotonic() - g.metrics_start, **labels)
+    return response
+
+@app.before_request
+def _start_trace():
+    """Start a trace when enabled and asked for via X-Trace or ?trace= (1, profile, inline)."""
+    mode = request.headers.get('X-Trace') or request.args.get('trace')
+    if tracing.ENABLED and mode and mode != '0':
+        g.trace_mode = mode
+        g.trace = tracing.start(f"{request.method} {request.path}", profile=mode == 'profile')
+
+@app.after_request
+def _finish_trace(response):
+    trace = g.pop('trace', None)
+    if trace is None:
+        return response
+    tracing.finish(trace)
+    response.headers['Server-Timing'] = trace.server_timing()
+    response.headers['X-Trace-Id'] = trace.id
+    if (g.trace_mode == 'inline' and response.is_json and not response.is_streamed
+            and response.status_code != 304 and 'Content-Encoding' not in response.headers):
+        body = response.get_json()
+        if isinstance(body, dict):
+            body['_trace'] = trace.summary()
+            response.set_data(jsoncodec.dumps(body))
+            # The cached payload's ETag describes the body without _trace
+            response.headers.pop('ETag', None)
+    return response
+
+@app.teardown_request
+def _end_request_metrics(exc):
+    if 'metrics_endpoint' in g:
+        metrics.IN_FLIGHT.dec(endpoint=g.metrics_endpoint)
+
+@metrics.register_collector
+def _cache_metrics():
+    caches = {
+        'response': cache.response_cache.stats(),
+        'cursor': cursors.result_sets.stats(),
+        'negative': http_client.negative_cache_stats(),
+    }
+    if l2cache.disk_cache:
+        caches['l2'] = dict(l2cache.disk_cache.stats(), stale_hits=0)
+    flights = http_client.coalescing_stats()
+    return [
+        ('ogd_cache_hits_total', 'counter', 'Cache hits (fresh).',
+         [({'cache': n}, st['hits']) for n, st in caches.items()]),
+        ('ogd_cache_stale_hits_total', 'counter', 'Cache hits served stale while revalidating.',
+         [({'cache': n}, st['stale_hits']) for n, st in caches.items()]),
+        ('ogd_cache_misses_total', 'counter', 'Cache misses.',
+         [({'cache': n}, st['misses']) for n, st in caches.items()]),
+        ('ogd_cache_evictions_total', 'counter', 'Cache LRU evictions.',
+         [({'cache': n}, st['evictions']) for n, st in caches.items()]),
+        ('ogd_cache_entries', 'gauge', 'Entries currently cached.',
+         [({'cache': n}, st['entries']) for n, st in caches.items()]),
+        ('ogd_upstream_coalesced_total', 'counter', 'Upstream calls coalesced onto an identical in-flight call.',
+         [({}, flights['coalesced'])]),
+        ('ogd_upstream_executed_total', 'counter', 'Upstream calls executed by a single-flight leader.',
+         [({}, flights['executed'])]),
+    ]
+
+def _static_response(static_file, cache_control):
+    """Serve a built file's best precompressed variant with ETag revalidation."""
+    body, encoding, etag = static_file.encoded(request.accept_encodings)
+    resp = Response(body, mimetype=static_file.mimetype)
+    if encoding:
+        resp.headers['Content-Encoding'] = encoding
+    resp.headers['Vary'] = 'Accept-Encoding'
+    resp.headers['Cache-Control'] = cache_control
+    resp.set_etag(etag)
+    return resp.make_conditional(request)
+
 @app.route('/')
 def index():
-    return send_file('static/index.html')
+    if STATIC_BUILD is None:
+        return send_file('static/index.html')
+    return _static_response(STATIC_BUILD[static_build.ENTRY], ENTRY_CACHE_CONTROL)
+
+@app.route('/dist/<path:filename>')
+def static_asset(filename):
+    """Fingerprinted build assets; their names change with their content."""
+    static_file = (STATIC_BUILD or {}).get(filename)
+    if static_file is None or filename == static_build.ENTRY:
+        return jsonify({"error": "Not found"}), 404
+    return _static_response(static_file, ASSET_CACHE_CONTROL)
 
 @app.route('/api/agencies', methods=['GET'])
 def list_agencies():
-    """List all available agencies with metadata."""
-    agencies = []
-    for agency_id in AGENCY_REGISTRY:
-        try:
-            mod = get_module(agency_id)
-            if mod and hasattr(mod, 'get_metadata'):
-                meta = mod.get_metadata()
-                meta['id'] = agency_id
-                agencies.append(meta)
-        except Exception as e:
-            agencies.append({'id': agency_id, 'name': agency_id.upper(), 'error': str(e)})
-    return jsonify(agencies)
+    """List all available agencies with metadata (pre-serialized, ETag-validated)."""
+    resp = jsoncodec.json_response(AGENCIES_BODY)
+    resp.set_etag(AGENCIES_ETAG)
+    resp.headers['Cache-Control'] = 'public, max-age=300'
+    return resp.make_conditional(request)
 
 @app.route('/api/data/<agency_id>', methods=['GET'])
 def get_agency_data(agency_id):
     """Fetch data from a specific agency."""
-    mod = get_module(agency_id)
-    if not mod:
+    if agency_id not in AGENCY_REGISTRY:
         return jsonify({"error": f"Unknown agency: {agency_id}"}), 404
+    route = DISPATCH.get(agency_id)
+    if not route:
+        return jsonify({"error": f"No data function found for {agency_id}"}), 500
 
     api_key = request.args.get('api_key', '')
-    sub_section = request.args.get('sub_section', '')
     query = request.args.get('query', '')
     limit = request.args.get('limit', type=int)
+    offset = request.args.get('offset', type=int)
+
+    try:
+        data_func, sub_section = route.handler(request.args.get('sub_section', ''))
+    except dispatch.UnknownSubSection as e:
+        return jsonify({"error": str(e), "valid_sub_sections": e.valid}), 400
+
+    params = data_params(sub_section, query, limit, offset)
 
+    cursor = request.args.get('cursor', '')
+    page_size = request.args.get('page_size', type=int)
+    if cursor or page_size:
+        return _paginate(agency_id, data_func, api_key, params, cursor, page_size)
+
+    try:
+        entry, state, age = cached_payload(agency_id, data_func, api_key, params)
+        with tracing.span('serialize'):
+            return _payload_response(entry, state, age)
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e), "traceback": traceback.format_exc()}), 500
+
+def data_params(sub_section, query, limit, offset):
+    """Module params for a data request; limit and offset are clamped to MAX_LIMIT and MAX_OFFSET."""
     params = {}
     if sub_section:
         params['sub_section'] = sub_section
     if query:
         params['query'] = query
     if limit:
-        params['limit'] = limit
-
-    # Find the main data function
-    func_name = f"get_{agency_id}_data"
-    data_func = getattr(mod, func_name, None)
-    if not data_func:
-        # Try common patterns
-        for attr in dir(mod):
-            if attr.startswith('get_') and attr.endswith('_data') and callable(getattr(mod, attr)):
-                data_func = getattr(mod, attr)
-                break
-
-    if not data_func:
-        return jsonify({"error": f"No data function found for {agency_id}"}), 500
+        params['limit'] = max(1, min(limit, MAX_LIMIT))
+    if offset and offset > 0:
+        params['offset'] = min(offset, MAX_OFFSET)
+    return params
 
-    try:
+def _cache_ttl(agency_id, sub_section, query):
+    """TTL for a response: the sub_section's declared cache_ttl, else the default.
+
+    Free-text searches always use the default TTL.
+    """
+    subs = AGENCY_META.get(agency_id, {}).get('sub_sections', [])
+    if query or not subs:
+        return cache.DEFAULT_TTL
+    for sub in subs:
+        if sub.get('id') == sub_section or (not sub_section and sub is subs[0]):
+            return sub.get('cache_ttl', cache.DEFAULT_TTL)
+    return cache.DEFAULT_TTL
+
+def _is_error_result(result):
+    """True when a module reported an upstream failure instead of data."""
+    if not isinstance(result, dict):
+        return True
+    rows = result.get('results')
+    return bool(rows) and isinstance(rows[0], dict) and 'error' in rows[0]
+
+def _key_digest(api_key):
+    """Short digest identifying a client's API key in cache and cursor keys ('' for none)."""
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16] if api_key else ''
+
+def _cache_key(agency_id, params, api_key=''):
+    """Response cache key; results fetched with a client's API key are cached per key."""
+    return (agency_id, params.get('sub_section', ''), params.get('query', ''),
+            params.get('limit'), params.get('offset', 0), _key_digest(api_key))
+
+def _store_result(key, result):
+    """Apply the limit, wrap result in a Payload and cache it unless it is an error."""
+    sub_section, query, limit = key[1], key[2], key[3]
+    # Apply limit to results if the module didn't handle it
+    if limit and isinstance(result, dict) and 'results' in result:
+        result['results'] = result['results'][:limit]
+    entry = payload.Payload(result)
+    if not _is_error_result(result):
+        ttl = _cache_ttl(key[0], sub_section, query)
+        cache.response_cache.set(key, entry, ttl)
+        if l2cache.disk_cache:
+            l2cache.disk_cache.set(key, entry.body, ttl)
+    return entry
+
+def _cache_lookup(key):
+    """(CacheEntry, state) from the in-process cache, falling back to the shared disk tier.
+
+    A stale in-process entry is also checked against the disk tier, where
+    another worker (e.g. the elected prefetcher) may have stored a fresh copy.
+    """
+    entry, state = cache.response_cache.lookup(key, max_stale=cache.MAX_STALE)
+    if state == cache.STALE and l2cache.disk_cache:
+        row = l2cache.disk_cache.get(key)
+        if row is not None and row[1] > entry.stored_at:
+            body, stored_at, ttl = row
+            return cache.response_cache.set(key, payload.Payload(body=body), ttl, stored_at=stored_at), cache.FRESH
+    if entry is None and l2cache.disk_cache:
+        row = l2cache.disk_cache.get(key, max_stale=cache.MAX_STALE)
+        if row is not None:
+            body, stored_at, ttl = row
+            entry = cache.response_cache.set(key, payload.Payload(body=body), ttl, stored_at=stored_at)
+            state = cache.STALE if entry.expired else cache.FRESH
+    return entry, state
+
+def _fill_cache(key, data_func, api_key, params):
+    """Fetch from the agency module, store the result under key and return its Payload."""
+    with tracing.span('module', agency=key[0], sub_section=key[1]):
         result = data_func(api_key=api_key, params=params)
-        # Apply limit to results if the module didn't handle it
-        if limit and isinstance(result, dict) and 'results' in result:
-            result['results'] = result['results'][:limit]
-        return jsonify(result)
-    except Exception as e:
-        traceback.print_exc()
-        return jsonify({"error": str(e), "traceback": traceback.format_exc()}), 500
+    return _store_result(key, result)
+
+def cached_payload(agency_id, data_func, api_key, params):
+    """Call an agency data function through the response cache.
+
+    Returns (Payload, state, age_seconds) with state 'hit', 'stale' or 'miss'.
+    An expired entry within cache.MAX_STALE is served immediately while one
+    background refresh runs; anything older is fetched synchronously. Error
+    results are not cached.
+    """
+    key = _cache_key(agency_id, params, api_key)
+    entry, state = _cache_lookup(key)
+    if entry is not None:
+        if state == cache.STALE:
+            cache.response_cache.refresh_in_background(
+                key, functools.partial(_fill_cache, key, data_func, api_key, dict(params)))
+            return entry.value, 'stale', int(entry.age)
+        return entry.value, 'hit', int(entry.age)
+    return _fill_cache(key, data_func, api_key, params), 'miss', 0
+
+def fetch_cached(agency_id, data_func, api_key, params):
+    """cached_payload() as a plain result carrying 'cached', 'stale' and 'age_seconds'."""
+    entry, state, age = cached_payload(agency_id, data_func, api_key, params)
+    result = entry.value
+    if isinstance(result, dict):
+        result = dict(result, cached=state != 'miss', stale=state == 'stale', age_seconds=age)
+    return result
+
+def _prefetch(target):
+    """Refresh one default view for the prefetch scheduler unless it is still fresh.
+
+    A view refreshed recently by another worker (through the shared disk
+    cache) is picked up instead of being fetched again. The caches are only
+    peeked at, so polling doesn't count towards their hit/miss stats.
+    """
+    params = data_params(target.sub_section, '', target.limit, None)
+    key = _cache_key(target.agency_id, params)
+    entry = cache.response_cache.peek(key)
+    if entry is not None and entry.age < entry.ttl * prefetch.REFRESH_AT:
+        return 'skipped'
+    if l2cache.disk_cache:
+        row = l2cache.disk_cache.peek(key)
+        if row is not None and time.time() - row[1] < row[2] * prefetch.REFRESH_AT:
+            cache.response_cache.set(key, payload.Payload(body=row[0]), row[2], stored_at=row[1])
+            return 'skipped'
+    result = _fill_cache(key, DISPATCH[target.agency_id].data_func, '', params)
+    return 'error' if _is_error_result(result.value) else 'ok'
+
+def _payload_response(entry, state, age):
+    """Serve a Payload's pre-serialized (and, if accepted, pre-compressed) bytes.
+
+    Cache status travels in X-Cache/Age headers so the body, and with it the
+    strong ETag, stays identical across hits; If-None-Match yields a 304.
+    """
+    encoding = entry.negotiate(request.accept_encodings)
+    body, etag = entry.encoded(encoding)
+    resp = jsoncodec.json_response(body)
+    if encoding:
+        resp.headers['Content-Encoding'] = encoding
+    resp.headers['Vary'] = 'Accept-Encoding'
+    resp.headers['X-Cache'] = state.upper()
+    resp.headers['Age'] = str(age)
+    resp.set_etag(etag)
+    return resp.make_conditional(request)
+
+def _paginate(agency_id, data_func, api_key, params, cursor, page_size):
+    """Serve one page of a cursor-paginated query.
+
+    A request with page_size (and no cursor) materializes a result set and
+    returns its first page; requests with cursor=<next_cursor> continue it.
+    """
+    if page_size:
+        page_size = max(1, min(page_size, MAX_LIMIT))
+
+    def fetch_window(window_params):
+        if 'page_token' in window_params:
+            # Upstream cursors aren't part of the response cache key
+            return data_func(api_key=api_key, params=window_params)
+        return fetch_cached(agency_id, data_func, api_key, window_params)
+
+    try:
+        if cursor:
+            rs, rows, next_cursor = cursors.page(agency_id, cursor, fetch_window, page_size,
+                                                 owner=_key_digest(api_key), max_page_size=MAX_LIMIT)
+        else:
+            base = {k: v for k, v in params.items() if k != 'limit'}
+            rs, rows, next_cursor = cursors.first_page(agency_id, base, page_size, fetch_window,
+                                                       owner=_key_digest(api_key))
+    except cursors.InvalidCursor as e:
+        return jsonify({"error": str(e)}), 410 if 'expired' in str(e) else 400
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 502
+    return jsonify(dict(rs.meta, results=rows, next_cursor=next_cursor))
+
+@app.route('/api/health/upstreams', methods=['GET'])
+def upstream_health():
+    """Per-host circuit breaker state, error rate and latency, and rate-limit buckets."""
+    return jsonify({
+        "hosts": circuit_breaker.snapshot(),
+        "negative_cache": http_client.negative_cache_stats(),
+        "rate_limits": ratelimit.snapshot(),
+    })
+
+def _admin_allowed():
+    """Admin endpoints need ADMIN_TOKEN; without one they are closed.
+
+    The token may be sent as X-Admin-Token or as a bearer token (for scrapers).
+    ADMIN_ALLOW_LOOPBACK=true also admits loopback clients without a token;
+    don't set it behind a reverse proxy, where every request is loopback.
+    """
+    token = os.environ.get('ADMIN_TOKEN', '').encode('utf-8')
+    if token:
+        for sent in (request.headers.get('X-Admin-Token', ''),
+                     request.headers.get('Authorization', '').removeprefix('Bearer ')):
+            if hmac.compare_digest(sent.encode('utf-8'), token):
+                return True
+    return ADMIN_ALLOW_LOOPBACK and request.remote_addr in ('127.0.0.1', '::1')
+
+@app.route('/api/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus text-format metrics (admin-gated)."""
+    if not _admin_allowed():
+        return jsonify({"error": "Forbidden"}), 403
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/admin/cache', methods=['GET', 'DELETE'])
+def admin_cache():
+    """Inspect (GET) or purge (DELETE, optionally ?agency=&sub_section=) the response cache."""
+    if not _admin_allowed():
+        return jsonify({"error": "Forbidden"}), 403
+    if request.method == 'DELETE':
+        scope = {'agency': request.args.get('agency') or None,
+                 'sub_section': request.args.get('sub_section') or None}
+        purged = cache.response_cache.purge(**scope)
+        if l2cache.disk_cache:
+            l2cache.disk_cache.purge(**scope)
+        return jsonify({"purged": purged, "stats": cache.response_cache.stats()})
+    return jsonify({
+        "stats": cache.response_cache.stats(),
+        "l2": l2cache.disk_cache.stats() if l2cache.disk_cache else None,
+        "coalescing": http_client.coalescing_stats(),
+        "cursors": cursors.result_sets.stats(),
+        "prefetch": PREFETCHER.stats() if PREFETCHER else None,
+        "entries": cache.response_cache.describe(),
+    })
+
+@app.route('/api/admin/cache/snapshot', methods=['GET'])
+def admin_cache_snapshot():
+    """Download a snapshot of the response cache (load it with CACHE_SNAPSHOT)."""
+    if not _admin_allowed():
+        return jsonify({"error": "Forbidden"}), 403
+    entries = [(key, e.value.body, e.stored_at, e.ttl) for key, e in cache.response_cache.items()]
+    return Response(snapshot.dumps(entries), mimetype='application/octet-stream',
+                    headers={'Content-Disposition': 'attachment; filename=cache.snap'})
 
 @app.route('/api/chat', methods=['POST'])
 def chat():
@@ -195,27 +551,155 @@ between agencies and explain regulatory relationships."""
             status_code = 429
         return jsonify({"error": error_msg}), status_code
 
+def _fetch_route(route, api_key, params):
+    """Resolve a route's data function (importing its module) and fetch through the cache."""
+    return fetch_cached(route.agency_id, route.data_func, api_key, params)
+
+def _cross_reference_tasks(agencies, query):
+    """Build {agency_id: callable} for every agency that has a data function."""
+    tasks = {}
+    for agency_id in agencies:
+        route = DISPATCH.get(agency_id)
+        if route:
+            params = {'query': query, 'sub_section': route.default_sub_section}
+            tasks[agency_id] = functools.partial(_fetch_route, route, '', params)
+    return tasks
+
+def _seconds(value, name):
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        seconds = None
+    if isinstance(value, bool) or seconds is None or not math.isfinite(seconds) or seconds <= 0:
+        raise ValueError(f"{name} must be a positive number of seconds")
+    return seconds
+
+def _fanout_deadlines(data):
+    """Read optional global/per-agency deadlines (seconds) from a request body.
+
+    Raises ValueError (reported as a 400) for values that are not positive numbers.
+    """
+    deadline = data.get('deadline')
+    deadline = fanout.DEFAULT_DEADLINE if deadline is None else min(_seconds(deadline, 'deadline'),
+                                                                    fanout.DEFAULT_DEADLINE)
+    agency_deadlines = data.get('agency_deadlines') or {}
+    if not isinstance(agency_deadlines, dict):
+        raise ValueError("agency_deadlines must be an object mapping agency ids to seconds")
+    task_deadlines = {k: _seconds(v, f"agency_deadlines.{k}") for k, v in agency_deadlines.items()}
+    return {'deadline': deadline, 'task_deadlines': task_deadlines}
+
+def _cross_reference_entry(outcome):
+    """Turn a fan-out outcome into the per-agency payload returned to clients."""
+    if outcome['status'] == 'ok' and isinstance(outcome['result'], dict):
+        entry = dict(outcome['result'])
+    elif outcome['status'] == 'ok':
+        entry = {"results": outcome['result']}
+    else:
+        entry = {"error": outcome['error']}
+    entry['status'] = outcome['status']
+    entry['elapsed_ms'] = outcome['elapsed_ms']
+    return entry
+
 @app.route('/api/cross-reference', methods=['POST'])
 def cross_reference():
-    """Cross-reference data between agencies."""
+    """Cross-reference data between agencies.
+
+    Agencies are queried concurrently. Each agency's entry carries 'status'
+    ('ok', 'error' or 'timeout') and 'elapsed_ms'; agencies that miss their
+    deadline come back as errors while the rest are returned as usual.
+    """
     data = request.json
     agencies = data.get('agencies', [])
     query = data.get('query', '')
 
+    try:
+        deadlines = _fanout_deadlines(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    tasks = _cross_reference_tasks(agencies, query)
     results = {}
-    for agency_id in agencies:
-        mod = get_module(agency_id)
-        if mod:
-            func_name = f"get_{agency_id}_data"
-            data_func = getattr(mod, func_name, None)
-            if data_func:
-                try:
-                    result = data_func(params={'query': query, 'sub_section': ''})
-                    results[agency_id] = result
-                except Exception as e:
-                    results[agency_id] = {"error": str(e)}
-
-    return jsonify(results)
+    for agency_id, outcome in fanout.iter_fanout(tasks, **deadlines):
+        results[agency_id] = _cross_reference_entry(outcome)
+
+    with tracing.span('serialize'):
+        return jsonify(results)
+
+@app.route('/api/cross-reference/stream', methods=['POST'])
+def cross_reference_stream():
+    """Streaming variant of /api/cross-reference.
+
+    Emits one event per agency as soon as it completes, then a summary event.
+    Responds with NDJSON by default, or Server-Sent Events when the client
+    sends 'Accept: text/event-stream'.
+    """
+    data = request.json
+    agencies = data.get('agencies', [])
+    query = data.get('query', '')
+    use_sse = 'text/event-stream' in request.headers.get('Accept', '')
+
+    try:
+        deadlines = _fanout_deadlines(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    tasks = _cross_reference_tasks(agencies, query)
+
+    def encode(event, payload):
+        line = jsoncodec.dumps(payload).decode('utf-8')
+        if use_sse:
+            return f"event: {event}\ndata: {line}\n\n"
+        return line + "\n"
+
+    def generate():
+        counts = {'ok': 0, 'error': 0, 'timeout': 0}
+        start = time.monotonic()
+        for agency_id, outcome in fanout.iter_fanout(tasks, **deadlines):
+            counts[outcome['status']] += 1
+            entry = _cross_reference_entry(outcome)
+            yield encode('result', {'event': 'result', 'agency': agency_id, **entry})
+        yield encode('summary', {
+            'event': 'summary',
+            'agencies': list(tasks),
+            'counts': counts,
+            'elapsed_ms': int((time.monotonic() - start) * 1000),
+        })
+
+    mimetype = 'text/event-stream' if use_sse else 'application/x-ndjson'
+    resp = Response(stream_with_context(generate()), mimetype=mimetype)
+    resp.headers['Cache-Control'] = 'no-cache'
+    resp.headers['X-Accel-Buffering'] = 'no'
+    return resp
+
+# Keep default views warm in the background (PREFETCH_ENABLED=true).
+PREFETCHER = None
+_prefetcher_pid = None
+_prefetcher_lock = threading.Lock()
+
+def start_prefetcher():
+    """Start this process's prefetch scheduler once, if enabled.
+
+    Runs on the first request rather than at import: under gunicorn --preload
+    the import happens in the master, whose threads don't survive the fork.
+    With the L2 cache shared by several workers, one of them is elected to
+    prefetch for all.
+    """
+    global PREFETCHER, _prefetcher_pid
+    if not prefetch.ENABLED or _prefetcher_pid == os.getpid():
+        return
+    with _prefetcher_lock:
+        if _prefetcher_pid == os.getpid():
+            return
+        PREFETCHER = prefetch.Scheduler(prefetch.targets_from_manifest(AGENCY_MANIFEST, cache.DEFAULT_TTL),
+                                        _prefetch)
+        if l2cache.disk_cache:
+            PREFETCHER.start_elected(l2cache.PATH + '.prefetch.lock')
+        else:
+            PREFETCHER.start()
+        _prefetcher_pid = os.getpid()
+
+@app.before_request
+def _start_prefetcher():
+    start_prefetcher()
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,268 @@
+"""OpenGovDash - ASGI serving mode.
+
+    cd webapp
+    pip install -r requirements.txt -r requirements-asgi.txt
+    uvicorn asgi:app --workers 1 --port 5000
+
+Serves the same routes as app.py. The hot data routes (/api/agencies,
+/api/data/<agency>, /api/cross-reference and its stream) run natively on the
+event loop: agency modules with an `aget_<agency>_data` coroutine do their
+upstream I/O through api/async_http.py, so one process can hold thousands of
+slow upstream calls open. Modules not yet ported run in worker threads via
+the dispatch adapter. Every other route (cursor pagination, chat, admin,
+metrics, health, the frontend) is served by the Flask app through a WSGI
+bridge, sharing its caches, breakers and metrics.
+"""
+import contextlib
+import functools
+import time
+import traceback
+from urllib.parse import parse_qs
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+from werkzeug.http import parse_accept_header, parse_etags
+
+import app as flask_app
+from api import async_http, cache, dispatch, fanout, jsoncodec, metrics, tracing
+from api.agency_modules import AGENCY_REGISTRY
+
+# Query parameters that need the cursor machinery, which stays on the Flask side.
+_FLASK_ONLY_PARAMS = ('cursor', 'page_size')
+
+
+def _int_arg(query_params, name):
+    try:
+        return int(query_params.get(name, ''))
+    except ValueError:
+        return None
+
+
+def _not_modified(request, etag):
+    return parse_etags(request.headers.get('if-none-match')).contains(etag)
+
+
+def _json(obj, status_code=200):
+    return Response(jsoncodec.dumps(obj, sort_keys=True), status_code=status_code, media_type='application/json')
+
+
+async def list_agencies(request):
+    headers = {'ETag': f'"{flask_app.AGENCIES_ETAG}"', 'Cache-Control': 'public, max-age=300'}
+    if _not_modified(request, flask_app.AGENCIES_ETAG):
+        return Response(status_code=304, headers=headers)
+    return Response(flask_app.AGENCIES_BODY, media_type='application/json', headers=headers)
+
+
+async def cached_payload(agency_id, route, api_key, params):
+    """Async app.cached_payload(): misses await the module's async entry point."""
+    key = flask_app._cache_key(agency_id, params, api_key)
+    entry, state = flask_app._cache_lookup(key)
+    if entry is not None:
+        if state == cache.STALE:
+            cache.response_cache.refresh_in_background(
+                key, functools.partial(flask_app._fill_cache, key, route.data_func, api_key, dict(params)))
+            return entry.value, 'stale', int(entry.age)
+        return entry.value, 'hit', int(entry.age)
+    with tracing.span('module', agency=agency_id, sub_section=key[1]):
+        result = await route.async_data_func(api_key=api_key, params=params)
+    return flask_app._store_result(key, result), 'miss', 0
+
+
+async def get_agency_data(request):
+    agency_id = request.path_params['agency_id']
+    if agency_id not in AGENCY_REGISTRY:
+        return _json({"error": f"Unknown agency: {agency_id}"}, 404)
+    route = flask_app.DISPATCH.get(agency_id)
+    if not route:
+        return _json({"error": f"No data function found for {agency_id}"}, 500)
+
+    args = request.query_params
+    try:
+        sub_section = route.resolve_sub_section(args.get('sub_section', ''))
+    except dispatch.UnknownSubSection as e:
+        return _json({"error": str(e), "valid_sub_sections": e.valid}, 400)
+    params = flask_app.data_params(sub_section, args.get('query', ''),
+                                   _int_arg(args, 'limit'), _int_arg(args, 'offset'))
+
+    try:
+        entry, state, age = await cached_payload(agency_id, route, args.get('api_key', ''), params)
+        with tracing.span('serialize'):
+            return _payload_response(request, entry, state, age)
+    except Exception as e:
+        traceback.print_exc()
+        return _json({"error": str(e), "traceback": traceback.format_exc()}, 500)
+
+
+def _payload_response(request, entry, state, age):
+    encoding = entry.negotiate(parse_accept_header(request.headers.get('accept-encoding')))
+    body, etag = entry.encoded(encoding)
+    headers = {'ETag': f'"{etag}"', 'Vary': 'Accept-Encoding', 'X-Cache': state.upper(), 'Age': str(age)}
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type='application/json', headers=headers)
+
+
+async def _fetch_route(route, query):
+    params = {'query': query, 'sub_section': route.default_sub_section}
+    entry, state, age = await cached_payload(route.agency_id, route, '', params)
+    result = entry.value
+    if isinstance(result, dict):
+        result = dict(result, cached=state != 'miss', stale=state == 'stale', age_seconds=age)
+    return result
+
+
+def _cross_reference_tasks(agencies, query):
+    return {agency_id: functools.partial(_fetch_route, flask_app.DISPATCH[agency_id], query)
+            for agency_id in agencies if agency_id in flask_app.DISPATCH}
+
+
+async def cross_reference(request):
+    data = await request.json()
+    try:
+        deadlines = flask_app._fanout_deadlines(data)
+    except ValueError as e:
+        return _json({"error": str(e)}, 400)
+    tasks = _cross_reference_tasks(data.get('agencies', []), data.get('query', ''))
+    results = {}
+    async for agency_id, outcome in fanout.aiter_fanout(tasks, **deadlines):
+        results[agency_id] = flask_app._cross_reference_entry(outcome)
+    return _json(results)
+
+
+async def cross_reference_stream(request):
+    data = await request.json()
+    try:
+        deadlines = flask_app._fanout_deadlines(data)
+    except ValueError as e:
+        return _json({"error": str(e)}, 400)
+    tasks = _cross_reference_tasks(data.get('agencies', []), data.get('query', ''))
+    use_sse = 'text/event-stream' in request.headers.get('accept', '')
+
+    def encode(event, payload):
+        line = jsoncodec.dumps(payload).decode('utf-8')
+        if use_sse:
+            return f"event: {event}\ndata: {line}\n\n"
+        return line + "\n"
+
+    async def generate():
+        counts = {'ok': 0, 'error': 0, 'timeout': 0}
+        start = time.monotonic()
+        async for agency_id, outcome in fanout.aiter_fanout(tasks, **deadlines):
+            counts[outcome['status']] += 1
+            entry = flask_app._cross_reference_entry(outcome)
+            yield encode('result', {'event': 'result', 'agency': agency_id, **entry})
+        yield encode('summary', {
+            'event': 'summary',
+            'agencies': list(tasks),
+            'counts': counts,
+            'elapsed_ms': int((time.monotonic() - start) * 1000),
+        })
+
+    media_type = 'text/event-stream' if use_sse else 'application/x-ndjson'
+    return StreamingResponse(generate(), media_type=media_type,
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def _instrumented(endpoint):
+    """Record the same request metrics as the Flask hooks, under the Flask endpoint name."""
+    @functools.wraps(endpoint)
+    async def run(request):
+        name = endpoint.__name__
+        agency_id = request.path_params.get('agency_id', '')
+        sub_section = ''
+        if agency_id:
+            route = flask_app.DISPATCH.get(agency_id)
+            try:
+                sub_section = route.resolve_sub_section(request.query_params.get('sub_section', ''))
+            except dispatch.UnknownSubSection:
+                sub_section = 'unknown'
+            except AttributeError:
+                agency_id = 'unknown'
+        labels = {'endpoint': name, 'agency': agency_id, 'sub_section': sub_section}
+        start = time.monotonic()
+        metrics.IN_FLIGHT.inc(endpoint=name)
+        try:
+            response = await endpoint(request)
+        finally:
+            metrics.IN_FLIGHT.dec(endpoint=name)
+        metrics.REQUESTS.inc(status=response.status_code, **labels)
+        metrics.REQUEST_LATENCY.observe(time.monotonic() - start, **labels)
+        return response
+    return run
+
+
+def _traced(endpoint):
+    """Trace requests sent with X-Trace or ?trace=, as app.py's _start_trace/_finish_trace do."""
+    @functools.wraps(endpoint)
+    async def run(request):
+        mode = request.headers.get('x-trace') or request.query_params.get('trace')
+        if not (tracing.ENABLED and mode and mode != '0'):
+            return await endpoint(request)
+        trace = tracing.start(f"{request.method} {request.url.path}", profile=mode == 'profile')
+        try:
+            response = await endpoint(request)
+        finally:
+            tracing.finish(trace)
+        if mode == 'inline':
+            response = _inline_trace(response, trace)
+        response.headers['Server-Timing'] = trace.server_timing()
+        response.headers['X-Trace-Id'] = trace.id
+        return response
+    return run
+
+
+def _inline_trace(response, trace):
+    """Add the trace summary to a JSON object body; the new body gets no ETag."""
+    if (isinstance(response, StreamingResponse) or response.media_type != 'application/json'
+            or response.status_code == 304 or 'content-encoding' in response.headers):
+        return response
+    body = jsoncodec.loads(response.body)
+    if not isinstance(body, dict):
+        return response
+    body['_trace'] = trace.summary()
+    headers = {k: v for k, v in response.headers.items()
+               if k not in ('content-length', 'content-type', 'etag')}
+    return Response(jsoncodec.dumps(body), status_code=response.status_code,
+                    media_type='application/json', headers=headers)
+
+
+@contextlib.asynccontextmanager
+async def _lifespan(_app):
+    flask_app.start_prefetcher()
+    yield
+    await async_http.close_all()
+
+
+native = Starlette(
+    routes=[
+        Route('/api/agencies', _instrumented(_traced(list_agencies)), methods=['GET']),
+        Route('/api/data/{agency_id}', _instrumented(_traced(get_agency_data)), methods=['GET']),
+        Route('/api/cross-reference', _instrumented(_traced(cross_reference)), methods=['POST']),
+        Route('/api/cross-reference/stream', _instrumented(_traced(cross_reference_stream)), methods=['POST']),
+    ],
+    # Same policy as CORS(app) on the Flask side: any origin, method and header.
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=_lifespan,
+)
+wsgi = WSGIMiddleware(flask_app.app)
+_NATIVE_PATHS = ('/api/agencies', '/api/cross-reference', '/api/cross-reference/stream')
+
+
+async def app(scope, receive, send):
+    """Route hot paths to the native Starlette app, everything else to Flask."""
+    if scope['type'] != 'http':
+        await native(scope, receive, send)  # lifespan
+        return
+    path = scope['path']
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    if path in _NATIVE_PATHS or (path.startswith('/api/data/')
+                                 and not any(p in query for p in _FLASK_ONLY_PARAMS)):
+        await native(scope, receive, send)
+    else:
+        await wsgi(scope, receive, send)
@@ -0,0 +1 @@
+# Benchmark harnesses (run with python -m benchmarks.<name> from webapp/)
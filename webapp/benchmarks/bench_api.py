@@ -0,0 +1,226 @@
+"""End-to-end benchmark of the Flask API against a simulated upstream.
+
+Runs the app in-process on a local port, points every upstream call at the
+stand-in server from api/replay.py, and drives /api/agencies, /api/data/<agency>
+for every declared sub_section (plus a search per searchable agency),
+/api/cross-reference and /api/chat (the LLM is
+stubbed by the same stand-in server). Reports throughput, p50/p95/p99 latency
+and error counts per scenario plus peak RSS, as JSON.
+
+    cd webapp
+    # one live pass to record cassettes
+    python -m benchmarks.bench_api --record cassettes --requests 1
+    # replay, e.g. to compare branches
+    python -m benchmarks.bench_api --cassettes cassettes --latency '*=40' \\
+        --jitter '*=10' --output bench-main.json
+
+By default the response cache is purged before every request so each request
+exercises the upstream/parse/format path; --warm leaves the cache alone.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from werkzeug.serving import make_server
+
+from api import cache, http_client, replay
+
+STUB_REPLY = "Stubbed reply from the benchmark LLM."
+OPENAI_HOST = 'api.openai.com'
+
+
+def _chat_stub():
+    """A recorded-looking chat.completions exchange served by the stand-in."""
+    body = {
+        'id': 'chatcmpl-bench', 'object': 'chat.completion', 'created': 0, 'model': 'gpt-4o-mini',
+        'choices': [{'index': 0, 'finish_reason': 'stop',
+                     'message': {'role': 'assistant', 'content': STUB_REPLY}}],
+        'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+    }
+    return {
+        'method': 'POST', 'url': f'https://{OPENAI_HOST}/v1/chat/completions', 'body': '',
+        'status': 200, 'headers': {'Content-Type': 'application/json'},
+        'response': {'text': json.dumps(body)},
+    }
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process (server and client) in KiB."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def scenarios(agencies, query):
+    """[(name, method, path, params, json_body)] covering every endpoint.
+
+    Sub_section views are requested without a query (modules with search
+    switch to their search path when given one); each searchable agency
+    gets a separate search:<agency> scenario.
+    """
+    out = [('agencies', 'GET', '/api/agencies', None, None)]
+    for meta in agencies:
+        for sub in meta.get('sub_sections', []):
+            out.append((f"data:{meta['id']}:{sub['id']}", 'GET', f"/api/data/{meta['id']}",
+                        {'sub_section': sub['id']}, None))
+        if meta.get('has_search'):
+            out.append((f"search:{meta['id']}", 'GET', f"/api/data/{meta['id']}",
+                        {'query': query}, None))
+    out.append(('cross-reference', 'POST', '/api/cross-reference', None,
+                {'query': query, 'agencies': [m['id'] for m in agencies]}))
+    out.append(('chat', 'POST', '/api/chat', None,
+                {'message': f'Summarize {query} data', 'openai_api_key': 'sk-bench',
+                 'context_data': {'query': query}, 'history': []}))
+    return out
+
+
+def _upstream_error(payload):
+    """True when a 200 response carries a module error row instead of data."""
+    try:
+        rows = json.loads(payload).get('results')
+    except (ValueError, AttributeError):
+        return False
+    return bool(rows) and isinstance(rows[0], dict) and 'error' in rows[0]
+
+
+def run_scenario(base_url, scenario, n, concurrency, warm):
+    name, method, path, params, body = scenario
+    local = threading.local()
+
+    def one(_):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        if not warm:
+            cache.response_cache.purge()
+        start = time.perf_counter()
+        try:
+            resp = session.request(method, base_url + path, params=params, json=body, timeout=60)
+            payload = resp.content
+            ok = resp.status_code < 400
+        except requests.RequestException:
+            payload, ok = b'', False
+        return time.perf_counter() - start, ok, len(payload), ok and _upstream_error(payload)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(n)))
+    wall = time.perf_counter() - start
+
+    latencies = sorted(r[0] * 1000 for r in results)
+    return {
+        'name': name,
+        'requests': n,
+        'errors': sum(1 for r in results if not r[1]),
+        'upstream_errors': sum(1 for r in results if r[3]),
+        'throughput_rps': round(n / wall, 2) if wall else None,
+        'latency_ms': {
+            'mean': round(statistics.fmean(latencies), 3),
+            'p50': round(percentile(latencies, 50), 3),
+            'p95': round(percentile(latencies, 95), 3),
+            'p99': round(percentile(latencies, 99), 3),
+            'max': round(latencies[-1], 3),
+        },
+        'response_bytes': sum(r[2] for r in results) // n,
+    }
+
+
+def _git_revision():
+    try:
+        with os.popen('git rev-parse --short HEAD 2>/dev/null') as p:
+            return p.read().strip() or None
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end /api benchmark against a simulated upstream.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--cassettes', help="replay recorded upstream exchanges from this directory")
+    source.add_argument('--record', help="hit live upstreams and record cassettes into this directory")
+    parser.add_argument('--requests', type=int, default=50, help="requests per scenario")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--query', default='health')
+    parser.add_argument('--only', action='append', help="run only scenarios whose name starts with this")
+    parser.add_argument('--latency', action='append', help="upstream host=ms ('*' for all)")
+    parser.add_argument('--jitter', action='append', help="upstream host=ms ('*' for all)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--warm', action='store_true', help="keep the response cache between requests")
+    parser.add_argument('--output', help="write JSON results here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    stand_in = None
+    if args.record:
+        replay.RECORD_DIR = args.record
+    else:
+        cassettes = replay.load_cassettes(args.cassettes) if args.cassettes else {}
+        if not cassettes:
+            print("warning: no cassettes; every upstream call will return 404", file=sys.stderr)
+        cassettes.setdefault(OPENAI_HOST, []).append(_chat_stub())
+        stand_in = replay.ReplayServer(cassettes, replay.parse_host_values(args.latency),
+                                       replay.parse_host_values(args.jitter), seed=args.seed).start()
+        replay.UPSTREAM_BASE_URL = stand_in.base_url
+        os.environ['OPENAI_BASE_URL'] = f"{stand_in.base_url}/{OPENAI_HOST}/v1"
+    if not args.warm:
+        http_client.NEGATIVE_TTL = 0
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    import app as webapp
+    server = make_server('127.0.0.1', 0, webapp.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    selected = [s for s in scenarios(webapp.AGENCY_MANIFEST['agencies'], args.query)
+                if not args.only or any(s[0].startswith(p) for p in args.only)]
+    results = []
+    started = time.time()
+    try:
+        for scenario in selected:
+            result = run_scenario(base_url, scenario, args.requests, args.concurrency, args.warm)
+            results.append(result)
+            print(f"{result['name']:<40} {result['throughput_rps']:>9} rps  "
+                  f"p50 {result['latency_ms']['p50']:>9} ms  p99 {result['latency_ms']['p99']:>9} ms  "
+                  f"errors {result['errors']}/{result['upstream_errors']}", file=sys.stderr)
+    finally:
+        server.shutdown()
+        if stand_in:
+            stand_in.stop()
+
+    report = {
+        'revision': _git_revision(),
+        'started': started,
+        'python': platform.python_version(),
+        'mode': 'record' if args.record else 'replay',
+        'cache': 'warm' if args.warm else 'cold',
+        'requests_per_scenario': args.requests,
+        'concurrency': args.concurrency,
+        'peak_rss_kb': peak_rss_kb(),
+        'scenarios': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
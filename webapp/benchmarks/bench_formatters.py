@@ -0,0 +1,173 @@
+"""Micro-benchmarks for each agency module's parse-and-format path.
+
+Recorded cassettes are amplified to --records records (the longest list in
+each JSON response is repeated to that length) and served in-process through
+replay.ReplayAdapter, so only JSON decoding and the module's own formatting
+code are measured. For every agency sub_section (requested without a search
+query, so the sub_section's own formatter runs) this reports records/sec,
+the split between JSON parsing and formatting, and tracemalloc allocation
+figures, as JSON.
+
+    cd webapp
+    python -m benchmarks.bench_formatters --cassettes cassettes --records 10000 \\
+        --output formatters.json
+
+Responses that are not JSON (SEC Atom, DOJ HTML, ...) are served as recorded,
+so those sub_sections format only the recorded number of records.
+"""
+import argparse
+import copy
+import json
+import sys
+import time
+import tracemalloc
+
+from api import http_client, replay, tracing
+
+DEFAULT_RECORDS = 10000
+
+
+def _longest_list(node, path=()):
+    """(path, list) of the longest list of dicts anywhere in a JSON document."""
+    best = (None, [])
+    if isinstance(node, list):
+        if node and isinstance(node[0], dict):
+            best = (path, node)
+        children = enumerate(node[:1])
+    elif isinstance(node, dict):
+        children = node.items()
+    else:
+        return best
+    for key, child in children:
+        found = _longest_list(child, path + (key,))
+        if len(found[1]) > len(best[1]):
+            best = found
+    return best
+
+
+def amplify(document, records):
+    """Copy of document with its longest record list repeated to `records` items."""
+    path, rows = _longest_list(document)
+    if not rows:
+        return document
+    document = copy.deepcopy(document)
+    parent = document
+    for key in path[:-1]:
+        parent = parent[key]
+    if path:
+        parent[path[-1]] = [rows[i % len(rows)] for i in range(records)]
+    else:
+        document = [rows[i % len(rows)] for i in range(records)]
+    return document
+
+
+def amplify_cassettes(cassettes, records):
+    """Cassettes with every JSON response body amplified."""
+    out = {}
+    for host, interactions in cassettes.items():
+        out[host] = []
+        for interaction in interactions:
+            try:
+                document = json.loads(replay.response_body(interaction))
+            except ValueError:
+                out[host].append(interaction)
+                continue
+            interaction = dict(interaction, response={'text': json.dumps(amplify(document, records))})
+            out[host].append(interaction)
+    return out
+
+
+def _call(data_func, params):
+    trace = tracing.start('bench')
+    start = time.perf_counter()
+    result = data_func('', dict(params))
+    elapsed = time.perf_counter() - start
+    tracing.finish(trace)
+    spans = trace.summary()['spans']
+    parse_s = spans.get('parse', {}).get('total_ms', 0.0) / 1000
+    upstream_s = spans.get('upstream', {}).get('total_ms', 0.0) / 1000
+    rows = result.get('results') if isinstance(result, dict) else None
+    return result, rows or [], elapsed, parse_s, upstream_s
+
+
+def bench(data_func, params, repeat):
+    """Best-of-`repeat` timings plus one tracemalloc-instrumented run."""
+    _call(data_func, params)  # warm-up: imports, session and breaker setup
+    best = None
+    for _ in range(repeat):
+        result, rows, elapsed, parse_s, upstream_s = _call(data_func, params)
+        if best is None or elapsed < best[0]:
+            best = (elapsed, parse_s, upstream_s)
+    elapsed, parse_s, upstream_s = best
+    format_s = max(0.0, elapsed - parse_s - upstream_s)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        _call(data_func, params)
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    diff = after.compare_to(before, 'filename')
+    allocated = sum(d.size_diff for d in diff if d.size_diff > 0)
+    blocks = sum(d.count_diff for d in diff if d.count_diff > 0)
+
+    error = rows[0].get('error') if rows and isinstance(rows[0], dict) else None
+    return {
+        'records': len(rows),
+        'error': error,
+        'seconds': round(elapsed, 6),
+        'parse_seconds': round(parse_s, 6),
+        'format_seconds': round(format_s, 6),
+        'records_per_sec': round(len(rows) / elapsed, 1) if elapsed and rows else 0,
+        'format_records_per_sec': round(len(rows) / format_s, 1) if format_s and rows else None,
+        'peak_alloc_bytes': peak,
+        'retained_bytes': allocated,
+        'retained_blocks': blocks,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-module parse/format micro-benchmarks.")
+    parser.add_argument('--cassettes', required=True, help="directory of recorded cassettes")
+    parser.add_argument('--records', type=int, default=DEFAULT_RECORDS)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', action='append', help="run only agencies/sub_sections starting with this")
+    parser.add_argument('--output', help="write JSON results here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    cassettes = amplify_cassettes(replay.load_cassettes(args.cassettes), args.records)
+    http_client.use_transport(replay.ReplayAdapter(cassettes))
+    http_client.NEGATIVE_TTL = 0
+
+    import app as webapp
+    results = []
+    for meta in webapp.AGENCY_MANIFEST['agencies']:
+        route = webapp.DISPATCH.get(meta['id'])
+        if not route:
+            continue
+        for sub in meta.get('sub_sections', []):
+            name = f"{meta['id']}:{sub['id']}"
+            if args.only and not any(name.startswith(p) for p in args.only):
+                continue
+            # No query: searchable modules would run their search path instead
+            params = {'sub_section': sub['id'], 'limit': args.records}
+            result = dict(bench(route.data_func, params, args.repeat), name=name)
+            results.append(result)
+            print(f"{name:<32} {result['records']:>7} rec  {result['records_per_sec']:>12} rec/s  "
+                  f"format {result['format_seconds'] * 1000:>9.2f} ms  "
+                  f"peak {result['peak_alloc_bytes'] // 1024:>8} KiB"
+                  + (f"  error: {result['error']}" if result['error'] else ''), file=sys.stderr)
+
+    results.sort(key=lambda r: r['format_records_per_sec'] or float('inf'))
+    text = json.dumps({'records_requested': args.records, 'repeat': args.repeat, 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
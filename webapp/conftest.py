@@ -0,0 +1 @@
+"""pytest root for webapp/: makes the `api` package importable from tests/."""
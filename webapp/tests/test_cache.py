@@ -0,0 +1,81 @@
+import threading
+import time
+
+from api import cache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+def test_entry_goes_fresh_then_stale_then_missing(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, 'time', clock)
+    c = cache.ResponseCache()
+    c.set('k', 'body', ttl=10)
+
+    assert c.lookup('k', max_stale=20) == (c.get('k'), cache.FRESH)
+    clock.now += 10
+    entry, state = c.lookup('k', max_stale=20)
+    assert (entry.value, state) == ('body', cache.STALE)
+    assert c.get('k') is None  # get() never returns stale entries
+    clock.now += 20
+    assert c.lookup('k', max_stale=20) == (None, None)
+    assert c.stats()['stale_hits'] == 1
+
+
+def test_backdated_entry_keeps_its_age(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, 'time', clock)
+    c = cache.ResponseCache()
+    entry = c.set('k', 'body', ttl=10, stored_at=clock.now - 15)
+    assert entry.expired
+    assert c.lookup('k', max_stale=10)[1] == cache.STALE
+
+
+def test_least_recently_used_entry_is_evicted():
+    c = cache.ResponseCache(max_entries=2)
+    c.set('a', 1, ttl=60)
+    c.set('b', 2, ttl=60)
+    c.get('a')
+    c.set('c', 3, ttl=60)
+    assert [k for k, _ in c.items()] == ['a', 'c']
+    assert c.stats()['evictions'] == 1
+
+
+def test_one_background_refresh_per_key():
+    c = cache.ResponseCache()
+    release = threading.Event()
+    done = threading.Event()
+    runs = []
+
+    def refresh():
+        runs.append(1)
+        release.wait(5)
+        done.set()
+
+    assert c.refresh_in_background('k', refresh)
+    assert not c.refresh_in_background('k', refresh)
+    release.set()
+    assert done.wait(5)
+    deadline = time.monotonic() + 5
+    while c.stats()['refreshing'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert c.refresh_in_background('k', lambda: None)
+    assert runs == [1]
+
+
+def test_peek_leaves_stats_and_lru_order_alone():
+    c = cache.ResponseCache(max_entries=2)
+    c.set('a', 1, ttl=0)
+    c.set('b', 2, ttl=60)
+    assert c.peek('a').value == 1  # expired entries too
+    assert c.peek('missing') is None
+    c.set('c', 3, ttl=60)
+    assert [k for k, _ in c.items()] == ['b', 'c']
+    stats = c.stats()
+    assert (stats['hits'], stats['stale_hits'], stats['misses']) == (0, 0, 0)
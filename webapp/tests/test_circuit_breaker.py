@@ -0,0 +1,79 @@
+from api import circuit_breaker as cb
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+def tripped(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cb, 'time', clock)
+    breaker = cb.HostBreaker('example.gov')
+    for ok in (True, False, False, True, False):
+        assert breaker.allow()
+        breaker.record(ok, 0.1)
+    return breaker, clock
+
+
+def test_opens_at_the_failure_rate_after_min_calls(monkeypatch):
+    monkeypatch.setattr(cb, 'time', Clock())
+    breaker = cb.HostBreaker('example.gov')
+    for _ in range(cb.MIN_CALLS - 1):
+        breaker.record(False, 0.1)
+    assert breaker.state == cb.CLOSED
+    breaker.record(False, 0.1)
+    assert breaker.state == cb.OPEN
+
+
+def test_open_breaker_fails_fast_until_the_cooldown(monkeypatch):
+    breaker, clock = tripped(monkeypatch)
+    assert breaker.state == cb.OPEN
+    assert not breaker.allow()
+    clock.now += cb.COOLDOWN - 1
+    assert not breaker.allow()
+    assert breaker.snapshot()['rejected'] == 2
+
+
+def test_half_open_lets_one_probe_through_and_success_closes(monkeypatch):
+    breaker, clock = tripped(monkeypatch)
+    clock.now += cb.COOLDOWN
+    assert breaker.allow()
+    assert breaker.state == cb.HALF_OPEN
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record(True, 0.1)
+    assert breaker.state == cb.CLOSED
+    assert breaker.snapshot()['calls'] == 1  # the failures that tripped it are forgotten
+
+
+def test_failed_probe_reopens_for_another_cooldown(monkeypatch):
+    breaker, clock = tripped(monkeypatch)
+    clock.now += cb.COOLDOWN
+    assert breaker.allow()
+    breaker.record(False, 0.1, error='timeout')
+    assert breaker.state == cb.OPEN
+    assert breaker.opened_at == clock.now
+    assert not breaker.allow()
+
+
+def test_old_failures_leave_the_window(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cb, 'time', clock)
+    breaker = cb.HostBreaker('example.gov')
+    for _ in range(cb.MIN_CALLS - 1):
+        breaker.record(False, 0.1)
+    clock.now += cb.WINDOW + 1
+    breaker.record(False, 0.1)
+    assert breaker.state == cb.CLOSED
+
+
+def test_released_probe_lets_the_next_call_probe(monkeypatch):
+    breaker, clock = tripped(monkeypatch)
+    clock.now += cb.COOLDOWN
+    assert breaker.allow()
+    breaker.release()  # e.g. the call was rate limited and never went out
+    assert breaker.state == cb.HALF_OPEN
+    assert breaker.allow()
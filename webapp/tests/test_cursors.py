@@ -0,0 +1,87 @@
+import pytest
+
+from api import cursors, l2cache
+
+
+def capped_module(total, cap):
+    """fetch_window for a module that returns at most cap rows per call."""
+    calls = []
+
+    def fetch_window(params):
+        calls.append(dict(params))
+        offset = params.get('offset', 0)
+        count = min(params['limit'], cap)
+        return {'results': list(range(total))[offset:offset + count], 'source': 'test'}
+    return fetch_window, calls
+
+
+def test_short_window_from_a_capped_module_does_not_end_the_set():
+    fetch_window, _ = capped_module(total=250, cap=100)
+    rs, rows, token = cursors.first_page('fec', {}, 150, fetch_window)
+    assert rows == list(range(150))
+    assert rs.meta == {'source': 'test'}
+
+    seen = list(rows)
+    while token:
+        rs, rows, token = cursors.page('fec', token, fetch_window)
+        seen.extend(rows)
+    assert seen == list(range(250))
+
+
+def test_module_reported_total_ends_the_set_without_an_extra_fetch():
+    def fetch_window(params):
+        calls.append(params)
+        offset = params.get('offset', 0)
+        return {'results': list(range(30))[offset:offset + params['limit']], 'total': 30}
+    calls = []
+
+    rs, rows, token = cursors.first_page('fec', {}, 30, fetch_window)
+    assert rows == list(range(30))
+    assert token is None
+    assert len(calls) == 1
+
+
+def test_tampered_or_foreign_tokens_are_rejected(monkeypatch):
+    fetch_window, _ = capped_module(total=50, cap=100)
+    _, _, token = cursors.first_page('fec', {}, 10, fetch_window)
+    body, _, signature = token.partition('.')
+    forged = cursors._b64(b'["x",0,1000]') + '.' + signature
+    for bad in (forged, body, 'garbage', token + 'x'):
+        with pytest.raises(cursors.InvalidCursor, match='Malformed'):
+            cursors.page('fec', bad, fetch_window)
+
+    monkeypatch.setattr(cursors, '_SECRET', b'another worker')
+    with pytest.raises(cursors.InvalidCursor, match='Malformed'):
+        cursors.page('fec', token, fetch_window)
+
+
+def test_cursor_is_bound_to_its_api_key():
+    fetch_window, _ = capped_module(total=50, cap=100)
+    _, _, token = cursors.first_page('fec', {}, 10, fetch_window, owner='key-a')
+    with pytest.raises(cursors.InvalidCursor, match='different API key'):
+        cursors.page('fec', token, fetch_window, owner='key-b')
+    assert cursors.page('fec', token, fetch_window, owner='key-a')[1] == list(range(10, 20))
+
+
+def test_expired_result_set(monkeypatch):
+    monkeypatch.setattr(cursors, 'CURSOR_TTL', 0)
+    fetch_window, _ = capped_module(total=50, cap=100)
+    _, _, token = cursors.first_page('fec', {}, 10, fetch_window)
+    with pytest.raises(cursors.InvalidCursor, match='expired'):
+        cursors.page('fec', token, fetch_window)
+
+
+def test_another_worker_continues_a_cursor_through_the_l2_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(l2cache, 'disk_cache', l2cache.DiskCache(str(tmp_path / 'l2.sqlite3')))
+    fetch_window, calls = capped_module(total=250, cap=100)
+    _, _, token = cursors.first_page('fec', {'sub_section': 'filings'}, 100, fetch_window)
+    _, rows, token = cursors.page('fec', token, fetch_window)
+    assert rows == list(range(100, 200))
+
+    cursors.result_sets.purge()  # as seen from a worker that never held the set
+    rs, rows, token = cursors.page('fec', token, fetch_window)
+    assert rows == list(range(200, 250))
+    assert rs.params == {'sub_section': 'filings'}
+    assert token is None
+    # Windows already fetched by the first worker are not fetched again
+    assert [c.get('offset', 0) for c in calls] == [0, 100, 200, 250]
@@ -0,0 +1,26 @@
+import pytest
+
+from api import dispatch
+
+
+def route():
+    return dispatch.AgencyRoute('bls', 'get_bls_data', ['unemployment', 'cpi'], importer=None,
+                                aliases={'inflation': 'cpi'}, unsupported=['jolts'])
+
+
+def test_ids_resolve_to_canonical_sub_sections():
+    r = route()
+    assert r.resolve_sub_section('') == 'unemployment'
+    assert r.resolve_sub_section('cpi') == 'cpi'
+    assert r.resolve_sub_section('inflation') == 'cpi'
+
+
+def test_unsupported_ids_are_rejected_not_mapped_to_another_view():
+    with pytest.raises(dispatch.UnsupportedSubSection, match="not supported by the bls backend") as e:
+        route().resolve_sub_section('jolts')
+    assert e.value.valid == ['unemployment', 'cpi']
+
+
+def test_unknown_ids_are_rejected():
+    with pytest.raises(dispatch.UnknownSubSection, match="Unknown sub_section 'nope'"):
+        route().resolve_sub_section('nope')
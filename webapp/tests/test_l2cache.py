@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+from api import l2cache
+
+
+def test_no_connection_until_first_use(tmp_path):
+    path = tmp_path / 'l2.sqlite3'
+    disk = l2cache.DiskCache(str(path))
+    assert not path.exists()
+    disk.set(('sam', 'contracts'), b'{}', 60)
+    assert disk.get(('sam', 'contracts'))[0] == b'{}'
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_forked_child_opens_its_own_connection(tmp_path):
+    disk = l2cache.DiskCache(str(tmp_path / 'l2.sqlite3'))
+    disk.set(('sam', 'contracts'), b'parent', 60)
+    inherited = disk._connect()
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            ok = disk._connect() is not inherited and disk.get(('sam', 'contracts'))[0] == b'parent'
+            disk.set(('fec', 'filings'), b'child', 60)
+            os.write(write, b'1' if ok else b'0')
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+    assert os.read(read, 1) == b'1'
+    assert disk._connect() is inherited
+    assert disk.get(('fec', 'filings'))[0] == b'child'
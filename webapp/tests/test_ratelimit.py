@@ -0,0 +1,31 @@
+from api import ratelimit
+
+
+def request_with_key(key):
+    return ratelimit.bucket_for('api.nasa.gov', f'https://api.nasa.gov/planetary/apod?api_key={key}', {}, None)
+
+
+def test_keyed_buckets_are_bounded_least_recently_used_first(monkeypatch):
+    monkeypatch.setattr(ratelimit, '_buckets', ratelimit.OrderedDict())
+    monkeypatch.setattr(ratelimit, 'MAX_BUCKETS', 3)
+    anonymous = request_with_key('DEMO_KEY')
+    first = request_with_key('key-1')
+    assert first.acquire(max_wait=0)  # spent a token: no longer full, still evictable
+    request_with_key('key-2')
+    assert request_with_key('key-1') is first  # used again: key-2 is now the oldest keyed bucket
+
+    for n in range(3, 100):
+        request_with_key(f'key-{n}')
+    assert len(ratelimit._buckets) == 3
+    assert request_with_key('DEMO_KEY') is anonymous
+    assert request_with_key('key-99') is not None
+    assert request_with_key('key-1') is not first
+
+
+def test_buckets_with_waiters_are_not_evicted(monkeypatch):
+    monkeypatch.setattr(ratelimit, '_buckets', ratelimit.OrderedDict())
+    monkeypatch.setattr(ratelimit, 'MAX_BUCKETS', 1)
+    busy = request_with_key('key-busy')
+    busy._waiters.append((ratelimit.INTERACTIVE, 0))
+    request_with_key('key-other')
+    assert request_with_key('key-busy') is busy
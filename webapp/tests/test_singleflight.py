@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from api.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    flights = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return 'body'
+
+    async def main():
+        leader = asyncio.ensure_future(flights.do('k', fetch))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(flights.do('k', fetch))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == ('body', True)
+    assert calls == [1]
+
+
+def test_timed_out_caller_leaves_shared_call_running():
+    flights = AsyncSingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.2)
+        return 'body'
+
+    async def main():
+        impatient = asyncio.wait_for(flights.do('k', fetch), 0.05)
+        patient = flights.do('k', fetch)
+        return await asyncio.gather(impatient, patient, return_exceptions=True)
+
+    impatient, patient = asyncio.run(main())
+    assert isinstance(impatient, asyncio.TimeoutError)
+    assert patient[0] == 'body'
+
+
+def test_errors_are_shared_and_key_is_released():
+    flights = AsyncSingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError('upstream down')
+
+    async def main():
+        outcomes = await asyncio.gather(flights.do('k', fail), flights.do('k', fail),
+                                        return_exceptions=True)
+        return outcomes, flights.stats()
+
+    outcomes, stats = asyncio.run(main())
+    assert all(isinstance(o, ValueError) for o in outcomes)
+    assert stats == {'executed': 1, 'coalesced': 1, 'in_flight': 0}
+    assert outcomes[0] is not outcomes[1]  # each caller raises its own copy
+
+
+def test_threaded_followers_raise_their_own_copy():
+    flights = SingleFlight()
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        time.sleep(0.05)
+        raise ValueError('upstream down')
+
+    errors = []
+
+    def call():
+        try:
+            flights.do('k', fail)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=call) for _ in range(3)]
+    for t in followers:
+        t.start()
+    for t in [leader] + followers:
+        t.join()
+    assert len(errors) == 4
+    assert len({id(e) for e in errors}) == 4
+    assert all(e.args == ('upstream down',) for e in errors)